@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+from model import Model, battle_rounds
+from live_view import FrameSnapshot
+from visualize import update_image
+
+def record_battle(model):
+    """
+    Plays a battle to the end without drawing it, keeping a FrameSnapshot of every round.
+    Outputs:
+    - frames: list of FrameSnapshots, in round order
+    """
+    return [FrameSnapshot(model, round) for round, _ in enumerate(battle_rounds(model), 1)]
+
+def render_frames(frames, folder=None, figsize=(6, 6), dpi=80):
+    """
+    Draws FrameSnapshots with the Agg backend, on one figure reused for every frame, so no window
+    is ever opened. Used directly and by worker processes.
+    Inputs:
+    frames: list of FrameSnapshots
+    folder: directory to write frame_<round>.png files into; if None, the frames are returned
+    figsize, dpi: size of the figure in inches, and its pixels per inch
+    Outputs:
+    - images: list of palette PIL images ready for a GIF, or of the PNG paths written to folder
+    """
+    figure = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    images = []
+    for frame in frames:
+        update_image(frame.render(), frame.message, ax)
+        canvas.draw()
+        image = Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3])
+        if folder is None:
+            images.append(image.quantize())
+        else:
+            path = os.path.join(folder, "frame_%05d.png" % frame.round)
+            image.save(path)
+            images.append(path)
+    return images
+
+def export_animation(frames, path, workers=1, fps=10, figsize=(6, 6), dpi=80):
+    """
+    Renders recorded frames in a process pool and writes them as an animated GIF or as a
+    sequence of numbered PNGs.
+    Inputs:
+    frames: list of FrameSnapshots (see record_battle)
+    path: .gif file to write, or directory for frame_<round>.png files (created if needed)
+    workers: number of worker processes (1 renders everything in this process)
+    fps: frames per second of the GIF
+    figsize, dpi: size of every frame (see render_frames)
+    Outputs:
+    - paths: list of the files written
+    """
+    folder = None
+    if not path.lower().endswith(".gif"):
+        folder = path
+        os.makedirs(folder, exist_ok=True)
+
+    # Contiguous chunks, several per worker so the pool stays busy; each reuses one figure
+    chunk = max(1, -(-len(frames) // (workers * 4)))
+    chunks = [frames[start:start + chunk] for start in range(0, len(frames), chunk)]
+    options = (folder, figsize, dpi)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_frames, chunks, *[repeat(option) for option in options]))
+    else:
+        rendered = [render_frames(part, *options) for part in chunks]
+    images = [image for images in rendered for image in images]
+
+    if folder is not None:
+        return images
+    if images:
+        images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+    return [path]
+
+def export_battle(model, path, workers=1, **options):
+    """
+    Records a battle (see record_battle) and exports its animation (see export_animation).
+    Outputs:
+    - frames: number of frames (rounds) exported
+    """
+    frames = record_battle(model)
+    export_animation(frames, path, workers, **options)
+    return len(frames)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the animation of a seeded battle as a GIF or PNG frames")
+    parser.add_argument("output", help=".gif file, or directory for numbered PNG frames")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the battle")
+    parser.add_argument("--players", type=int, default=5, help="number of players")
+    parser.add_argument("--enemies", type=int, default=10, help="number of enemies")
+    parser.add_argument("--strategy", default='attack_nearest', help="enemy strategy")
+    parser.add_argument("--grid", type=int, nargs=2, default=[100, 100], metavar=("X", "Y"), help="grid size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="rendering processes")
+    parser.add_argument("--fps", type=float, default=10, help="frames per second of a GIF")
+    args = parser.parse_args(argv)
+
+    model = Model(num_players=args.players, num_enemies=args.enemies, enemy_strategy=args.strategy,
+                  grid_x=args.grid[0], grid_y=args.grid[1], seed=args.seed)
+    count = export_battle(model, args.output, args.workers, fps=args.fps)
+    print("Exported %d frames to %s" % (count, args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
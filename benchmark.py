@@ -0,0 +1,199 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+from model import Model
+from player import Player
+
+# Fixture densities: (players, enemies) placed on the 100x100 grid
+DENSITIES = {
+    "sparse": (5, 10),
+    "medium": (20, 80),
+    "dense": (50, 400),
+}
+
+# Seed of every fixture, so each sample times the same battle state
+FIXTURE_SEED = 2024
+
+# Committed results that runs are compared against by default; refresh it with --output when a
+# change is meant to move the numbers
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+
+def make_fixture(density):
+    """Returns a freshly placed Model with the given density (see DENSITIES)"""
+    num_players, num_enemies = DENSITIES[density]
+    return Model(num_players=num_players, num_enemies=num_enemies, seed=FIXTURE_SEED)
+
+def move_players(model):
+    """Moves every player towards its nearest enemy, as a dash would. Returns the number of calls"""
+    enemies = model.registry.get_enemies()
+    players = model.registry.get_players()
+    for player in players:
+        player.move_towards(player.find_nearest_enemy(enemies).loc, model.grid, model.registry)
+    return len(players)
+
+def move_enemies(model):
+    """Moves every enemy towards its nearest player. Returns the number of calls"""
+    players = model.registry.get_players()
+    enemies = model.registry.get_enemies()
+    for enemy in enemies:
+        enemy.move_towards(enemy.find_nearest_player(players).loc, model.grid, model.registry)
+    return len(enemies)
+
+def scan_adjacent(model):
+    """Checks the neighbours of every agent ten times. Returns the number of calls"""
+    agents = model.initiative_order
+    for _ in range(10):
+        for agent in agents:
+            if isinstance(agent, Player):
+                agent.adjacent_enemies(model.grid, model.registry)
+            else:
+                agent.adjacent_players(model.grid, model.registry)
+    return 10 * len(agents)
+
+def find_nearest(model):
+    """Finds the nearest opponent of every agent. Returns the number of calls"""
+    players = model.registry.get_players()
+    enemies = model.registry.get_enemies()
+    for player in players:
+        player.find_nearest_enemy(enemies)
+    for enemy in enemies:
+        enemy.find_nearest_player(players)
+    return len(players) + len(enemies)
+
+def roll_dice(model):
+    """Rolls 10000 d20s through the first agent's dice. Returns the number of calls"""
+    roll = model.initiative_order[0].roll
+    for _ in range(10000):
+        roll(20, 0)
+    return 10000
+
+def execute_turns(model):
+    """Runs one full round. Returns 1"""
+    model.execute_turns()
+    return 1
+
+# Benchmarks: name -> function timed on a fresh fixture, returning how many operations it did
+BENCHMARKS = {
+    "move_towards.player": move_players,
+    "move_towards.enemy": move_enemies,
+    "adjacent": scan_adjacent,
+    "find_nearest": find_nearest,
+    "roll": roll_dice,
+    "execute_turns": execute_turns,
+}
+
+def time_benchmark(name, density, repeat=5, min_time=0.02):
+    """
+    Times one benchmark on one fixture density.
+    A sample runs the benchmark on number fresh fixtures, built before the timer starts, where
+    number is chosen so a sample takes at least min_time seconds; short benchmarks are then not
+    lost in timer noise, and every sample does the same work. Garbage collection is paused while
+    a sample is timed.
+    Outputs:
+    - times: list of repeat sample times, in seconds per operation
+    - ops: operations per sample
+    """
+    benchmark = BENCHMARKS[name]
+
+    def sample(number):
+        models = [make_fixture(density) for _ in range(number)]
+        # Like timeit, keep garbage collection (triggered by building the fixtures) out of the timing
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            ops = sum(benchmark(model) for model in models)
+            return time.perf_counter() - start, ops
+        finally:
+            gc.enable()
+
+    elapsed, _ = sample(1)
+    number = max(1, int(np.ceil(min_time / max(elapsed, 1e-9))))
+    times = []
+    for _ in range(repeat):
+        elapsed, ops = sample(number)
+        times.append(elapsed / ops)
+    return times, ops
+
+def run_benchmarks(names=None, densities=None, repeat=5, min_time=0.02):
+    """
+    Times every benchmark on fresh fixtures of every density (see time_benchmark).
+    Inputs:
+    names: benchmarks to run (all of BENCHMARKS by default)
+    densities: fixture densities to use (all of DENSITIES by default)
+    repeat: samples per benchmark
+    min_time: least time a sample takes, in seconds
+    Outputs:
+    - report: dict with "meta" (versions, repeat) and "results": "<benchmark>[<density>]" ->
+      {"ops", "min", "median"}, where min and median are seconds per operation
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        for density in densities or DENSITIES:
+            times, ops = time_benchmark(name, density, repeat, min_time)
+            results["%s[%s]" % (name, density)] = {
+                "ops": ops,
+                "min": float(np.min(times)),
+                "median": float(np.median(times)),
+            }
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeat": repeat,
+    }
+    return {"meta": meta, "results": results}
+
+def compare(report, baseline, threshold=0.2):
+    """
+    Compares a report against a baseline report from run_benchmarks.
+    A benchmark regressed if its best time per operation is more than threshold (as a fraction)
+    slower than the baseline's. Benchmarks missing from either report are skipped.
+    Outputs:
+    - rows: list of (name, baseline seconds, current seconds, ratio, regressed), by name
+    """
+    rows = []
+    for name in sorted(set(report["results"]) & set(baseline["results"])):
+        old = baseline["results"][name]["min"]
+        new = report["results"][name]["min"]
+        ratio = new / old if old else float('inf')
+        rows.append((name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the simulation's hot functions")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="JSON results of an earlier run to compare against (default: the committed baseline, '' to skip)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs the baseline (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.02, help="least time of a sample, in seconds")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--density", nargs="*", choices=list(DENSITIES), help="fixture densities to use")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only, args.density, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    for name, row in report["results"].items():
+        print("%-32s %12.2f us/op" % (name, 1e6 * row["min"]))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print()
+        for name, old, new, ratio, regressed in rows:
+            print("%-32s %10.2f -> %10.2f us/op  x%.2f%s" % (name, 1e6 * old, 1e6 * new, ratio, "  REGRESSION" if regressed else ""))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import numpy as np
+
+class DicePool(object):
+    """
+    Dice service shared by every agent in a Model. Rolls are drawn from a numpy.random.Generator
+    in blocks, one buffer per die size, and handed out one at a time; an empty buffer is refilled
+    with a fresh block. Rolls use the same range as np.random.randint(1, die), i.e. 1 to die - 1.
+    """
+    def __init__(self, rng=None, block_size=1024):
+        # Generator the blocks are drawn from
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Number of rolls drawn per refill
+        self.block_size = block_size
+
+        # Die size -> list of unused rolls (as Python ints, consumed from the end)
+        self.buffers = {}
+
+    def roll(self, die):
+        """
+        Returns the next roll of a die with the given number of sides.
+        Inputs:
+        die: number of sides on the die (e.g., 20 for a d20)
+        Outputs:
+        - result: integer roll between 1 and die - 1
+        """
+        buffer = self.buffers.get(die)
+        if not buffer:
+            buffer = self.refill(die)
+        return buffer.pop()
+
+    def refill(self, die):
+        """Draws a new block of rolls for the given die size and returns its buffer"""
+        buffer = self.rng.integers(1, die, size=self.block_size).tolist()
+        self.buffers[die] = buffer
+        return buffer
+
+def make_rng(seed=None):
+    """
+    Returns the numpy.random.Generator for a battle.
+    Inputs:
+    seed: int, np.random.SeedSequence or Generator. With None, the seed is drawn from the global
+          NumPy random state so np.random.seed still makes runs reproducible
+    Outputs:
+    - rng: numpy.random.Generator
+    """
+    if seed is None:
+        seed = np.random.randint(0, 2**32, dtype=np.int64)
+    return np.random.default_rng(seed)
+
+def spawn_seeds(seed, count):
+    """
+    Derives count independent child seeds from a root seed, one per battle or configuration.
+    Child i depends only on the root seed and i, never on how many children are spawned or in
+    which order they are used, so battles can be run by any number of workers.
+    Inputs:
+    seed: int or np.random.SeedSequence root seed. With None, the root is drawn from the global
+          NumPy random state
+    count: number of child seeds
+    Outputs:
+    - seeds: list of np.random.SeedSequence
+    """
+    return list(iter_seeds(seed, count))
+
+def iter_seeds(seed, count):
+    """
+    Like spawn_seeds, but returns an iterator that creates the child seeds as they are used,
+    so a batch of millions of battles does not hold millions of seeds. The root is resolved
+    (and, for None, drawn from the global random state) immediately.
+    """
+    root = root_seed(seed)
+    return (np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (i,)) for i in range(count))
+
+def root_seed(seed):
+    """
+    Returns seed as the np.random.SeedSequence that spawn_seeds and iter_seeds derive children from.
+    With None, the root is drawn from the global NumPy random state.
+    """
+    if seed is None:
+        seed = np.random.randint(0, 2**32, dtype=np.int64)
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(int(seed))
+
+def seed_label(seed):
+    """
+    Returns a short string that identifies a SeedSequence, e.g. "2024/3" for the fourth child of
+    seed 2024: its entropy followed by its spawn key. parse_seed turns it back into the seed.
+    """
+    return "/".join(str(part) for part in (seed.entropy,) + tuple(seed.spawn_key))
+
+def parse_seed(label):
+    """Returns the np.random.SeedSequence described by a seed_label string"""
+    parts = [int(part) for part in label.split("/")]
+    return np.random.SeedSequence(parts[0], spawn_key=tuple(parts[1:]))
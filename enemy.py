@@ -1,20 +1,46 @@
 import numpy as np
 import time  # Add this import at the top
+from pathfinding import find_path, descend
+from entity_grid import PLAYER, adjacent_ids, entity_at, set_cell
+from stat_blocks import BASIC_ENEMY, stat, health
 
 class Enemy(object):
-    def __init__ (self, loc_y, loc_x, strategy, max_health=60):
+    # Fixed stats live in a shared StatBlock; instances only hold their own state
+    __slots__ = ('loc', 'strat', '_health', 'rng', 'stats', 'dice', 'entity_id', 'on_death')
+
+    armor_class = stat('armor_class')
+    proficiency_bonus = stat('proficiency_bonus')
+    strength = stat('strength')
+    damage_die = stat('damage_die')
+    attack_range = stat('attack_range')
+    speed = stat('speed')
+    health = health()
+
+    def __init__ (self, loc_y, loc_x, strategy, max_health=60, rng=None, stats=BASIC_ENEMY):
         self.loc = (loc_y, loc_x)
 
+        # Called with the agent when its health drops to 0 or below (Model.record_death)
+        self.on_death = None
+
         # Strategy for enemy: Either "attack_nearest", "attack_strongest", "attack_weakest", or "attack_uniform"
         self.strat = strategy
 
         # Enemy stats
-        self.health = np.random.randint(max(1, max_health - 30), max_health) # Random health between 30 and 60
-        self.armor_class = 10 # Number that must be rolled on attack to hit
-        self.strength = 4 # Damage bonus for attacks
-        self.damage_die = 8 # Damage die for attacks (d8)
-        self.speed = 6 # Number of grids not feet: 1 grid = 5 feet
-        self.proficiency_bonus = 0 # Proficiency bonus for attacks - Enemies have no proficiency by default
+        # Random health between max_health - 30 and max_health, from the Model's Generator when one is given
+        low = max(1, max_health - 30)
+        self.health = int(rng.integers(low, max_health)) if rng is not None else np.random.randint(low, max_health)
+
+        # Generator used for random target choices (np.random when None)
+        self.rng = rng
+
+        # Shared stat block (armor class, bonuses, damage die, range, speed)
+        self.stats = stats
+
+        # Model's DicePool; rolls fall back to np.random when the enemy is used on its own
+        self.dice = None
+
+        # Index in the Model's entity table, assigned by EntityRegistry.add
+        self.entity_id = None
 
     def roll(self, die, plus):
         """
@@ -25,73 +51,104 @@ class Enemy(object):
         Outputs:
         - result: integer result of the roll plus modifier
         """
+        if self.dice is not None:
+            return self.dice.roll(die) + plus
         return np.random.randint(1, die) + plus
 
-    def do_action(self, grid):
+    def do_action(self, grid, registry=None, fields=None, cache=None):
         """
         This function processes and executes the enemy's action based on their strategy.
+        If the model's registry is given, it is used to find players instead of scanning the grid.
+        If the model's DistanceFields are given, the enemy moves down a shared distance field
+        instead of searching its own path.
         """
         from player import Player
         # Find all players
-        players = []
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                cell = grid[y, x]
-                if isinstance(cell, Player):
-                    players.append(cell)
+        if registry is not None:
+            players = registry.get_players()
+        else:
+            players = []
+            for y in range(grid.shape[0]):
+                for x in range(grid.shape[1]):
+                    cell = grid[y, x]
+                    if isinstance(cell, Player):
+                        players.append(cell)
         if not players:
             return (0,0)  # No players to attack
 
         # Try to attack first
-        adj = self.adjacent_players(grid)
+        adj = self.adjacent_players(grid, registry)
         if adj:
             damage = self.attack(adj[0], grid)
             return (0,damage)  # Return damage dealt
 
         # If not adjacent, move toward target enemy
-        if self.strat == 'attack_nearest':
-            target_player = self.find_nearest_player(players)
-        elif self.strat == 'attack_strongest':
-            target_player = max(players, key=lambda p: p.health, default=None)
-        elif self.strat == 'attack_weakest':
-            target_player = min(players, key=lambda p: p.health, default=None)
-        elif self.strat == 'attack_uniform':
-            target_player = np.random.choice(players) if players else None
-
+        target_player = self.choose_target(players)
         if not target_player:
             return (0,0)  # No players to attack
         
-        if self.loc != target_player.loc:
-            self.move_towards(target_player.loc, grid)
+        if fields is not None:
+            # Nearest-attackers share the round's field over all players; others share one per target
+            if self.strat == 'attack_nearest':
+                targets, key = [player.loc for player in players if player.health > 0], "players"
+            else:
+                targets, key = [target_player.loc], target_player
+            movers = [enemy.loc for enemy in registry.enemies] if registry is not None else None
+            self.follow_field(fields.get(targets, key=key, movers=movers), grid, registry)
+        elif self.loc != target_player.loc:
+            self.move_towards(target_player.loc, grid, registry, cache)
             
         # After moving, try to attack if now adjacent
-        adj = self.adjacent_players(grid)
+        adj = self.adjacent_players(grid, registry)
         if adj:
             damage = self.attack(adj[0], grid)
             return (0,damage)  # Return damage dealt
         return (0,0)
 
+    def choose_target(self, players):
+        """
+        Picks the player to move towards according to the enemy's strategy.
+        Inputs:
+        players: list of living Player objects
+        Outputs:
+        - target: Player object, or None if there is none to pick
+        """
+        target_player = None
+        if self.strat == 'attack_nearest':
+            target_player = self.find_nearest_player(players)
+        elif self.strat == 'attack_strongest':
+            target_player = max(players, key=lambda p: p.health, default=None)
+        elif self.strat == 'attack_weakest':
+            target_player = min(players, key=lambda p: p.health, default=None)
+        elif self.strat == 'attack_uniform':
+            if self.rng is not None:
+                target_player = players[self.rng.integers(len(players))]
+            else:
+                target_player = np.random.choice(players) if players else None
+        return target_player
+
     def attack(self, player, grid):
         """
         This function simulates attacking an enemy, dealing damage based on the player's damage dice.
         Returns the amount of damage dealt.
         """
         # Get the raw d20 roll before modifiers
+        stats = self.stats
         raw_roll = self.roll(20, 0)
-        attack_roll = raw_roll + self.strength + self.proficiency_bonus
+        attack_roll = raw_roll + stats.strength + stats.proficiency_bonus
         damage = 0
         
         # Check if attack hits (either meets AC or is natural 20)
         is_critical = raw_roll == 20
-        if is_critical or attack_roll >= player.armor_class:
+        if is_critical or attack_roll >= player.stats.armor_class:
             # Roll base damage
-            damage_roll = self.roll(self.damage_die, 0)
+            damage_roll = self.roll(stats.damage_die, 0)
             
             # On critical hit, double the damage roll (not the modifier)
             if is_critical:
-                damage = (damage_roll * 2) + self.strength
+                damage = (damage_roll * 2) + stats.strength
             else:
-                damage = damage_roll + self.strength
+                damage = damage_roll + stats.strength
                 
             # Apply damage to enemy
             player.health -= damage
@@ -121,68 +178,69 @@ class Enemy(object):
                     nearest = player
         return nearest
 
-    def move_towards(self, target_loc, grid):
+    def move_towards(self, target_loc, grid, registry=None, cache=None):
         """
         Moves the enemy towards a target location using BFS pathfinding.
         If the preferred path is blocked, it will find alternative routes.
+        If a registry is given, its location map is kept in sync with the move.
+        If a PathCache is given, a still-valid route from an earlier turn is reused.
         """
         my_y, my_x = self.loc
         original_y, original_x = my_y, my_x  # Save original position
-        target_y, target_x = target_loc
 
         # Remove self from current position
-        grid[my_y, my_x] = None
+        set_cell(grid, (my_y, my_x), None)
 
-        # Use BFS to find path
-        def find_path():
-            queue = [(my_y, my_x, [])]
-            visited = set()
-            
-            while queue:
-                curr_y, curr_x, path = queue.pop(0)
-                
-                if (curr_y, curr_x) == (target_y, target_x):
-                    return path
-                    
-                if (curr_y, curr_x) not in visited:
-                    visited.add((curr_y, curr_x))
-                    
-                    # Check all adjacent squares
-                    for dy, dx in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ny, nx = curr_y + dy, curr_x + dx
-                        
-                        # Check if position is valid and unoccupied
-                        if (0 <= ny < grid.shape[0]) and \
-                           (0 <= nx < grid.shape[1]) and \
-                           (grid[ny, nx] is None or grid[ny, nx] == 0 or (ny, nx) == target_loc):
-                            new_path = path + [(ny, nx)]
-                            queue.append((ny, nx, new_path))
-            
-            return []  # Return empty path if no valid path found
-
-        # Find the best path
-        path = find_path()
+        # Find a shortest path, planning only as many steps as the enemy can move this turn
+        if cache is not None:
+            path = cache.find_path(self, grid, (my_y, my_x), target_loc, max_steps=self.stats.speed)
+        else:
+            path = find_path(grid, (my_y, my_x), target_loc, max_steps=self.stats.speed)
         if path:
             # Move along the path up to speed limit
-            for step in range(min(self.speed, len(path))):
-                my_y, my_x = path[step]
+            my_y, my_x = path[-1]
         else:
             # If no path found, return to original position
             my_y, my_x = original_y, original_x
 
         # Update enemy position
         self.loc = (my_y, my_x)
-        grid[my_y, my_x] = self
+        set_cell(grid, (my_y, my_x), self)
+        if registry is not None:
+            registry.move(self, (original_y, original_x))
+
+    def follow_field(self, field, grid, registry=None):
+        """
+        Moves the enemy down a distance field computed by the model, up to its speed.
+        The enemy stops next to its target rather than stepping onto it.
+        Inputs:
+        field: distance field from pathfinding.distance_field, shared with other enemies
+        grid: numpy array representing the game grid
+        registry: optional EntityRegistry kept in sync with the move
+        """
+        original_loc = self.loc
+        set_cell(grid, original_loc, None)
+        path = descend(field, grid, original_loc, self.stats.speed)
+        if path:
+            self.loc = path[-1]
+        set_cell(grid, self.loc, self)
+        if registry is not None:
+            registry.move(self, original_loc)
 
-    def adjacent_players(self, grid):
+    def adjacent_players(self, grid, registry=None):
         """
         Returns a list of adjacent Player objects.
         Inputs:
         self: Enemy object
         grid: numpy array representing the game grid
+        registry: EntityRegistry whose faction and entity tables resolve the ids of an id grid (None for object grids)
         Outputs:
         adjacent: list of Player objects that are adjacent to this enemy
         """
+        if registry is not None and grid.dtype != object:
+            # Id grid: compare ids against the faction table instead of resolving every neighbour
+            return [registry.entities[i] for i in adjacent_ids(grid, self.loc, registry.factions, PLAYER)]
+
         from player import Player
         adjacent = []
         my_y, my_x = self.loc
@@ -193,7 +251,7 @@ class Enemy(object):
             
             # Check if position is within grid bounds
             if (0 <= ny < grid.shape[0]) and (0 <= nx < grid.shape[1]):
-                cell = grid[ny, nx]
+                cell = entity_at(grid, ny, nx, registry.entities if registry is not None else None)
                 if isinstance(cell, Player):
                     adjacent.append(cell)
         
@@ -0,0 +1,107 @@
+import numpy as np
+
+# Marker for an empty cell in an id grid
+EMPTY = -1
+
+# Faction codes, as kept per entity id in the registry's faction table and by the array engines
+PLAYER = 0
+ENEMY = 1
+
+# Offsets of adjacent cells in the order they are checked (up, down, left, right), matching the agent classes
+ADJACENT_OFFSETS = [(-1,0), (1,0), (0,-1), (0,1)]
+
+def new_grid(height, width):
+    """Returns an empty id grid: an int32 array of entity ids with EMPTY (-1) in every cell"""
+    return np.full((height, width), EMPTY, dtype=np.int32)
+
+def entity_at(grid, y, x, entities=None):
+    """
+    Returns the entity in cell (y, x), or None if the cell is empty.
+    Object grids hold entities directly (with None or 0 for empty cells); id grids hold entity ids,
+    which are looked up in the entity table.
+    Inputs:
+    grid: object grid or id grid
+    y, x: cell coordinates
+    entities: entity table (list indexed by entity id), needed for id grids
+    Outputs:
+    - entity: Player or Enemy object, or None
+    """
+    cell = grid.item(y, x)
+    if grid.dtype == object:
+        return None if cell is None or cell == 0 else cell
+    return entities[cell] if cell >= 0 else None
+
+def adjacent_ids(grid, loc, factions, faction):
+    """
+    Returns the ids of the entities of one faction standing next to loc, in ADJACENT_OFFSETS order.
+    Only compares integers: the ids in the id grid against the faction table, without touching
+    the entities themselves.
+    Inputs:
+    grid: id grid
+    loc: (y, x) tuple of the cell to look around
+    factions: faction table (list of PLAYER or ENEMY indexed by entity id)
+    faction: PLAYER or ENEMY
+    Outputs:
+    - ids: list of entity ids
+    """
+    height, width = grid.shape
+    y, x = loc
+    ids = []
+    for dy, dx in ADJACENT_OFFSETS:
+        ny, nx = y + dy, x + dx
+        if 0 <= ny < height and 0 <= nx < width:
+            cell = grid.item(ny, nx)
+            if cell >= 0 and factions[cell] == faction:
+                ids.append(cell)
+    return ids
+
+def set_cell(grid, loc, entity):
+    """
+    Puts entity in the cell at loc, or empties the cell when entity is None.
+    Object grids store the entity itself (None for empty); id grids store its entity_id (EMPTY for empty).
+    """
+    if grid.dtype == object:
+        grid[loc] = entity
+    else:
+        grid[loc] = EMPTY if entity is None else entity.entity_id
+
+def to_object_grid(grid, entities):
+    """
+    Converts an id grid to the object grid layout used before id grids: entities in their cells
+    and 0 in empty cells.
+    Inputs:
+    grid: id grid
+    entities: entity table (list indexed by entity id)
+    Outputs:
+    - object_grid: numpy array of dtype object
+    """
+    object_grid = np.zeros(grid.shape, dtype=object)
+    occupied = grid >= 0
+    table = np.empty(len(entities), dtype=object)
+    table[:] = entities
+    object_grid[occupied] = table[grid[occupied]]
+    return object_grid
+
+class EntityGrid(object):
+    """
+    Read-only view of an id grid that behaves like the old object grid: indexing a cell returns
+    the entity standing there, or 0 if the cell is empty. Lets visualization and tests keep working
+    with entities while the Model stores ids.
+    """
+    def __init__(self, grid, entities):
+        self.grid = grid
+        self.entities = entities
+        self.shape = grid.shape
+
+    def __getitem__(self, loc):
+        entity = entity_at(self.grid, loc[0], loc[1], self.entities)
+        return 0 if entity is None else entity
+
+    @property
+    def flat(self):
+        """Iterates over the cells in row-major order, like numpy's ndarray.flat"""
+        return iter(to_object_grid(self.grid, self.entities).flat)
+
+    def to_array(self):
+        """Returns a copy of the grid as an object array (see to_object_grid)"""
+        return to_object_grid(self.grid, self.entities)
@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+import numpy as np
+import matplotlib.pyplot as plt
+from model import battle_rounds
+from visualize import grid_arrays, render_frame, draw_frame
+
+class FrameSnapshot(object):
+    """
+    Compact copy of what a frame needs from a Model after one round: the occupied cells of its
+    id grid and the faction and health of the entity in each (see visualize.grid_arrays), so it
+    can be drawn while the battle goes on, or long after. Its size grows with the number of
+    agents, not with the grid area.
+    """
+    __slots__ = ("round", "message", "shape", "cells", "is_player", "health", "enemy_health")
+
+    def __init__(self, model, round):
+        self.round = round
+        self.message = model.message
+        ids, is_player, health = grid_arrays(model.entity_grid)
+        self.shape = ids.shape
+        # Flat indexes of the occupied cells, and the entity standing in each
+        self.cells = np.flatnonzero(ids >= 0).astype(np.int32)
+        who = ids.ravel()[self.cells]
+        self.is_player = is_player[who]
+        self.health = health[who]
+        self.enemy_health = model.enemy_max_health
+
+    def render(self):
+        """Returns the snapshot's RGB frame (see visualize.render_frame)"""
+        ids = np.full(self.shape, -1, dtype=np.int64)
+        ids.flat[self.cells] = np.arange(len(self.cells))
+        return render_frame(ids, self.is_player, self.health, enemy_health=self.enemy_health)
+
+class FrameQueue(object):
+    """
+    Bounded queue of frames between a simulation thread and a renderer that never blocks the
+    simulation: put drops the oldest waiting frame when the queue is full, and get hands out
+    the newest frame, dropping any older ones. The renderer so always shows the latest state,
+    and the last frame of a battle is never dropped.
+    """
+    def __init__(self, maxsize=2):
+        self.frames = deque(maxlen=maxsize)
+        self.ready = threading.Condition()
+        self.closed = False
+
+        # Frames put and frames dropped without being handed out
+        self.produced = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        """Adds a frame, dropping the oldest waiting one if the queue is full"""
+        with self.ready:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(frame)
+            self.produced += 1
+            self.ready.notify()
+
+    def close(self):
+        """Marks the end of the frames; get returns None once the queue is empty"""
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+
+    def get(self):
+        """Waits for a frame and returns the newest one, or None after close"""
+        with self.ready:
+            while not self.frames and not self.closed:
+                self.ready.wait()
+            if not self.frames:
+                return None
+            frame = self.frames.pop()
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            return frame
+
+def produce_frames(model, frames):
+    """Plays the battle to the end, putting a FrameSnapshot into frames after every round"""
+    try:
+        for round, _ in enumerate(battle_rounds(model), 1):
+            frames.put(FrameSnapshot(model, round))
+    finally:
+        frames.close()
+
+def show_live(model, visualize=True, pause=0, queue_size=2, on_frame=None):
+    """
+    Plays a battle in a background thread while this thread draws it, so the simulation runs at
+    full speed instead of waiting for every frame as show does. The renderer takes the newest
+    round each time it is ready and skips the rounds it fell behind on.
+    Matplotlib only draws from the thread that created the figure, so this must be called from
+    the main thread when visualizing.
+    Inputs:
+    model: Model to play, as for show
+    visualize: draw the frames; without it the same loop runs headless, with frames going only
+               to on_frame
+    pause: seconds each frame stays on screen (0 draws as fast as matplotlib can)
+    queue_size: frames that may wait for the renderer before the oldest is dropped
+    on_frame: optional function called with every FrameSnapshot the renderer takes
+    Outputs:
+    - stats: dict with "rounds" (frames produced), "rendered" and "dropped"
+    """
+    frames = FrameQueue(queue_size)
+    errors = []
+
+    def simulate():
+        try:
+            produce_frames(model, frames)
+        except BaseException as error:
+            errors.append(error)
+
+    if visualize:
+        plt.ion()  # Enable interactive mode
+        fig, ax = plt.subplots(figsize=(8, 8))
+        plt.show()
+
+    producer = threading.Thread(target=simulate, name="battle", daemon=True)
+    producer.start()
+    rendered = 0
+    try:
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            if visualize:
+                draw_frame(frame.render(), frame.message, ax, pause)
+            if on_frame is not None:
+                on_frame(frame)
+            rendered += 1
+    finally:
+        producer.join()
+        if visualize:
+            plt.close(fig)
+    if errors:
+        raise errors[0]
+    return {"rounds": frames.produced, "rendered": rendered, "dropped": frames.dropped}
@@ -0,0 +1,240 @@
+import math
+import numpy as np
+
+# z value of a two-sided 95% normal confidence interval
+Z_95 = 1.959963984540054
+
+class QuantileSketch(object):
+    """
+    Streaming quantile estimate with a fixed relative error (a DDSketch-style log histogram).
+    Values are counted in buckets whose bounds grow geometrically, so the memory used depends on
+    the range of the values, not on how many were added, and any quantile is reported within
+    relative_accuracy of a value that was actually seen. Sketches with the same accuracy merge
+    exactly by adding bucket counts, in any order.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        # Bucket index -> count, for positive values and for the magnitudes of negative values
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def bucket(self, magnitude):
+        """Returns the index of the bucket holding a positive magnitude"""
+        return math.ceil(math.log(magnitude) / self.log_gamma)
+
+    def value(self, index):
+        """Returns the value reported for a bucket: the point with equal relative error to both bounds"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, x):
+        """Counts one value"""
+        if x > 0:
+            store = self.positive
+        elif x < 0:
+            store = self.negative
+            x = -x
+        else:
+            self.zero_count += 1
+            self.count += 1
+            return
+        index = self.bucket(x)
+        store[index] = store.get(index, 0) + 1
+        self.count += 1
+
+    def add_array(self, values):
+        """Counts every value of a NumPy array (vectorized add)"""
+        values = np.asarray(values, dtype=float)
+        self.zero_count += int(np.count_nonzero(values == 0))
+        for store, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(magnitudes):
+                indexes = np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+                for index, count in zip(*(a.tolist() for a in np.unique(indexes, return_counts=True))):
+                    store[index] = store.get(index, 0) + count
+        self.count += len(values)
+
+    def merge(self, other):
+        """Adds the counts of another sketch with the same relative accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracies")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        """
+        Returns an estimate of the q-th quantile (0 <= q <= 1) of the values added, or nan if empty.
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        seen = 0
+        # Negative values from most to least negative, then zeros, then positive values
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self.value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self.value(index)
+        return self.value(max(self.positive))
+
+class RunningStat(object):
+    """
+    Constant-memory summary of one metric: count, mean, variance (Welford's algorithm),
+    min, max and a QuantileSketch. Two summaries merge into the summary of all their values
+    (Chan et al.'s parallel variance update), so workers can each keep one and combine them.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.total = 0.0 # Sum of the values; the mean is total / count
+        self.m2 = 0.0 # Sum of squared differences from the mean
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def add(self, x):
+        """Adds one value to the summary"""
+        x = float(x)
+        old_mean = self.mean if self.count else 0.0
+        self.count += 1
+        self.total += x
+        self.m2 += (x - old_mean) * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.sketch.add(x)
+
+    def add_array(self, values):
+        """Adds every value of a NumPy array, summarizing the array at once and merging it in"""
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        other = RunningStat(self.sketch.relative_accuracy)
+        other.count = len(values)
+        other.total = float(values.sum())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        other.sketch.add_array(values)
+        self.merge(other)
+
+    def merge(self, other):
+        """Adds the values summarized by another RunningStat into this one"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.m2 = other.m2
+        else:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / (self.count + other.count)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def variance(self):
+        """Returns the sample variance, or nan with fewer than two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def confidence_interval(self, z=Z_95):
+        """
+        Returns the normal-approximation confidence interval (low, high) of the mean.
+        With fewer than two values the spread is unknown and the interval is (-inf, inf).
+        """
+        if self.count < 2:
+            return (float('-inf'), float('inf'))
+        half_width = z * math.sqrt(max(self.variance(), 0.0) / self.count)
+        return (self.mean - half_width, self.mean + half_width)
+
+    def proportion_interval(self, scale=1.0, z=Z_95):
+        """
+        Returns the Wilson score confidence interval (low, high) of the mean, for a metric whose
+        values are all 0 or scale (e.g. 0 or 100 for a win percentage). Unlike the normal
+        approximation, it does not shrink to nothing when every value so far is the same.
+        With no values the interval is (-inf, inf).
+        """
+        if self.count == 0:
+            return (float('-inf'), float('inf'))
+        n = self.count
+        p = min(max(self.mean / scale, 0.0), 1.0)
+        denominator = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denominator
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        return (scale * max(center - half_width, 0.0), scale * min(center + half_width, 1.0))
+
+    def quantile(self, q):
+        """Returns an estimate of the q-th quantile, clamped to the exact min and max"""
+        if self.count == 0:
+            return float('nan')
+        return min(max(self.sketch.quantile(q), self.min), self.max)
+
+class MetricAggregator(object):
+    """
+    Streams per-run records into one RunningStat per metric, so summarizing any number of
+    runs takes constant memory. Aggregators of disjoint runs (e.g., one per worker process)
+    can be merged.
+    Metrics listed in proportions (name -> scale) only take the values 0 and scale, and get
+    Wilson intervals (see RunningStat.proportion_interval); the others get normal intervals.
+    """
+    def __init__(self, names, relative_accuracy=0.01, proportions=None):
+        self.names = list(names)
+        self.stats = {name: RunningStat(relative_accuracy) for name in self.names}
+        self.proportions = dict(proportions or {})
+
+    @property
+    def count(self):
+        """Number of records added"""
+        return self.stats[self.names[0]].count if self.names else 0
+
+    def add(self, values):
+        """Adds one record: a sequence with one value per name, in the order of names"""
+        for name, value in zip(self.names, values):
+            self.stats[name].add(value)
+
+    def add_columns(self, columns):
+        """Adds many records at once, given as a dict of name -> NumPy array of values"""
+        for name in self.names:
+            self.stats[name].add_array(columns[name])
+
+    def confidence_interval(self, name):
+        """Returns the 95% confidence interval (low, high) of the mean of one metric"""
+        if name in self.proportions:
+            return self.stats[name].proportion_interval(self.proportions[name])
+        return self.stats[name].confidence_interval()
+
+    def merge(self, other):
+        """Adds the records summarized by another aggregator over the same metrics"""
+        if other.names != self.names:
+            raise ValueError("Cannot merge aggregators over different metrics")
+        for name in self.names:
+            self.stats[name].merge(other.stats[name])
+
+    def summary(self):
+        """
+        Returns the means of the metrics, each followed by its 95% confidence interval.
+        Outputs:
+        - summary: dict of name -> mean and "<name> 95% CI" -> (low, high), plus "Runs", the
+          number of records
+        """
+        summary = {"Runs": self.count}
+        for name in self.names:
+            summary[name] = self.stats[name].mean
+            summary[name + " 95% CI"] = self.confidence_interval(name)
+        return summary
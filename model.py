@@ -1,14 +1,23 @@
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, islice
 from enemy import Enemy
 from player import Player
+from registry import EntityRegistry
+from pathfinding import DistanceFields, PathCache
+from lockstep import LockstepBattles
+from dice import DicePool, make_rng, iter_seeds, root_seed, seed_label
+from metrics import MetricAggregator
 import matplotlib.pyplot as plt
 from visualize import visualize_grid
+from entity_grid import new_grid, EMPTY, EntityGrid
 
 class Model(object):
-    def __init__(self, num_players=5, num_enemies=10, enemy_strategy='attack_nearest', enemy_max_health=60):
+    def __init__(self, num_players=5, num_enemies=10, enemy_strategy='attack_nearest', enemy_max_health=60, pathing='per_agent', path_cache=False, seed=None, grid_x=100, grid_y=100):
         # Grid dimensions
-        self.GRID_X = 100
-        self.GRID_Y = 100
+        self.GRID_X = grid_x
+        self.GRID_Y = grid_y
 
         # Number of players and enemies
         self.NUM_PLAYERS = num_players
@@ -19,7 +28,25 @@ class Model(object):
 
         self.enemy_strategy = enemy_strategy  # Default enemy strategy
         self.enemy_max_health = enemy_max_health  # Max health for enemies
-        self.grid = np.zeros((self.GRID_Y, self.GRID_X), dtype=object)
+
+        # Movement: 'per_agent' searches a path for every agent, 'distance_field' shares one
+        # distance field per chased faction (or target) each round (targets the nearest enemy by path instead)
+        self.pathing = pathing
+
+        # Reuse planned routes between turns (see pathfinding.PathCache); routes may then differ
+        # from a fresh search, so this is off by default
+        self.use_path_cache = path_cache
+
+        # All randomness in the battle (placement, initiative, health, dice and target choices) comes
+        # from this Generator. seed may be an int, a SeedSequence or a Generator; by default it is
+        # drawn from the global NumPy random state, so np.random.seed still makes battles reproducible
+        self.rng = make_rng(seed)
+
+        # Dice for every agent, drawn in blocks from the battle's Generator
+        self.dice = DicePool(self.rng)
+
+        # Grid of entity ids (EMPTY for empty cells); the entities live in self.registry.entities
+        self.grid = new_grid(self.GRID_Y, self.GRID_X)
 
         # Initiative order
         self.initiative_order = self.roll_initiative()
@@ -46,32 +73,50 @@ class Model(object):
         """
 
         initiative = []
-        # Initialize grid with zeros
-        self.grid = np.zeros((self.GRID_Y, self.GRID_X), dtype=object)
+        # Initialize an empty id grid
+        self.grid = new_grid(self.GRID_Y, self.GRID_X)
+
+        # Live index of the entities on the grid, shared with agents during their turns
+        self.registry = EntityRegistry()
+
+        # Entities that died since the last update_grid_state
+        self.dead_entities = []
+
+        # Distance fields shared by agents during a round, when pathing == 'distance_field'
+        self.fields = DistanceFields(self.grid) if self.pathing == 'distance_field' else None
+
+        # Routes planned by agents, with hit/miss counters, when path caching is enabled
+        self.path_cache = PathCache() if self.use_path_cache else None
         
         # Place exactly NUM_PLAYERS players
         placed_players = 0
         while placed_players < self.NUM_PLAYERS:
-            y = np.random.randint(0, self.GRID_Y)
-            x = np.random.randint(0, self.GRID_X)
-            if self.grid[y, x] == 0:  # Only place player if position is empty
-                player = Player(y, x, 'melee')
-                self.grid[y, x] = player  # Store the player object directly
+            y = int(self.rng.integers(0, self.GRID_Y))
+            x = int(self.rng.integers(0, self.GRID_X))
+            if self.grid[y, x] == EMPTY:  # Only place player if position is empty
+                player = Player(y, x, 'melee', rng=self.rng)
+                player.dice = self.dice
+                player.on_death = self.record_death
+                self.registry.add(player)  # Gives the player its entity id
+                self.grid[y, x] = player.entity_id
                 initiative.append(player)
                 placed_players += 1
         
         # Place exactly NUM_ENEMIES enemies
         placed_enemies = 0
         while placed_enemies < self.NUM_ENEMIES:
-            y = np.random.randint(0, self.GRID_Y)
-            x = np.random.randint(0, self.GRID_X)
-            if self.grid[y, x] == 0:  # Only place enemy if position is empty
-                enemy = Enemy(y, x, self.enemy_strategy, max_health=self.enemy_max_health)
-                self.grid[y, x] = enemy  # Store the enemy object directly
+            y = int(self.rng.integers(0, self.GRID_Y))
+            x = int(self.rng.integers(0, self.GRID_X))
+            if self.grid[y, x] == EMPTY:  # Only place enemy if position is empty
+                enemy = Enemy(y, x, self.enemy_strategy, max_health=self.enemy_max_health, rng=self.rng)
+                enemy.dice = self.dice
+                enemy.on_death = self.record_death
+                self.registry.add(enemy)  # Gives the enemy its entity id
+                self.grid[y, x] = enemy.entity_id
                 initiative.append(enemy)
                 placed_enemies += 1
         
-        np.random.shuffle(initiative)
+        self.rng.shuffle(initiative)
         return initiative
 
     def execute_turns(self):
@@ -79,30 +124,26 @@ class Model(object):
         # Create a copy since we'll be modifying the list while iterating
         current_initiative = self.initiative_order.copy()
         attacks_this_turn = 0
+
+        # Distance fields are recomputed lazily each round
+        if self.fields is not None:
+            self.fields.clear(self.grid)
         
         for agent in current_initiative:
             # Skip if agent is already dead
             if agent.health <= 0:
                 continue
                 
-            dmg_dealt, dmg_recieved = agent.do_action(self.grid)
+            dmg_dealt, dmg_recieved = agent.do_action(self.grid, self.registry, self.fields, self.path_cache)
             self.player_damage_dealt += dmg_dealt
             self.player_damage_received += dmg_recieved
             if dmg_dealt > 0 or dmg_recieved > 0:
                 attacks_this_turn += 1
-            
-            # Update stats
-            if isinstance(agent, Player):
-                if agent.health <= 0:
-                    self.players_killed += 1
-            elif isinstance(agent, Enemy):
-                if agent.health <= 0:
-                    self.enemies_killed += 1
     
         # Increment battle length once per full turn
         self.battle_length += 1
         
-        self.turn_living_agents.append(len(self.get_all_players()) + len(self.get_all_enemies()))
+        self.turn_living_agents.append(self.count_players() + self.count_enemies())
         self.turn_attacks.append(attacks_this_turn)
 
         # Remove dead entities from initiative order
@@ -120,101 +161,395 @@ class Model(object):
             "Rounds Taken": self.battle_length,
             "Avg Attacks per Turn": avg_attacks_per_turn,
             "Avg Entities Alive per Turn": avg_entities_alive,
-            "Players Survived": len(self.get_all_players()),
-            "Enemies Survived": len(self.get_all_enemies())
+            "Players Survived": self.count_players(),
+            "Enemies Survived": self.count_enemies()
         }
 
+    def record_death(self, entity):
+        """
+        Records an entity that has just died so update_grid_state can clear its cell. Every placed
+        entity's on_death hook calls it as soon as its health drops to 0 or below.
+        Inputs:
+        entity: Player or Enemy object whose health has dropped to 0 or below
+        """
+        if entity in self.dead_entities:
+            return
+        self.dead_entities.append(entity)
+        if isinstance(entity, Player):
+            self.players_killed += 1
+        elif isinstance(entity, Enemy):
+            self.enemies_killed += 1
+
     def update_grid_state(self):
         """
-        Cleans up the grid by removing dead entities and updating entity counts
+        Cleans up the grid by removing dead entities and updating entity counts.
+        Only the cells of recorded deaths are touched, so the cost scales with kills rather than grid area.
         """
-        for y in range(self.GRID_Y):
-            for x in range(self.GRID_X):
-                entity = self.grid[y, x]
-                if isinstance(entity, (Player, Enemy)) and entity.health <= 0:
-                    self.grid[y, x] = 0  # Use 0 instead of None for numpy array
+        for entity in self.dead_entities:
+            if self.grid[entity.loc] == entity.entity_id:
+                self.grid[entity.loc] = EMPTY
+            self.registry.remove(entity)
+        self.dead_entities = []
+
+    @property
+    def entity_grid(self):
+        """View of the id grid that returns entities (or 0 for empty cells), as the old object grid did"""
+        return EntityGrid(self.grid, self.registry.entities)
 
     def get_all_players(self):
         """Returns a list of all living players in the grid"""
-        return [cell for cell in self.grid.flat if isinstance(cell, Player)]
+        return self.registry.get_players()
 
     def get_all_enemies(self):
         """Returns a list of all living enemies in the grid"""
-        return [cell for cell in self.grid.flat if isinstance(cell, Enemy)]
+        return self.registry.get_enemies()
 
-def show(model, visualize = True):
+    def count_players(self):
+        """Returns the number of living players in the grid without building a list"""
+        return len(self.registry.players)
+
+    def count_enemies(self):
+        """Returns the number of living enemies in the grid without building a list"""
+        return len(self.registry.enemies)
+
+def battle_rounds(model):
     """
-    This function initializes the model and starts the battle simulation, 
-    visualizing the grid and updating it in real-time.
+    Plays a battle one round at a time: yields after every round (once its state and survivor
+    counts are up to date) and returns once one side has been wiped out.
     """
-    if visualize:
-        plt.ion()  # Enable interactive mode
-        fig, ax = plt.subplots(figsize=(8, 8))
-        plt.show()
-
-    # Simulation loop 
     while True:
         model.execute_turns()
         model.update_grid_state()
         model.battle_length += 1
-        model.player_survival_count = len(model.get_all_players())
-        model.enemy_survival_count = len(model.get_all_enemies())
-        if visualize:
-            visualize_grid(model.grid, message=model.message, ax=ax, pause=0.1, enemy_health=model.enemy_max_health)
-        
+        model.player_survival_count = model.count_players()
+        model.enemy_survival_count = model.count_enemies()
+        yield
+
         # Check if battle should end
-        if len(model.get_all_players()) == 0:
+        if model.player_survival_count == 0:
             # print("All players defeated. Enemies win.")
             break
-        if len(model.get_all_enemies()) == 0:
+        if model.enemy_survival_count == 0:
             # print("All enemies defeated. Players win!")
             break
+
+def show(model, visualize = True, pause = 0.1):
+    """
+    This function initializes the model and starts the battle simulation, 
+    visualizing the grid and updating it in real-time.
+    pause is the time each frame stays on screen, in seconds; 0 redraws as fast as possible.
+    Drawing and simulation take turns here; live_view.show_live runs them side by side.
+    """
+    if visualize:
+        plt.ion()  # Enable interactive mode
+        fig, ax = plt.subplots(figsize=(8, 8))
+        plt.show()
+
+    # Simulation loop 
+    for _ in battle_rounds(model):
+        if visualize:
+            visualize_grid(model.entity_grid, message=model.message, ax=ax, pause=pause, enemy_health=model.enemy_max_health)
     if visualize:  
         plt.close(fig)
     
-def batch_simulation(num_runs=10, num_players=5, num_enemies=10, enemy_strategy='attack_nearest', enemy_max_health=60):
-    results = []
-    player_wins = 0
-    for i in range(num_runs):
-        model = Model(num_players=num_players, num_enemies=num_enemies, enemy_strategy=enemy_strategy, enemy_max_health=enemy_max_health)
-        model.grid = np.zeros((model.GRID_Y, model.GRID_X), dtype=object)
-        model.initiative_order = model.roll_initiative()
-        show(model, visualize=False)
-        metrics = model.compute_metrics()
-        results.append(metrics)
-        # Count as a win if at least one player survived
-        if metrics["Players Survived"] > 0:
-            player_wins += 1
-    avg_metrics = {k: float(np.mean([m[k] for m in results])) for k in results[0]}
-    win_percentage = 100 * player_wins / num_runs
-    avg_metrics["Player Win %"] = win_percentage
-    return avg_metrics
+# Number of battles LockstepBattles advances together in batch_simulation(engine='lockstep')
+LOCKSTEP_BATCH = 256
+
+# Version of the battle rules, part of every ResultCache key. Bump it whenever a change alters
+# battle outcomes, so results cached by older code are not reused
+ENGINE_VERSION = 6
+
+# Metrics reported for every battle, in the order used by per-run records
+METRIC_NAMES = [
+    "Total Damage Dealt by Players",
+    "Total Damage Dealt by Enemies",
+    "Rounds Taken",
+    "Avg Attacks per Turn",
+    "Avg Entities Alive per Turn",
+    "Players Survived",
+    "Enemies Survived"
+]
+
+# Position of "Players Survived" in a record, used to count player wins
+SURVIVED = METRIC_NAMES.index("Players Survived")
+
+def run_battle(seed, params, engine='model'):
+    """
+    Runs one battle to completion without visualization. Used directly and by worker processes.
+    Inputs:
+    seed: seed of the battle (int or np.random.SeedSequence)
+    params: dict of Model keyword arguments
+    engine: 'model', the only engine that runs one battle at a time (see run_lockstep for 'lockstep')
+    Outputs:
+    - record: tuple of floats with one value per entry of METRIC_NAMES
+    """
+    if engine != 'model':
+        raise ValueError("Unknown engine %r: battles run one at a time only with 'model'" % engine)
+    model = Model(seed=seed, **params)
+    model.initiative_order = model.roll_initiative()
+    show(model, visualize=False)
+    metrics = model.compute_metrics()
+    return tuple(float(metrics[name]) for name in METRIC_NAMES)
+
+def run_battles(seeds, params, engine='model'):
+    """Runs a chunk of battles of one configuration and returns their records, in order"""
+    return [run_battle(seed, params, engine) for seed in seeds]
+
+def run_lockstep(seed, params, num_battles):
+    """
+    Runs num_battles battles together with LockstepBattles. Used directly and by worker processes.
+    Inputs:
+    seed: seed of the whole group of battles
+    params: dict of LockstepBattles keyword arguments
+    num_battles: number of battles in the group
+    Outputs:
+    - records: list of tuples like those returned by run_battle, one per battle
+    """
+    battles = LockstepBattles(num_battles, seed=seed, **params)
+    battles.run()
+    return [tuple(float(metrics[name]) for name in METRIC_NAMES) for metrics in battles.compute_metrics()]
+
+def metric_aggregator():
+    """Returns an empty MetricAggregator over METRIC_NAMES plus "Player Win %", a proportion in percent"""
+    return MetricAggregator(METRIC_NAMES + ["Player Win %"], proportions={"Player Win %": 100.0})
+
+def add_record(aggregator, record):
+    """
+    Streams one run_battle record into an aggregator from metric_aggregator.
+    A run counts as a player win (100 for Player Win %) if at least one player survived.
+    """
+    win = 100.0 if record[SURVIVED] > 0 else 0.0
+    aggregator.add(tuple(record) + (win,))
+
+def aggregate_metrics(records):
+    """
+    Averages per-run records into the metrics dict returned by batch_simulation.
+    Inputs:
+    records: iterable of tuples from run_battle, in run order
+    Outputs:
+    - avg_metrics: dict of mean metrics plus "Player Win %", each followed by its 95% confidence
+      interval under "<name> 95% CI"
+    """
+    aggregator = metric_aggregator()
+    for record in records:
+        add_record(aggregator, record)
+    return aggregator.summary()
+
+def ci_targets(target_ci):
+    """
+    Normalizes the target_ci argument of batch_simulation and run_sweep.
+    Inputs:
+    target_ci: None, a number (target width of the Player Win % interval, in percentage points)
+               or a dict of metric name -> target width of its 95% confidence interval
+    Outputs:
+    - targets: dict of metric name -> width, or None when no target is set
+    """
+    if target_ci is None:
+        return None
+    if not isinstance(target_ci, dict):
+        target_ci = {"Player Win %": target_ci}
+    names = metric_aggregator().names
+    for name in target_ci:
+        if name not in names:
+            raise ValueError("Unknown metric %r in target_ci: expected one of %s" % (name, names))
+    return dict(target_ci)
+
+def targets_met(aggregator, targets, min_runs):
+    """
+    Returns True once at least min_runs records were added and every target confidence interval
+    is at most as wide as its target. Checked after every record, in run order.
+    """
+    if aggregator.count < min_runs:
+        return False
+    for name, width in targets.items():
+        low, high = aggregator.confidence_interval(name)
+        if high - low > width:
+            return False
+    return True
+
+def result_key(cache, params, engine, seed, targets, min_runs, max_runs):
+    """
+    Returns the ResultCache key of a batch: a hash of its configuration, engine, ENGINE_VERSION,
+    seed and run counts, i.e. everything that determines its metrics.
+    """
+    params = dict(params)
+    if engine == 'model':
+        # Same defaults as batch_simulation, so batches and sweep configurations share entries
+        params.setdefault("pathing", 'per_agent')
+        params.setdefault("path_cache", False)
+    return cache.key({
+        "params": params,
+        "engine": engine,
+        "engine_version": ENGINE_VERSION,
+        "seed": seed_label(root_seed(seed)),
+        "target_ci": targets,
+        "min_runs": min_runs,
+        "max_runs": max_runs
+    })
+
+def ordered_results(tasks, workers=1, window=None):
+    """
+    Runs tasks and yields their results in task order.
+    With workers > 1, tasks run on a process pool with at most window (default 2 * workers)
+    of them submitted at a time, so tasks are created lazily and closing the generator early
+    cancels the ones that have not started.
+    Inputs:
+    tasks: iterable of (function, args) pairs
+    workers: number of worker processes (1 runs everything in this process)
+    """
+    if workers <= 1:
+        for function, args in tasks:
+            yield function(*args)
+        return
+    window = window or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        try:
+            for function, args in tasks:
+                in_flight.append(pool.submit(function, *args))
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+def print_progress(done, total):
+    """Progress callback for batch_simulation that prints the number of finished battles"""
+    print(f"Completed {done}/{total} battles", end="\r" if done < total else "\n")
+
+def batch_simulation(num_runs=10, num_players=5, num_enemies=10, enemy_strategy='attack_nearest', enemy_max_health=60, pathing='per_agent', path_cache=False, engine='model', seed=None, workers=1, progress=None, aggregator=None, target_ci=None, min_runs=30, max_runs=None, store=None, cache=None):
+    """
+    Runs num_runs independent battles and averages their metrics.
+    engine selects the simulation: 'model' for the object-based Model, or 'lockstep' to advance
+    LOCKSTEP_BATCH battles at a time with the struct-of-arrays LockstepBattles (pathing and
+    path_cache only apply to 'model').
+    seed is the root seed of the batch: battle i (or, for 'lockstep', group i) runs on its own
+    stream spawned from it, so the results only depend on seed (by default it is drawn from the
+    global NumPy random state).
+    workers > 1 spreads the battles over a process pool. Workers only send back per-run metric
+    records, which are aggregated in run order, so the results are identical for any worker count.
+    progress, if given, is called as progress(done, total) after every finished battle
+    (see print_progress).
+    Records are streamed into a MetricAggregator as battles finish, so memory does not grow with
+    num_runs. Every mean comes with its 95% confidence interval under "<name> 95% CI", and "Runs"
+    is the number of battles aggregated. Pass an aggregator (see metric_aggregator) to keep the
+    full summaries, e.g. to read quantiles or to merge several batches; records are added to it.
+    With target_ci (see ci_targets), the number of runs is adaptive: battles are added until every
+    targeted confidence interval is narrow enough, but never fewer than min_runs or more than
+    max_runs (num_runs by default). The stopping point only depends on seed, not on workers.
+    store, if given, is a ResultsStore that every aggregated battle is appended to, with its
+    configuration, the batch seed and its run index.
+    cache, if given, is a ResultCache: a seeded batch that was run before returns its cached
+    metrics without simulating, and new results are added to it. It is skipped when seed is None
+    or when an aggregator or store needs the individual battles.
+    """
+    params = {
+        "num_players": num_players,
+        "num_enemies": num_enemies,
+        "enemy_strategy": enemy_strategy,
+        "enemy_max_health": enemy_max_health
+    }
+    if engine == 'model':
+        params["pathing"] = pathing
+        params["path_cache"] = path_cache
+
+    targets = ci_targets(target_ci)
+    if targets is None:
+        min_runs = max_runs = num_runs
+    else:
+        max_runs = num_runs if max_runs is None else max_runs
+        min_runs = min(min_runs, max_runs)
+
+    key = None
+    if cache is not None and seed is not None and aggregator is None and store is None:
+        key = result_key(cache, params, engine, seed, targets, min_runs, max_runs)
+        metrics = cache.get(key)
+        if metrics is not None:
+            return metrics
+
+    seed = root_seed(seed)
+    if engine == 'lockstep':
+        # Battles are simulated LOCKSTEP_BATCH at a time, each batch on its own seed spawned from seed
+        sizes = [min(LOCKSTEP_BATCH, max_runs - first) for first in range(0, max_runs, LOCKSTEP_BATCH)]
+        tasks = zip(repeat(run_lockstep), zip(iter_seeds(seed, len(sizes)), repeat(params), sizes))
+    else:
+        # A few chunks per worker keeps the pool balanced without paying per-battle IPC
+        chunk = max(1, min_runs // (workers * 4)) if workers > 1 else 1
+        seeds = iter_seeds(seed, max_runs)
+        tasks = ((run_battles, (list(islice(seeds, chunk)), params, engine)) for _ in range(0, max_runs, chunk))
+
+    if aggregator is None:
+        aggregator = metric_aggregator()
+    first_count = aggregator.count
+    done = 0
+    stopped = False
+    results = ordered_results(tasks, workers)
+    for records in results:
+        for record in records:
+            add_record(aggregator, record)
+            if store is not None:
+                store.append(params, engine, seed_label(seed), done, record)
+            done += 1
+            if targets is not None and targets_met(aggregator, targets, min_runs + first_count):
+                stopped = True
+                break
+        if progress is not None:
+            progress(done, done if stopped else max_runs)
+        if stopped:
+            break
+    # Stops the workers if the targets were met early
+    results.close()
+    metrics = aggregator.summary()
+    if key is not None:
+        cache.put(key, metrics)
+    return metrics
 
 def experiment_varying_enemies_and_health(
     num_runs=100, 
     num_players=5, 
     enemy_numbers=[1, 3, 5, 7, 9, 11, 13], 
     enemy_strategies=['attack_nearest', 'attack_strongest', 'attack_weakest', 'attack_uniform'], 
-    enemy_healths=[30, 60, 120]
+    enemy_healths=[30, 60, 120],
+    seed=None,
+    workers=1,
+    target_ci=None,
+    min_runs=30,
+    store=None,
+    checkpoint=None,
+    cache=None
 ):
-    results = []
+    from sweep import run_sweep
+    configs = []
     for strategy in enemy_strategies:
         for health in enemy_healths:
             for num_enemies in enemy_numbers:
-                print(f"Running simulation with {num_enemies} enemies, strategy: {strategy}, health: {health}")
-                avg_metrics = batch_simulation(
-                    num_runs=num_runs,
-                    num_players=num_players,
-                    num_enemies=num_enemies,
-                    enemy_strategy=strategy,
-                    enemy_max_health=health
-                )
-                results.append({
-                    'strategy': strategy,
-                    'health': health,
-                    'num_enemies': num_enemies,
-                    **avg_metrics
+                configs.append({
+                    "num_players": num_players,
+                    "num_enemies": num_enemies,
+                    "enemy_strategy": strategy,
+                    "enemy_max_health": health
                 })
+
+    def report(index, metrics):
+        config = configs[index]
+        print(f"Finished simulation with {config['num_enemies']} enemies, strategy: {config['enemy_strategy']}, health: {config['enemy_max_health']}")
+
+    # All (config, run) pairs share one work queue; each config gets its own root seed spawned from seed.
+    # With target_ci, num_runs is the most runs a config gets (see batch_simulation).
+    # With a checkpoint directory, an interrupted experiment picks up where it stopped (see SweepCheckpoint)
+    sweep_metrics = run_sweep(configs, num_runs=num_runs, seed=seed, workers=workers, on_config_done=report,
+                              target_ci=target_ci, min_runs=min_runs, store=store, checkpoint=checkpoint,
+                              cache=cache)
+    results = []
+    for config, avg_metrics in zip(configs, sweep_metrics):
+        results.append({
+            'strategy': config["enemy_strategy"],
+            'health': config["enemy_max_health"],
+            'num_enemies': config["num_enemies"],
+            **avg_metrics
+        })
     # Plotting
     for metric in [
     "Total Damage Dealt by Players",
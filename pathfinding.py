@@ -0,0 +1,458 @@
+import numpy as np
+import heapq
+from collections import deque
+
+# Called as search_hook(search, cells) with the number of cells each search visited when set,
+# e.g. by profiling.PhaseProfiler. Left as None, it costs one check per search.
+search_hook = None
+
+# Neighbor order used by every search. The order matters: among equally short paths,
+# agents take the one whose first differing step comes earliest in this list.
+DIRECTIONS = [(-1,0), (1,0), (0,-1), (0,1)]
+
+def manhattan(loc1, loc2):
+    """Returns the Manhattan distance between two (y, x) locations"""
+    return abs(loc1[0] - loc2[0]) + abs(loc1[1] - loc2[1])
+
+def is_free(grid, y, x):
+    """
+    Returns True if the cell at (y, x) holds no entity.
+    Object grids mark empty cells with None or 0; integer grids of entity ids mark them with -1.
+    """
+    cell = grid.item(y, x)
+    if grid.dtype == object:
+        return cell is None or cell == 0
+    return cell < 0
+
+def _passable(grid, y, x, target):
+    # The target cell itself may always be entered, since reaching it ends the search
+    return (0 <= y < grid.shape[0]) and (0 <= x < grid.shape[1]) and \
+           ((y, x) == target or is_free(grid, y, x))
+
+def walled_off(grid, start, target, reach=0, limit=64):
+    """
+    Checks cheaply whether the goal cells around target are sealed off from start, by flood filling
+    outwards from them. A target surrounded by other agents would otherwise make a search from start
+    explore the whole grid before giving up.
+    Inputs:
+    grid: numpy array representing the game grid; the mover should already be removed from its cell
+    start: (y, x) location a search would start from
+    target: (y, x) location to move towards
+    reach: Manhattan distance from target at which a search would stop
+    limit: number of cells to fill before giving up on proving the goal is sealed off
+    Outputs:
+    - walled_off: True if no path from start can exist, False if one may exist
+    """
+    height, width = grid.shape
+    target_y, target_x = target
+    seen = set()
+    queue = deque()
+    for y in range(max(0, target_y - reach), min(height, target_y + reach + 1)):
+        span = reach - abs(y - target_y)
+        for x in range(max(0, target_x - span), min(width, target_x + span + 1)):
+            if (y, x) == start:
+                return False
+            if _passable(grid, y, x, target):
+                seen.add((y, x))
+                queue.append((y, x))
+    while queue:
+        if len(seen) > limit:
+            if search_hook is not None:
+                search_hook('walled_off', len(seen))
+            return False
+        curr_y, curr_x = queue.popleft()
+        for dy, dx in DIRECTIONS:
+            ny, nx = curr_y + dy, curr_x + dx
+            if (ny, nx) in seen or not _passable(grid, ny, nx, target):
+                continue
+            if (ny, nx) == start:
+                if search_hook is not None:
+                    search_hook('walled_off', len(seen))
+                return False
+            seen.add((ny, nx))
+            queue.append((ny, nx))
+    if search_hook is not None:
+        search_hook('walled_off', len(seen))
+    return True
+
+def bfs_path(grid, start, target, reach=0, bound=None):
+    """
+    Finds the shortest path from start to any cell within reach of target using breadth-first search.
+    Inputs:
+    grid: numpy array representing the game grid; the mover should already be removed from its cell
+    start: (y, x) location to search from
+    target: (y, x) location to move towards
+    reach: Manhattan distance from target at which the search stops (0 means the target cell itself)
+    bound: if given, cells whose distance from start plus Manhattan distance to the goal exceeds it are
+    not explored. Any bound at least as long as the shortest path returns the same path as no bound.
+    Outputs:
+    - path: list of (y, x) steps excluding start, or [] if start is already in reach or no path exists
+    """
+    if manhattan(start, target) <= reach:
+        return []
+
+    # Cells are marked visited when enqueued, and each cell stores the cell it was reached from
+    parents = {start: None}
+    queue = deque([(start, 0)])
+    while queue:
+        (curr_y, curr_x), dist = queue.popleft()
+        for dy, dx in DIRECTIONS:
+            ny, nx = curr_y + dy, curr_x + dx
+            if (ny, nx) in parents or not _passable(grid, ny, nx, target):
+                continue
+            to_goal = abs(ny - target[0]) + abs(nx - target[1]) - reach
+            if bound is not None and dist + 1 + max(0, to_goal) > bound:
+                continue
+            parents[(ny, nx)] = (curr_y, curr_x)
+            if to_goal <= 0:
+                # Walk the parent pointers back to rebuild the path
+                path = []
+                node = (ny, nx)
+                while node != start:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                if search_hook is not None:
+                    search_hook('bfs_path', len(parents))
+                return path
+            queue.append(((ny, nx), dist + 1))
+    if search_hook is not None:
+        search_hook('bfs_path', len(parents))
+    return []
+
+def astar_distance(grid, start, target, reach=0, bound=None):
+    """
+    Computes the length of the shortest path from start to any cell within reach of target using A*
+    with a Manhattan heuristic.
+    Inputs:
+    grid: numpy array representing the game grid; the mover should already be removed from its cell
+    start: (y, x) location to search from
+    target: (y, x) location to move towards
+    reach: Manhattan distance from target at which the search stops
+    bound: if given, paths longer than this are not explored and None is returned instead
+    Outputs:
+    - distance: number of steps in the shortest path, or None if there is no path (within bound)
+    """
+    height, width = grid.shape
+    object_grid = grid.dtype == object
+    target_y, target_x = target
+
+    h = max(0, abs(start[0] - target_y) + abs(start[1] - target_x) - reach)
+    if bound is not None and h > bound:
+        return None
+
+    # Ties on f are broken towards smaller h, so open ground is crossed in a straight line.
+    # This is the hottest loop in a battle, so the heuristic and passability checks are inlined.
+    best_g = {start: 0}
+    heap = [(h, h, start)]
+    while heap:
+        f, h, node = heapq.heappop(heap)
+        g = f - h
+        if h == 0:
+            if search_hook is not None:
+                search_hook('astar_distance', len(best_g))
+            return g
+        if g > best_g[node]:
+            continue
+        curr_y, curr_x = node
+        ng = g + 1
+        for dy, dx in DIRECTIONS:
+            ny, nx = curr_y + dy, curr_x + dx
+            if not (0 <= ny < height and 0 <= nx < width):
+                continue
+            if ny != target_y or nx != target_x:
+                cell = grid.item(ny, nx)
+                if (cell is not None and cell != 0) if object_grid else cell >= 0:
+                    continue
+            if ng >= best_g.get((ny, nx), ng + 1):
+                continue
+            nh = max(0, abs(ny - target_y) + abs(nx - target_x) - reach)
+            if bound is not None and ng + nh > bound:
+                continue
+            best_g[(ny, nx)] = ng
+            heapq.heappush(heap, (ng + nh, nh, (ny, nx)))
+    if search_hook is not None:
+        search_hook('astar_distance', len(best_g))
+    return None
+
+def monotone_path(grid, start, target, reach=0):
+    """
+    Returns the path bfs_path would return when some shortest path is as short as the Manhattan
+    heuristic. Every step of such a path brings the mover closer to the target, so a depth-first
+    search that only takes those steps, trying them in DIRECTIONS order (vertical before horizontal)
+    and remembering cells that lead nowhere, finds the wanted path after visiting about as many
+    cells as the path is long instead of the whole rectangle between start and target.
+    Inputs:
+    grid: numpy array representing the game grid
+    start: (y, x) location to search from
+    target: (y, x) location to move towards
+    reach: Manhattan distance from target at which the search stops
+    Outputs:
+    - path: list of (y, x) steps excluding start, or None if every such path is blocked
+    """
+    target_y, target_x = target
+    step_y = 1 if target_y > start[0] else -1
+    step_x = 1 if target_x > start[1] else -1
+    remaining = abs(start[0] - target_y) + abs(start[1] - target_x) - reach
+    object_grid = grid.dtype == object
+
+    path = []
+    dead_ends = set()
+    # Next move to try from each cell on the path (starting with start): 0 vertical, 1 horizontal, 2 none left
+    tried = [0]
+    y, x = start
+    while len(path) < remaining:
+        move = tried[-1]
+        tried[-1] += 1
+        if move == 0:
+            if y == target_y:
+                continue
+            next_y, next_x = y + step_y, x
+        elif move == 1:
+            if x == target_x:
+                continue
+            next_y, next_x = y, x + step_x
+        else:
+            # Every way on from this cell is blocked
+            tried.pop()
+            if not path:
+                if search_hook is not None:
+                    search_hook('monotone_path', len(dead_ends))
+                return None
+            dead_ends.add(path.pop())
+            y, x = path[-1] if path else start
+            continue
+        # Steps stay inside the rectangle between start and target, so they never leave the grid
+        if (next_y, next_x) in dead_ends:
+            continue
+        if next_y != target_y or next_x != target_x:
+            cell = grid.item(next_y, next_x)
+            if not ((cell is None or cell == 0) if object_grid else cell < 0):
+                continue
+        path.append((next_y, next_x))
+        tried.append(0)
+        y, x = next_y, next_x
+    if search_hook is not None:
+        search_hook('monotone_path', len(path) + len(dead_ends))
+    return path
+
+def find_path(grid, start, target, reach=0, max_steps=None):
+    """
+    Returns the first max_steps steps of the path bfs_path would return, without searching the rest
+    of the way to a distant target.
+    The path bfs_path returns is the shortest path whose steps come earliest in DIRECTIONS order.
+    Inputs:
+    grid: numpy array representing the game grid; the mover should already be removed from its cell
+    start: (y, x) location to search from
+    target: (y, x) location to move towards
+    reach: Manhattan distance from target at which the search stops
+    max_steps: number of steps to plan (e.g. the mover's speed); None plans the full path
+    Outputs:
+    - path: list of (y, x) steps excluding start, or [] if start is already in reach or no path exists
+    """
+    # Fast path: if some shortest path is as short as the Manhattan heuristic, the wanted path is
+    # one of those that get closer with every step (see monotone_path)
+    if manhattan(start, target) <= reach:
+        return []
+    path = monotone_path(grid, start, target, reach)
+    if path is not None:
+        return path[:max_steps]
+
+    # Otherwise find the true path length, and search breadth-first only the cells that can lie on
+    # a path that short
+    if walled_off(grid, start, target, reach):
+        return []
+    distance = astar_distance(grid, start, target, reach)
+    if not distance:
+        return []
+    return bfs_path(grid, start, target, reach, bound=distance)[:max_steps]
+
+def distance_field(grid, sources, reach=0, stops=None):
+    """
+    Computes how many steps every cell is from the nearest cell within reach of any source, with a
+    multi-source breadth-first search that advances a whole level of the grid at a time using
+    array operations.
+    Occupied cells get a distance but are never walked through, so each agent can read its own
+    distance from the cell it stands on.
+    Inputs:
+    grid: numpy array representing the game grid
+    sources: list of (y, x) target locations
+    reach: Manhattan distance from a source at which a cell counts as a goal (0 means the source cell,
+    which may then be entered even though it is occupied)
+    stops: optional list of (y, x) locations whose distances are needed (e.g. the movers'); the search
+    ends once all of them have one, leaving -1 in cells farther away than the farthest of them
+    Outputs:
+    - field: int array shaped like grid holding step counts, with -1 for unreachable cells
+    """
+    height, width = grid.shape
+    if grid.dtype == object:
+        free = np.equal(grid, 0) | np.equal(grid, None)
+    else:
+        free = grid < 0
+    field = np.full((height, width), -1, dtype=np.int64)
+
+    goals = np.zeros((height, width), dtype=bool)
+    for source_y, source_x in sources:
+        for y in range(max(0, source_y - reach), min(height, source_y + reach + 1)):
+            span = reach - abs(y - source_y)
+            goals[y, max(0, source_x - span):source_x + span + 1] = True
+    field[goals] = 0
+    frontier = goals & free
+    if reach == 0 and sources:
+        frontier[tuple(np.array(sources).T)] = True
+    unreached = ~goals
+    pending = tuple(np.array(stops).T) if stops else None
+
+    # Each pass labels every unreached neighbor of the frontier, i.e. the next level of the search
+    distance = 0
+    reached = np.empty_like(frontier)
+    while frontier.any():
+        if pending is not None and not unreached[pending].any():
+            break
+        distance += 1
+        reached[:] = False
+        reached[1:] |= frontier[:-1]
+        reached[:-1] |= frontier[1:]
+        reached[:, 1:] |= frontier[:, :-1]
+        reached[:, :-1] |= frontier[:, 1:]
+        reached &= unreached
+        field[reached] = distance
+        unreached &= ~reached
+        frontier = reached & free
+    return field
+
+def descend(field, grid, start, max_steps):
+    """
+    Walks downhill on a distance field, taking the first free neighbor in DIRECTIONS order that is one
+    step closer, until a goal is reached, max_steps is used up or no free downhill neighbor is left.
+    Inputs:
+    field: distance field from distance_field
+    grid: numpy array representing the game grid; the mover should already be removed from its cell
+    start: (y, x) location to walk from
+    max_steps: maximum number of steps to take
+    Outputs:
+    - path: list of (y, x) steps excluding start, or [] if start is a goal or cannot reach one
+    """
+    path = []
+    curr_y, curr_x = start
+    while len(path) < max_steps and field[curr_y, curr_x] > 0:
+        next_dist = field[curr_y, curr_x] - 1
+        for dy, dx in DIRECTIONS:
+            ny, nx = curr_y + dy, curr_x + dx
+            if (0 <= ny < grid.shape[0]) and (0 <= nx < grid.shape[1]) and \
+               field[ny, nx] == next_dist and is_free(grid, ny, nx):
+                break
+        else:
+            # Every downhill neighbor has been taken since the field was computed
+            break
+        curr_y, curr_x = ny, nx
+        path.append((curr_y, curr_x))
+    return path
+
+class DistanceFields(object):
+    """
+    Per-round cache of distance fields, so that all agents heading for the same targets share one
+    search. The Model clears it at the start of every round; fields are computed lazily on first use.
+    A field requested under a key (e.g. the faction being chased) is computed once, from the targets'
+    locations when the first mover asks for it, and reused by every later mover that round even if
+    the targets have moved since. Movers so head for where their targets stood at most one round ago,
+    and steps onto cells occupied since are still refused by descend.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.fields = {}
+
+    def clear(self, grid=None):
+        """Drops all cached fields, optionally switching to a new grid"""
+        if grid is not None:
+            self.grid = grid
+        self.fields = {}
+
+    def get(self, sources, reach=0, key=None, movers=None):
+        """
+        Returns the distance field towards the given source locations, computing it if needed.
+        Inputs:
+        sources: list of (y, x) target locations
+        reach: Manhattan distance from a source at which a cell counts as a goal
+        key: hashable name the field is shared under for the rest of the round; if None, fields
+             are shared only by requests with the same sources
+        movers: optional locations of every agent that may follow the field this round; the field
+                is then only computed as far out as the farthest of them (see distance_field)
+        Outputs:
+        - field: int array from distance_field
+        """
+        key = (tuple(sorted(sources)) if key is None else key, reach)
+        if key not in self.fields:
+            self.fields[key] = distance_field(self.grid, sources, reach, movers)
+        return self.fields[key]
+
+class PathCache(object):
+    """
+    Remembers the route each agent planned towards its target, so an agent chasing a distant
+    target can keep walking the same route on later turns instead of searching again.
+    A route is reused only while the agent is where the route left it, the target is within
+    tolerance of where it was when the route was planned, no cell left on the route has become
+    occupied, and the target has not stepped onto the route (which would lead the agent onto or
+    past it).
+    """
+    def __init__(self, tolerance=2):
+        self.tolerance = tolerance
+        self.routes = {}  # agent -> (start, planned target, remaining route)
+        self.hits = 0
+        self.misses = 0
+
+    def find_path(self, agent, grid, start, target, reach=0, max_steps=None):
+        """
+        Returns the next max_steps steps towards target for agent, from its cached route if still valid.
+        Inputs:
+        agent: Player or Enemy object that is moving, used as the cache key
+        grid: numpy array representing the game grid; the mover should already be removed from its cell
+        start: (y, x) location the agent is moving from
+        target: (y, x) location to move towards
+        reach: Manhattan distance from target at which the agent stops
+        max_steps: number of steps the agent can take this turn; None returns the whole route
+        Outputs:
+        - path: list of (y, x) steps excluding start, or [] if start is already in reach or no path exists
+        """
+        if manhattan(start, target) <= reach:
+            self.routes.pop(agent, None)
+            return []
+
+        entry = self.routes.get(agent)
+        if entry is not None and self._is_valid(entry, grid, start, target, reach):
+            self.hits += 1
+            _, planned_target, route = entry
+        else:
+            self.misses += 1
+            planned_target = target
+            route = find_path(grid, start, target, reach)
+
+        if max_steps is None:
+            max_steps = len(route)
+        path = route[:max_steps]
+
+        # Keep whatever is left of the route for the agent's next turn
+        if path and len(route) > len(path):
+            self.routes[agent] = (path[-1], planned_target, route[len(path):])
+        else:
+            self.routes.pop(agent, None)
+        return path
+
+    def hit_rate(self):
+        """Returns the fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _is_valid(self, entry, grid, start, target, reach):
+        route_start, planned_target, route = entry
+        if route_start != start or manhattan(planned_target, target) > self.tolerance:
+            return False
+        last = len(route) - 1
+        for i, (y, x) in enumerate(route):
+            if (y, x) == target:
+                # Only a route that ends on the target itself (reach 0) may enter its cell
+                if reach > 0 or i < last:
+                    return False
+            elif not is_free(grid, y, x):
+                return False
+        return True
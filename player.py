@@ -1,27 +1,51 @@
 import numpy as np
 import time  # Add this import at the top
+from pathfinding import find_path, descend
+from entity_grid import ENEMY, adjacent_ids, entity_at, set_cell
+from stat_blocks import MELEE_PC, RANGED_PC, stat, health
 
 class Player(object):
-    def __init__(self, loc_y, loc_x, strategy):
+    # Fixed stats live in a shared StatBlock; instances only hold their own state
+    __slots__ = ('loc', 'strat', '_health', 'stats', 'dice', 'entity_id', 'on_death')
+
+    # Default stat block for each strategy
+    STAT_BLOCKS = {"melee": MELEE_PC, "ranged": RANGED_PC}
+
+    armor_class = stat('armor_class')
+    proficiency_bonus = stat('proficiency_bonus')
+    strength = stat('strength')
+    damage_die = stat('damage_die')
+    attack_range = stat('attack_range')
+    speed = stat('speed')
+    health = health()
+
+    def __init__(self, loc_y, loc_x, strategy, rng=None, stats=None):
 
         # Initialize player location
         self.loc = (loc_y, loc_x)
 
+        # Called with the agent when its health drops to 0 or below (Model.record_death)
+        self.on_death = None
+
         # Strategy for player: Either "melee" or "ranged"
         self.strat = strategy
 
         # Player stats
-        self.health = np.random.randint(30,60) # Random health between 30 and 60
-        self.armor_class = 14 # Number that must be rolled on attack to hit
-        self.proficiency_bonus = 2 # Proficiency bonus for attacks - Players have +2 by default
-        self.strength = 4 # Damage bonus for attacks
-        if(self.strat == "melee"):
-            self.damage_die = 8 # Damage die for melee attacks (d8)
-            self.attack_range = 1 # distance that a melee attack can reach
-        elif(self.strat == "ranged"):
-            self.damage_die = 4 # Damage die for ranged attacks (d4)
-            self.attack_range = 12 # distance that a ranged attack can reach
-        self.speed = 6 # number of grids not feet: 1 grid = 5 feet
+        # Random health between 30 and 60, from the Model's Generator when one is given
+        self.health = int(rng.integers(30,60)) if rng is not None else np.random.randint(30,60)
+
+        # Shared stat block (armor class, bonuses, damage die, range, speed), by default the one for the strategy
+        if stats is None:
+            if strategy not in self.STAT_BLOCKS:
+                raise ValueError("Unknown player strategy %r: expected one of %s" % (strategy, sorted(self.STAT_BLOCKS)))
+            stats = self.STAT_BLOCKS[strategy]
+        self.stats = stats
+
+        # Model's DicePool; rolls fall back to np.random when the player is used on its own
+        self.dice = None
+
+        # Index in the Model's entity table, assigned by EntityRegistry.add
+        self.entity_id = None
 
     def roll(self, die, plus):
         """
@@ -32,25 +56,30 @@ class Player(object):
         Outputs:
         - result: integer result of the roll plus modifier
         """
+        if self.dice is not None:
+            return self.dice.roll(die) + plus
         return np.random.randint(1, die) + plus
 
-    def do_action(self, grid):
+    def do_action(self, grid, registry=None, fields=None, cache=None):
         if self.health <= 0:
             return (0,0)
 
         from enemy import Enemy
-        # Find all enemies
-        enemies = []
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                cell = grid[y, x]
-                if isinstance(cell, Enemy):
-                    enemies.append(cell)
+        # Find all enemies, using the model's registry when one is provided
+        if registry is not None:
+            enemies = registry.get_enemies()
+        else:
+            enemies = []
+            for y in range(grid.shape[0]):
+                for x in range(grid.shape[1]):
+                    cell = grid[y, x]
+                    if isinstance(cell, Enemy):
+                        enemies.append(cell)
         if not enemies:
             return (0,0)  # No enemies to attack
 
         # Try to attack first
-        adj = self.adjacent_enemies(grid)
+        adj = self.adjacent_enemies(grid, registry)
         if adj:
             damage = self.attack(adj[0], grid)
             return (damage,0)  # Return damage dealt
@@ -60,15 +89,17 @@ class Player(object):
         if not nearest_enemy:
             return (0,0)  # No enemies to attack
         
-        # Save original speed for dash
-        original_speed = self.speed
-        self.speed = original_speed * 2
+        # Dash: move at double speed this turn
+        steps = self.stats.speed * 2
             
-        if self.loc != nearest_enemy.loc:
-            self.move_towards(nearest_enemy.loc, grid)
-            
-        # Reset speed back to original
-        self.speed = original_speed
+        if fields is not None:
+            # Head down the round's field over all enemies towards whichever is closest by path
+            targets = [enemy.loc for enemy in enemies if enemy.health > 0]
+            movers = [player.loc for player in registry.players] if registry is not None else None
+            field = fields.get(targets, self.ideal_range(), key="enemies", movers=movers)
+            self.follow_field(field, grid, registry, steps)
+        elif self.loc != nearest_enemy.loc:
+            self.move_towards(nearest_enemy.loc, grid, registry, cache, steps)
         
         # No attack allowed after dashing
         return (0,0)
@@ -102,94 +133,104 @@ class Player(object):
         Returns the amount of damage dealt.
         """
         # Get the raw d20 roll before modifiers
+        stats = self.stats
         raw_roll = self.roll(20, 0)
-        attack_roll = raw_roll + self.strength + self.proficiency_bonus
+        attack_roll = raw_roll + stats.strength + stats.proficiency_bonus
         damage = 0
         
         # Check if attack hits (either meets AC or is natural 20)
         is_critical = raw_roll == 20
-        if is_critical or attack_roll >= enemy.armor_class:
+        if is_critical or attack_roll >= enemy.stats.armor_class:
             # Roll base damage
-            damage_roll = self.roll(self.damage_die, 0)
+            damage_roll = self.roll(stats.damage_die, 0)
             
             # On critical hit, double the damage roll (not the modifier)
             if is_critical:
-                damage = (damage_roll * 2) + self.strength
+                damage = (damage_roll * 2) + stats.strength
             else:
-                damage = damage_roll + self.strength
+                damage = damage_roll + stats.strength
                 
             # Apply damage to enemy
             enemy.health -= damage
             
         return damage
 
-    def move_towards(self, target_loc, grid):
+    def move_towards(self, target_loc, grid, registry=None, cache=None, steps=None):
         """
         Moves the player towards a target location using BFS pathfinding.
         Takes into account the player's strategy (melee vs ranged) for ideal positioning.
+        If a registry is given, its location map is kept in sync with the move.
+        If a PathCache is given, a still-valid route from an earlier turn is reused.
+        The player moves up to steps cells (its speed by default).
         """
+        if steps is None:
+            steps = self.stats.speed
         my_y, my_x = self.loc
-        target_y, target_x = target_loc
         original_y, original_x = my_y, my_x  # Save original position
 
         # Remove self from current position
-        grid[my_y, my_x] = None
+        set_cell(grid, (my_y, my_x), None)
 
         # Calculate ideal range based on strategy
-        ideal_range = 1 if self.strat == "melee" else self.attack_range - 1
+        ideal_range = self.ideal_range()
 
-        def find_path():
-            queue = [(my_y, my_x, [])]
-            visited = set()
-            
-            while queue:
-                curr_y, curr_x, path = queue.pop(0)
-                curr_dist = abs(curr_y - target_y) + abs(curr_x - target_x)
-                
-                # Return path if we've reached ideal range
-                if curr_dist <= ideal_range:
-                    return path
-                    
-                if (curr_y, curr_x) not in visited:
-                    visited.add((curr_y, curr_x))
-                    
-                    # Check all adjacent squares
-                    for dy, dx in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ny, nx = curr_y + dy, curr_x + dx
-                        
-                        # Check if position is valid and unoccupied
-                        if (0 <= ny < grid.shape[0]) and \
-                           (0 <= nx < grid.shape[1]) and \
-                           (grid[ny, nx] is None or grid[ny, nx] == 0):
-                            new_path = path + [(ny, nx)]
-                            queue.append((ny, nx, new_path))
-            
-            return []  # Return empty path if no valid path found
+        # Plan only as many steps as the player can move this turn
+        if cache is not None:
+            path = cache.find_path(self, grid, (my_y, my_x), target_loc, reach=ideal_range, max_steps=steps)
+        else:
+            path = find_path(grid, (my_y, my_x), target_loc, reach=ideal_range, max_steps=steps)
 
-        # Find the best path
-        path = find_path()
-        
         if path:
             # Move along the path up to speed limit
-            for step in range(min(self.speed, len(path))):
-                my_y, my_x = path[step]
+            my_y, my_x = path[-1]
         else:
             # If no path found, return to original position
             my_y, my_x = original_y, original_x
 
         # Update player position
         self.loc = (my_y, my_x)
-        grid[my_y, my_x] = self
+        set_cell(grid, (my_y, my_x), self)
+        if registry is not None:
+            registry.move(self, (original_y, original_x))
 
-    def adjacent_enemies(self, grid):
+    def follow_field(self, field, grid, registry=None, steps=None):
+        """
+        Moves the player down a distance field computed by the model, up to its speed.
+        Inputs:
+        field: distance field from pathfinding.distance_field, shared by the player's faction
+        grid: numpy array representing the game grid
+        registry: optional EntityRegistry kept in sync with the move
+        steps: cells to move at most (the player's speed by default)
+        """
+        if steps is None:
+            steps = self.stats.speed
+        original_loc = self.loc
+        set_cell(grid, original_loc, None)
+        path = descend(field, grid, original_loc, steps)
+        if path:
+            self.loc = path[-1]
+        set_cell(grid, self.loc, self)
+        if registry is not None:
+            registry.move(self, original_loc)
+
+    def ideal_range(self):
+        """Returns the distance from its target the player tries to reach, based on its strategy"""
+        return 1 if self.strat == "melee" else self.stats.attack_range - 1
+
+    def adjacent_enemies(self, grid, registry=None):
         """
         Returns a list of adjacent Enemy objects.
         Inputs:
         self: Player object
         grid: numpy array representing the game grid
+        registry: EntityRegistry whose faction and entity tables resolve the ids of an id grid (None for object grids)
         Outputs:
         adjacent: list of Enemy objects that are adjacent to this player
         """
+        if registry is not None and grid.dtype != object:
+            # Id grid: compare ids against the faction table instead of resolving every neighbour
+            return [registry.entities[i] for i in adjacent_ids(grid, self.loc, registry.factions, ENEMY)]
+
         from enemy import Enemy
         adjacent = []
         my_y, my_x = self.loc
@@ -202,7 +243,7 @@ class Player(object):
             
             # Check if position is within grid bounds
             if (0 <= ny < grid.shape[0]) and (0 <= nx < grid.shape[1]):
-                cell = grid[ny, nx]
+                cell = entity_at(grid, ny, nx, registry.entities if registry is not None else None)
                 if isinstance(cell, Enemy):
                     adjacent.append(cell)
         
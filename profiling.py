@@ -0,0 +1,183 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pathfinding
+from player import Player
+from enemy import Enemy
+from registry import EntityRegistry
+from model import Model, run_battle
+from dice import spawn_seeds
+
+# Phases a round's time is attributed to, and the methods whose calls make up each phase
+PHASES = {
+    "opponent scan": [(EntityRegistry, "get_players"), (EntityRegistry, "get_enemies"),
+                      (Player, "adjacent_enemies"), (Enemy, "adjacent_players")],
+    "target selection": [(Player, "find_nearest_enemy"), (Enemy, "choose_target")],
+    "movement": [(Player, "move_towards"), (Enemy, "move_towards"),
+                 (Player, "follow_field"), (Enemy, "follow_field")],
+    "attack": [(Player, "attack"), (Enemy, "attack")],
+    "update_grid_state": [(Model, "update_grid_state")],
+}
+
+# Whole turns, used to report the time execute_turns spends outside the phases above
+TOTAL = (Model, "execute_turns")
+
+class PhaseProfiler(object):
+    """
+    Attributes the wall time and call counts of battles to the phases in PHASES, and counts the
+    cells visited by each pathfinding search.
+    While installed (with install() or as a context manager), the phase methods are replaced
+    by timed wrappers on their classes; uninstalled, the simulation runs its plain methods, so
+    profiling costs nothing when it is not used. Only one profiler can be installed at a time,
+    and it times every battle run in this process meanwhile.
+    Profilers of different battles (e.g., from worker processes) can be merged.
+    """
+    def __init__(self):
+        self.time = dict.fromkeys(list(PHASES) + ["execute_turns"], 0.0)
+        self.calls = dict.fromkeys(self.time, 0)
+
+        # Search -> number of calls and cells visited (see pathfinding.search_hook)
+        self.searches = {}
+        self.cells = {}
+
+        # Battles profiled
+        self.battles = 0
+
+        # Original methods while installed, as (class, name, method)
+        self.originals = []
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def timed(self, phase, method):
+        """Returns a wrapper of method that adds its wall time and call to phase"""
+        time_spent, calls, clock = self.time, self.calls, time.perf_counter
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                time_spent[phase] += clock() - start
+                calls[phase] += 1
+        wrapper.__wrapped__ = method
+        return wrapper
+
+    def count_search(self, search, cells):
+        """search_hook that counts a pathfinding search and the cells it visited"""
+        self.searches[search] = self.searches.get(search, 0) + 1
+        self.cells[search] = self.cells.get(search, 0) + cells
+
+    def install(self):
+        """Replaces the phase methods with timed wrappers and returns the profiler"""
+        if pathfinding.search_hook is not None:
+            raise RuntimeError("Another PhaseProfiler is already installed")
+        targets = [(phase, cls, name) for phase, methods in PHASES.items() for cls, name in methods]
+        for phase, cls, name in targets + [("execute_turns",) + TOTAL]:
+            method = cls.__dict__[name]
+            self.originals.append((cls, name, method))
+            setattr(cls, name, self.timed(phase, method))
+        pathfinding.search_hook = self.count_search
+        return self
+
+    def uninstall(self):
+        """Puts the original methods back"""
+        for cls, name, method in reversed(self.originals):
+            setattr(cls, name, method)
+        self.originals = []
+        pathfinding.search_hook = None
+
+    def merge(self, other):
+        """Adds the timings and counts of another profiler into this one"""
+        for phase in self.time:
+            self.time[phase] += other.time[phase]
+            self.calls[phase] += other.calls[phase]
+        for search in other.searches:
+            self.searches[search] = self.searches.get(search, 0) + other.searches[search]
+            self.cells[search] = self.cells.get(search, 0) + other.cells[search]
+        self.battles += other.battles
+
+    def __getstate__(self):
+        # Wrappers are not sent to other processes, only the counts
+        state = dict(self.__dict__)
+        state["originals"] = []
+        return state
+
+    def summary(self):
+        """
+        Returns the profile as a dict: for every phase its total seconds, calls and share of the
+        battle time (execute_turns plus update_grid_state), "other" for the rest of execute_turns,
+        and the calls and cells visited of every pathfinding search.
+        """
+        inside_turns = sum(self.time[phase] for phase in PHASES if phase != "update_grid_state")
+        total = self.time["execute_turns"] + self.time["update_grid_state"]
+        phases = {phase: (self.time[phase], self.calls[phase]) for phase in PHASES}
+        phases["other"] = (max(0.0, self.time["execute_turns"] - inside_turns), self.calls["execute_turns"])
+        return {
+            "battles": self.battles,
+            "seconds": total,
+            "phases": {phase: {"seconds": seconds, "calls": calls, "share": seconds / total if total else 0.0}
+                       for phase, (seconds, calls) in phases.items()},
+            "searches": {search: {"calls": self.searches[search], "cells": self.cells[search]}
+                         for search in sorted(self.searches)},
+        }
+
+    def report(self):
+        """Returns the profile as a printable table"""
+        summary = self.summary()
+        lines = ["%d battle(s), %.3f s in turns" % (summary["battles"], summary["seconds"]),
+                 "%-18s %10s %7s %10s %12s" % ("phase", "seconds", "share", "calls", "us/call")]
+        for phase, row in summary["phases"].items():
+            per_call = 1e6 * row["seconds"] / row["calls"] if row["calls"] else 0.0
+            lines.append("%-18s %10.4f %6.1f%% %10d %12.2f" % (phase, row["seconds"], 100 * row["share"], row["calls"], per_call))
+        lines.append("%-18s %10s %10s %12s" % ("search", "calls", "cells", "cells/call"))
+        for search, row in summary["searches"].items():
+            lines.append("%-18s %10d %10d %12.1f" % (search, row["calls"], row["cells"], row["cells"] / row["calls"]))
+        return "\n".join(lines)
+
+def profile_battle(seed, params):
+    """
+    Runs one battle of the object-based Model with a PhaseProfiler installed.
+    Inputs:
+    seed: seed of the battle
+    params: dict of Model keyword arguments
+    Outputs:
+    - record: tuple of metrics, as returned by run_battle
+    - profiler: PhaseProfiler of the battle
+    """
+    with PhaseProfiler() as profiler:
+        record = run_battle(seed, params)
+    profiler.battles = 1
+    return record, profiler
+
+def profile_sweep(configs, num_runs=10, seed=None, workers=1):
+    """
+    Profiles the battles a run_sweep of configs would run (same seeds), one profiler per battle,
+    and merges them into one profiler per configuration and one for the whole sweep.
+    Inputs:
+    configs: list of dicts of Model parameters
+    num_runs: battles per configuration
+    seed: root seed of the sweep
+    workers: number of worker processes (1 runs everything in this process)
+    Outputs:
+    - total: PhaseProfiler of the whole sweep
+    - per_config: list of PhaseProfilers, in the order of configs
+    """
+    per_config = [PhaseProfiler() for _ in configs]
+    jobs = [(index, battle_seed) for index, config_seed in enumerate(spawn_seeds(seed, len(configs)))
+            for battle_seed in spawn_seeds(config_seed, num_runs)]
+    indexes = [index for index, _ in jobs]
+    seeds = [battle_seed for _, battle_seed in jobs]
+    params = [configs[index] for index in indexes]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            profiles = list(pool.map(profile_battle, seeds, params, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        profiles = list(map(profile_battle, seeds, params))
+    for index, (_, profiler) in zip(indexes, profiles):
+        per_config[index].merge(profiler)
+    total = PhaseProfiler()
+    for profiler in per_config:
+        total.merge(profiler)
+    return total, per_config
@@ -0,0 +1,86 @@
+from enemy import Enemy
+from player import Player
+from entity_grid import PLAYER, ENEMY
+
+class EntityRegistry(object):
+    """
+    Live index of every entity standing on the grid, maintained by the Model so agents
+    can look up their opponents without scanning every cell of the grid.
+    It also holds the entity table that the Model's id grid refers to: every entity gets an
+    entity_id when first added, and entities[entity_id] is that entity for the rest of the battle.
+    """
+    def __init__(self):
+        # Per-faction rosters. Dicts are used as insertion-ordered sets so that
+        # iteration order never depends on object ids.
+        self.players = {}
+        self.enemies = {}
+
+        # Location -> entity map for every registered entity
+        self.locations = {}
+
+        # Entity table, indexed by entity_id; entities stay in it after they die
+        self.entities = []
+
+        # Faction table (PLAYER or ENEMY), indexed by entity_id like the entity table, so id grids
+        # can be checked for opponents by comparing integers
+        self.factions = []
+
+    def add(self, entity):
+        """
+        Registers an entity at its current location, giving it an entity_id if it has none yet.
+        Inputs:
+        entity: Player or Enemy object that has just been placed on the grid
+        """
+        roster = self._roster(entity)
+        if entity.entity_id is None:
+            entity.entity_id = len(self.entities)
+            self.entities.append(entity)
+            self.factions.append(PLAYER if roster is self.players else ENEMY)
+        roster[entity] = None
+        self.locations[entity.loc] = entity
+
+    def move(self, entity, old_loc):
+        """
+        Updates the index after an entity has moved, mirroring the grid writes made by move_towards:
+        whatever stood at old_loc is cleared, and the entity replaces whatever stands at its new loc.
+        Inputs:
+        entity: Player or Enemy object whose loc has already been updated
+        old_loc: (y, x) tuple the entity moved away from
+        """
+        self._evict(old_loc)
+        self._evict(entity.loc)
+        self.add(entity)
+
+    def remove(self, entity):
+        """
+        Removes an entity (typically a dead one) from its roster and the location map.
+        Inputs:
+        entity: Player or Enemy object to remove
+        """
+        self._roster(entity).pop(entity, None)
+        if self.locations.get(entity.loc) is entity:
+            del self.locations[entity.loc]
+
+    def at(self, loc):
+        """Returns the entity standing at loc, or None if the cell is empty"""
+        return self.locations.get(loc)
+
+    def get_players(self):
+        """Returns registered players in row-major grid order, matching a full grid scan"""
+        return sorted(self.players, key=lambda p: p.loc)
+
+    def get_enemies(self):
+        """Returns registered enemies in row-major grid order, matching a full grid scan"""
+        return sorted(self.enemies, key=lambda e: e.loc)
+
+    def _evict(self, loc):
+        occupant = self.locations.pop(loc, None)
+        if occupant is not None:
+            self._roster(occupant).pop(occupant, None)
+
+    def _roster(self, entity):
+        if isinstance(entity, Player):
+            return self.players
+        if isinstance(entity, Enemy):
+            return self.enemies
+        raise TypeError(f"Cannot register object of type {type(entity).__name__}")
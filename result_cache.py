@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+class ResultCache(object):
+    """
+    Persistent cache of batch_simulation metrics in a directory, one small JSON file per entry.
+    Entries are addressed by a hash of everything that determines the result (see key), so
+    a repeated configuration is read back instead of simulated again. The least recently used
+    entries (by file modification time, refreshed on every hit) are evicted once the cache
+    grows past max_bytes.
+    """
+    def __init__(self, path, max_bytes=64 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, fields):
+        """
+        Returns the cache key of a result: the SHA-256 of its fields as canonical JSON.
+        Inputs:
+        fields: dict of JSON-serializable values that fully determine the result (configuration,
+                seed, run counts, engine version)
+        Outputs:
+        - key: hex digest string
+        """
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, key):
+        """Returns the cached metrics dict for key, or None on a miss"""
+        path = self.entry_path(key)
+        try:
+            with open(path) as f:
+                metrics = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Marks the entry as recently used
+        os.utime(path)
+        # JSON has no tuples: confidence intervals come back as lists
+        return {name: tuple(value) if isinstance(value, list) else value for name, value in metrics.items()}
+
+    def put(self, key, metrics):
+        """Stores a metrics dict under key, then evicts old entries if the cache is too big"""
+        # Written under a temporary name and renamed, so readers never see a partial entry
+        temporary = os.path.join(self.path, "writing_" + key)
+        with open(temporary, "w") as f:
+            json.dump(metrics, f)
+        os.replace(temporary, self.entry_path(key))
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.path, name))
+                entries.append((stat.st_mtime_ns, name, stat.st_size))
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= size
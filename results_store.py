@@ -0,0 +1,147 @@
+import os
+import numpy as np
+from model import METRIC_NAMES, SURVIVED, metric_aggregator
+
+# Configuration columns stored with every battle, in record order. pathing and path_cache change
+# outcomes too, so battles run with different settings never fall into the same group
+CONFIG_COLUMNS = ["num_players", "num_enemies", "enemy_strategy", "enemy_max_health", "pathing", "path_cache"]
+
+# Values of the configuration columns that a config may leave out (e.g. lockstep configs, which
+# always plan paths per agent without a cache), as batch_simulation's defaults
+CONFIG_DEFAULTS = {"pathing": 'per_agent', "path_cache": False}
+
+# Columns that identify a battle: engine, seed of its batch (see dice.seed_label) and run index
+# in the batch. With the 'model' engine, the battle ran on child run of the batch
+# seed; with 'lockstep', it is battle run % LOCKSTEP_BATCH of group run // LOCKSTEP_BATCH.
+RUN_COLUMNS = ["engine", "seed", "run"]
+
+COLUMNS = CONFIG_COLUMNS + RUN_COLUMNS + METRIC_NAMES
+
+class ResultsStore(object):
+    """
+    Append-only columnar store of per-battle records in a directory of compressed .npz shards.
+    Every shard holds one NumPy array per column (see COLUMNS) for up to shard_size battles.
+    Battles are buffered in memory and written a shard at a time; queries read one shard at
+    a time, so their memory use depends on the shard size, not on how many battles are stored.
+    Use it as a context manager (or call flush) so the last partial shard is written.
+    """
+    def __init__(self, path, shard_size=100000):
+        self.path = path
+        self.shard_size = shard_size
+        os.makedirs(path, exist_ok=True)
+
+        # Rows waiting to be written, as tuples in COLUMNS order
+        self.buffer = []
+
+        # Shards already on disk; new shards are numbered after them
+        self.num_shards = len(self.shard_paths())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def shard_paths(self):
+        """Returns the paths of the shards on disk, in the order they were written"""
+        names = sorted(name for name in os.listdir(self.path) if name.startswith("shard_") and name.endswith(".npz"))
+        return [os.path.join(self.path, name) for name in names]
+
+    def append(self, config, engine, seed, run, record):
+        """
+        Adds one battle to the store.
+        Inputs:
+        config: dict of batch_simulation parameters (see CONFIG_COLUMNS and CONFIG_DEFAULTS)
+        engine: engine that ran the battle
+        seed: seed_label of the batch seed
+        run: index of the battle in its batch
+        record: tuple of metrics from run_battle
+        """
+        values = tuple(config[name] if name in config else CONFIG_DEFAULTS[name] for name in CONFIG_COLUMNS)
+        self.buffer.append(values + (engine, seed, run) + tuple(record))
+        if len(self.buffer) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered battles as a new shard"""
+        if not self.buffer:
+            return
+        columns = list(zip(*self.buffer))
+        arrays = {name: np.asarray(column) for name, column in zip(COLUMNS, columns)}
+        path = os.path.join(self.path, "shard_%06d.npz" % self.num_shards)
+        # Written under a temporary name and renamed, so readers never see a partial shard
+        temporary = os.path.join(self.path, "writing_%06d.npz" % self.num_shards)
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, path)
+        self.num_shards += 1
+        self.buffer = []
+
+    def __len__(self):
+        """Number of battles in the store, including buffered ones"""
+        stored = 0
+        for path in self.shard_paths():
+            with np.load(path) as shard:
+                stored += len(shard["run"])
+        return stored + len(self.buffer)
+
+    def shards(self, columns=None):
+        """
+        Yields the stored battles one shard at a time.
+        Inputs:
+        columns: names of the columns to load (all by default)
+        Outputs:
+        - shard: dict of column name -> NumPy array
+        Shards written before a configuration column existed get its CONFIG_DEFAULTS value.
+        """
+        self.flush()
+        for path in self.shard_paths():
+            with np.load(path) as shard:
+                size = len(shard["run"])
+                yield {name: shard[name] if name in shard.files else np.full(size, CONFIG_DEFAULTS[name])
+                       for name in (columns or COLUMNS)}
+
+    def aggregate(self, by, where=None):
+        """
+        Summarizes the stored battles per group without loading the whole store.
+        Inputs:
+        by: column name or list of column names to group by (e.g., "enemy_strategy" or
+            ["enemy_strategy", "enemy_max_health", "num_enemies"])
+        where: optional dict of column name -> value or list of values that battles must match
+        Outputs:
+        - groups: dict of group value (a tuple when by is a list) -> MetricAggregator, whose
+          summary() matches batch_simulation's metrics over the group's battles
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        where = where or {}
+        groups = {}
+        for shard in self.shards(keys + [name for name in where if name not in keys] + METRIC_NAMES):
+            mask = np.ones(len(shard[METRIC_NAMES[0]]), dtype=bool)
+            for name, allowed in where.items():
+                allowed = allowed if isinstance(allowed, (list, tuple, set)) else [allowed]
+                mask &= np.isin(shard[name], list(allowed))
+
+            # One integer code per combination of key values in the shard
+            uniques, codes = [], np.zeros(int(mask.sum()), dtype=np.int64)
+            for name in keys:
+                values, inverse = np.unique(shard[name][mask], return_inverse=True)
+                uniques.append(values.tolist())
+                codes = codes * len(values) + inverse.ravel()
+            metrics = {name: shard[name][mask] for name in METRIC_NAMES}
+            metrics["Player Win %"] = np.where(metrics[METRIC_NAMES[SURVIVED]] > 0, 100.0, 0.0)
+
+            for code in np.unique(codes).tolist():
+                # Decode the combination back into key values, last key first
+                key, rest = [], code
+                for values in reversed(uniques):
+                    rest, position = divmod(rest, len(values))
+                    key.append(values[position])
+                key = tuple(reversed(key)) if len(keys) > 1 else key[0]
+                selected = codes == code
+                if key not in groups:
+                    groups[key] = metric_aggregator()
+                groups[key].add_columns({name: column[selected] for name, column in metrics.items()})
+        return groups
+
+    def group_by(self, by, where=None):
+        """Like aggregate, but returns each group's metrics dict (see MetricAggregator.summary)"""
+        return {key: aggregator.summary() for key, aggregator in self.aggregate(by, where).items()}
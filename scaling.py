@@ -0,0 +1,158 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from model import Model, show
+from dice import spawn_seeds
+
+# Default matrix: every grid size (GRID_X, GRID_Y) with every player count and enemy count
+GRID_SIZES = [(50, 50), (100, 100), (200, 200)]
+PLAYER_COUNTS = [5, 20]
+ENEMY_COUNTS = [10, 40]
+
+# Root seed of the matrix, so every run of the harness simulates the same battles
+SCALING_SEED = 2024
+
+# Factors the scaling exponents are fitted against, as functions of a case
+FACTORS = {
+    "area": lambda case: case["grid_x"] * case["grid_y"],
+    "players": lambda case: case["num_players"],
+    "enemies": lambda case: case["num_enemies"],
+}
+
+# Measurements the exponents are fitted for
+FITTED = ["seconds_per_battle", "seconds_per_round", "peak_bytes"]
+
+def run_case(grid, num_players, num_enemies, battles=3, seed=SCALING_SEED, memory=True):
+    """
+    Times whole battles of one matrix cell: Model plus show(visualize=False), as run_battle does.
+    Peak memory is measured on a separate run of the first battle, since tracing allocations
+    slows Python down too much to time under it.
+    Inputs:
+    grid: (GRID_X, GRID_Y) of the battles
+    num_players, num_enemies: agents placed in every battle
+    battles: number of battles, each on its own child of seed
+    seed: seed of the cell's battles
+    memory: whether to measure peak memory (peak_bytes is None otherwise)
+    Outputs:
+    - case: dict of the cell's parameters, battles, rounds, seconds, battles_per_second,
+      rounds_per_second, seconds_per_battle, seconds_per_round and peak_bytes (the most memory
+      allocated at once while building and running one battle)
+    """
+    grid_x, grid_y = grid
+    params = dict(num_players=num_players, num_enemies=num_enemies, grid_x=grid_x, grid_y=grid_y)
+    seeds = spawn_seeds(seed, battles)
+
+    rounds = 0
+    seconds = 0.0
+    for battle_seed in seeds:
+        start = time.perf_counter()
+        model = Model(seed=battle_seed, **params)
+        show(model, visualize=False)
+        seconds += time.perf_counter() - start
+        # battle_length counts every round twice (in execute_turns and in show)
+        rounds += model.battle_length // 2
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            model = Model(seed=seeds[0], **params)
+            show(model, visualize=False)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return dict(params, battles=battles, rounds=rounds, seconds=seconds,
+                battles_per_second=battles / seconds, rounds_per_second=rounds / seconds,
+                seconds_per_battle=seconds / battles, seconds_per_round=seconds / rounds,
+                peak_bytes=peak)
+
+def fit_exponents(cases, measure):
+    """
+    Fits measure ~ C * area^a * players^b * enemies^c by least squares on logarithms.
+    Factors that take a single value over the cases cannot be fitted and are left out.
+    Inputs:
+    cases: list of dicts from run_case
+    measure: key of the measurement to fit (see FITTED)
+    Outputs:
+    - exponents: dict of factor name -> fitted exponent (e.g. 1.0 for linear in the grid area)
+    """
+    rows = [case for case in cases if case[measure]]
+    factors = [name for name, value in FACTORS.items() if len({value(case) for case in rows}) > 1]
+    if not factors:
+        return {}
+    design = np.array([[1.0] + [np.log(FACTORS[name](case)) for name in factors] for case in rows])
+    target = np.log([case[measure] for case in rows])
+    coefficients = np.linalg.lstsq(design, target, rcond=None)[0]
+    return {name: float(exponent) for name, exponent in zip(factors, coefficients[1:])}
+
+def run_matrix(grid_sizes=None, player_counts=None, enemy_counts=None, battles=3, seed=SCALING_SEED, memory=True):
+    """
+    Runs run_case on every combination of grid size, player count and enemy count, and fits how
+    battle time, round time and peak memory scale with each of them.
+    Inputs:
+    grid_sizes: list of (GRID_X, GRID_Y) (GRID_SIZES by default)
+    player_counts, enemy_counts: lists of agent counts (PLAYER_COUNTS and ENEMY_COUNTS by default)
+    battles: battles per case
+    seed: root seed; case k runs on child k of it
+    memory: whether to measure peak memory
+    Outputs:
+    - report: dict with "meta" (versions, battles), "cases" (list of run_case dicts, in matrix
+      order) and "exponents": measurement -> factor -> fitted exponent (see fit_exponents)
+    """
+    matrix = [(grid, num_players, num_enemies) for grid in grid_sizes or GRID_SIZES
+              for num_players in player_counts or PLAYER_COUNTS
+              for num_enemies in enemy_counts or ENEMY_COUNTS]
+    cases = [run_case(grid, num_players, num_enemies, battles, case_seed, memory)
+             for (grid, num_players, num_enemies), case_seed in zip(matrix, spawn_seeds(seed, len(matrix)))]
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "battles": battles,
+    }
+    exponents = {measure: fit_exponents(cases, measure) for measure in FITTED}
+    return {"meta": meta, "cases": cases, "exponents": exponents}
+
+def parse_grid(text):
+    """Parses a grid size given as WIDTHxHEIGHT (or a single number for a square grid)"""
+    sides = [int(side) for side in text.lower().split("x")]
+    if len(sides) == 1:
+        sides *= 2
+    if len(sides) != 2 or min(sides) < 1:
+        raise argparse.ArgumentTypeError("grid size should look like 100x100, not %r" % text)
+    return tuple(sides)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput and scaling of whole battles over grid sizes and agent counts")
+    parser.add_argument("--grid", nargs="*", type=parse_grid, help="grid sizes, as WIDTHxHEIGHT")
+    parser.add_argument("--players", nargs="*", type=int, help="player counts")
+    parser.add_argument("--enemies", nargs="*", type=int, help="enemy counts")
+    parser.add_argument("--battles", type=int, default=3, help="battles per case")
+    parser.add_argument("--seed", type=int, default=SCALING_SEED, help="root seed of the battles")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_matrix(args.grid, args.players, args.enemies, args.battles, args.seed, not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+    print("%-10s %7s %7s %10s %10s %12s" % ("grid", "players", "enemies", "battles/s", "rounds/s", "peak KiB"))
+    for case in report["cases"]:
+        peak = "%12.1f" % (case["peak_bytes"] / 1024) if case["peak_bytes"] is not None else "%12s" % "-"
+        print("%-10s %7d %7d %10.2f %10.1f %s" % ("%dx%d" % (case["grid_x"], case["grid_y"]), case["num_players"],
+                                                 case["num_enemies"], case["battles_per_second"], case["rounds_per_second"], peak))
+    print()
+    for measure, exponents in report["exponents"].items():
+        if exponents:
+            print("%-20s %s" % (measure, "  ".join("%s^%.2f" % item for item in exponents.items())))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
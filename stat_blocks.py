@@ -0,0 +1,71 @@
+from operator import attrgetter
+
+class StatBlock(object):
+    """
+    Fixed combat stats shared by every agent of one kind (e.g., all melee PCs). Agents keep only
+    their mutable state (location, health) and read these stats through their stats attribute,
+    so a battle with thousands of agents holds one copy of each block.
+    Blocks are never changed in place: use replace() to derive a new block.
+    """
+    __slots__ = ('name', 'armor_class', 'proficiency_bonus', 'strength', 'damage_die', 'attack_range', 'speed')
+
+    def __init__(self, name, armor_class, proficiency_bonus, strength, damage_die, attack_range, speed):
+        self.name = name
+        self.armor_class = armor_class # Number that must be rolled on attack to hit
+        self.proficiency_bonus = proficiency_bonus # Proficiency bonus added to attack rolls
+        self.strength = strength # Damage bonus for attacks (also added to attack rolls)
+        self.damage_die = damage_die # Damage die for attacks (e.g., 8 for a d8)
+        self.attack_range = attack_range # Distance that an attack can reach
+        self.speed = speed # Number of grids not feet: 1 grid = 5 feet
+
+    def replace(self, **changes):
+        """
+        Returns a copy of the block with some stats changed.
+        Inputs:
+        changes: stat names and their new values (e.g., speed=3)
+        Outputs:
+        - block: new StatBlock; this block is left untouched
+        """
+        stats = {slot: getattr(self, slot) for slot in self.__slots__}
+        stats.update(changes)
+        return StatBlock(**stats)
+
+    def __repr__(self):
+        return "StatBlock(%r)" % self.name
+
+# Stat blocks by name, for looking blocks up or defining new ones
+STAT_BLOCKS = {}
+
+def register(block):
+    """Adds a stat block to STAT_BLOCKS under its name and returns it"""
+    STAT_BLOCKS[block.name] = block
+    return block
+
+MELEE_PC = register(StatBlock("melee PC", armor_class=14, proficiency_bonus=2, strength=4, damage_die=8, attack_range=1, speed=6))
+RANGED_PC = register(StatBlock("ranged PC", armor_class=14, proficiency_bonus=2, strength=4, damage_die=4, attack_range=12, speed=6))
+BASIC_ENEMY = register(StatBlock("basic enemy", armor_class=10, proficiency_bonus=0, strength=4, damage_die=8, attack_range=1, speed=6))
+
+def stat(name):
+    """
+    Returns a property that reads a stat from an agent's stat block.
+    Reads go through a C-level attrgetter ("stats.<name>"), so they cost little more than a
+    plain attribute. Setting the stat gives that agent its own modified copy of the block, so
+    shared blocks never change (e.g., a test slowing down one enemy does not slow every enemy).
+    """
+    def set(agent, value):
+        agent.stats = agent.stats.replace(**{name: value})
+
+    return property(attrgetter("stats." + name), set, doc="%s from the agent's stat block" % name)
+
+def health():
+    """
+    Returns a property for an agent's health, stored in its _health slot. Reads go through a
+    C-level attrgetter; when a write drops health to 0 or below, the agent's on_death hook (set by
+    the Model) is called with the agent, so deaths are recorded where they happen.
+    """
+    def set(agent, value):
+        agent._health = value
+        if value <= 0 and agent.on_death is not None:
+            agent.on_death(agent)
+
+    return property(attrgetter("_health"), set, doc="current health; setting it to 0 or below reports a death")
@@ -0,0 +1,274 @@
+import heapq
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from dice import spawn_seeds, iter_seeds, seed_label, root_seed, parse_seed
+from model import run_battles, metric_aggregator, add_record, ci_targets, targets_met, result_key, ENGINE_VERSION
+
+def expected_cost(config):
+    """
+    Rough relative cost of one battle of a configuration: every agent acts each round, and the
+    number of rounds grows with the total enemy health the players have to get through.
+    Inputs:
+    config: dict of batch_simulation parameters (num_players, num_enemies, enemy_max_health)
+    Outputs:
+    - cost: number used to order work, largest first
+    """
+    num_agents = config.get("num_players", 5) + config.get("num_enemies", 10)
+    return num_agents * config.get("num_enemies", 10) * config.get("enemy_max_health", 60)
+
+class SweepCheckpoint(object):
+    """
+    Directory that records the finished work of a sweep so an interrupted sweep can resume.
+    manifest.json holds the sweep's root seed, engine, ENGINE_VERSION and configurations, so a
+    checkpoint made under other battle rules is rejected; every finished chunk of battles
+    (a configuration and a range of runs) is saved as its own .npy file of records.
+    All files are written under a temporary name and renamed, so a crash never leaves a
+    half-written file behind. A configuration keeps the seed it was first given, so a sweep can
+    be extended with more runs or new configurations and only the missing battles are run.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        self.manifest = None
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+        # Seed index -> {first run: unit file} for every saved chunk
+        self.units = {}
+        for name in os.listdir(path):
+            if name.startswith("unit_") and name.endswith(".npy"):
+                seed_index, first = (int(part) for part in name[len("unit_"):-len(".npy")].split("_"))
+                self.units.setdefault(seed_index, {})[first] = os.path.join(path, name)
+
+    def write_atomic(self, name, write):
+        """Calls write(file) on a temporary file and renames it to name once it is complete"""
+        temporary = os.path.join(self.path, "writing_" + name)
+        with open(temporary, "wb") as f:
+            write(f)
+        os.replace(temporary, os.path.join(self.path, name))
+
+    def assign_seeds(self, configs, seed, engine):
+        """
+        Returns the root seed of the sweep and the seed index of each configuration.
+        Configurations already in the checkpoint keep their index; new ones get the next free
+        indexes in order, so a fresh checkpoint gives configuration k index k, like run_sweep.
+        Inputs:
+        configs: list of configuration dicts
+        seed: root seed of the sweep (None resumes with the checkpoint's seed)
+        engine: engine of the sweep
+        Outputs:
+        - root: np.random.SeedSequence
+        - seed_indexes: list of ints, one per configuration
+        """
+        if self.manifest is None:
+            self.manifest = {"seed": seed_label(root_seed(seed)), "engine": engine,
+                             "engine_version": ENGINE_VERSION, "configs": []}
+        elif self.manifest.get("engine_version") != ENGINE_VERSION:
+            raise ValueError("Checkpoint %s was made under engine version %s, not %s"
+                             % (self.path, self.manifest.get("engine_version"), ENGINE_VERSION))
+        elif seed is not None and seed_label(root_seed(seed)) != self.manifest["seed"]:
+            raise ValueError("Checkpoint %s was made with seed %s" % (self.path, self.manifest["seed"]))
+        elif engine != self.manifest["engine"]:
+            raise ValueError("Checkpoint %s was made with engine %r" % (self.path, self.manifest["engine"]))
+
+        keys = [json.dumps(config, sort_keys=True) for config in self.manifest["configs"]]
+        seed_indexes = []
+        for config in configs:
+            key = json.dumps(config, sort_keys=True)
+            if key not in keys:
+                keys.append(key)
+                self.manifest["configs"].append(config)
+            seed_indexes.append(keys.index(key))
+        self.write_atomic("manifest.json", lambda f: f.write(json.dumps(self.manifest, indent=1).encode()))
+        return parse_seed(self.manifest["seed"]), seed_indexes
+
+    def load(self, seed_index):
+        """Returns the saved chunks of a configuration as a dict of first run -> list of records"""
+        return {first: [tuple(record) for record in np.load(path).tolist()]
+                for first, path in self.units.get(seed_index, {}).items()}
+
+    def save(self, seed_index, first, records):
+        """Saves a finished chunk of records of a configuration, starting at run first"""
+        name = "unit_%05d_%09d.npy" % (seed_index, first)
+        self.write_atomic(name, lambda f: np.save(f, np.array(records, dtype=float)))
+        self.units.setdefault(seed_index, {})[first] = os.path.join(self.path, name)
+
+def run_sweep(configs, num_runs=100, seed=None, workers=1, engine='model', chunk_runs=None, progress=None, on_config_done=None, target_ci=None, min_runs=30, max_runs=None, store=None, checkpoint=None, cache=None):
+    """
+    Runs num_runs battles of every configuration from one global work queue, so workers never
+    wait on a slow configuration while others sit idle.
+    Battles are grouped into chunks of chunk_runs runs of the same configuration, and chunks are
+    handed out largest expected cost first (see expected_cost). Each configuration's records are
+    streamed into its MetricAggregator in run order (chunks that finish early wait until the
+    chunks before them are in), and its metrics are reported as soon as its last battle finishes.
+    Configuration k uses the k-th seed spawned from seed as its batch seed, so its metrics equal
+    batch_simulation(seed=that seed, ...) for any worker count.
+    With target_ci, each configuration stops as soon as its targets are met, exactly like
+    batch_simulation with the same target_ci, min_runs and max_runs: only min_runs battles per
+    configuration are queued up front, and more are queued for the configurations that still
+    need them, so compute goes to the close configurations.
+    Inputs:
+    configs: list of dicts of batch_simulation parameters (num_players, num_enemies,
+             enemy_strategy, enemy_max_health and, for the 'model' engine, pathing, path_cache)
+    num_runs: battles per configuration
+    seed: root seed of the sweep
+    workers: number of worker processes (1 runs everything in this process)
+    engine: 'model', the engine battles are run and recorded with (see run_battle)
+    chunk_runs: battles per work item (defaults to a tenth of the battles queued up front)
+    progress: optional callable progress(done, total) called as battles finish
+    on_config_done: optional callable on_config_done(index, metrics) called as configurations finish
+    target_ci, min_runs, max_runs: adaptive run counts, see batch_simulation
+    store: optional ResultsStore that every battle run by this call is appended to
+    checkpoint: optional SweepCheckpoint (or its directory) that finished chunks are saved to.
+                Chunks already in it are reused instead of run again, so an interrupted sweep
+                resumes where it stopped, and a sweep with more runs or more configurations
+                only runs the new battles. Results equal an uninterrupted sweep
+    cache: optional ResultCache shared with batch_simulation: configurations whose results are
+           cached are not run, and finished ones are cached (skipped when a store is given)
+    Outputs:
+    - results: list of metrics dicts, in the order of configs
+    """
+    targets = ci_targets(target_ci)
+    if targets is None:
+        min_runs = max_runs = num_runs
+    else:
+        max_runs = num_runs if max_runs is None else max_runs
+        min_runs = min(min_runs, max_runs)
+    if chunk_runs is None:
+        chunk_runs = max(1, min_runs // 10)
+    if checkpoint is not None:
+        if not isinstance(checkpoint, SweepCheckpoint):
+            checkpoint = SweepCheckpoint(checkpoint)
+        seed, seed_indexes = checkpoint.assign_seeds(configs, seed, engine)
+    else:
+        seed_indexes = list(range(len(configs)))
+    root_seeds = spawn_seeds(seed, max(seed_indexes, default=-1) + 1)
+    config_seeds = [root_seeds[seed_index] for seed_index in seed_indexes]
+    battle_seeds = [iter_seeds(config_seed, max_runs) for config_seed in config_seeds]
+
+    # Chunks restored from the checkpoint, by configuration: first run -> records
+    restored = [checkpoint.load(seed_index) if checkpoint is not None else {} for seed_index in seed_indexes]
+
+    # Work items: (-expected cost, config index, first run, seeds of the chunk), largest expected cost first
+    queue = []
+    issued = [0] * len(configs) # Runs of each configuration queued (or restored) so far
+
+    def issue(index, runs):
+        # Restored chunks right after the last issued run are always passed over, so issued never
+        # stops short of runs that are already aggregated
+        while issued[index] < max_runs and (runs > 0 or issued[index] in restored[index]):
+            first = issued[index]
+            if first in restored[index]:
+                # Already run: skip its seeds instead of queueing it again
+                size = len(restored[index][first])
+                next(islice(battle_seeds[index], size, size), None)
+            else:
+                later = [start for start in restored[index] if start > first]
+                size = min(chunk_runs, runs, max_runs - first, min(later, default=max_runs) - first)
+                seeds = list(islice(battle_seeds[index], size))
+                heapq.heappush(queue, (-expected_cost(configs[index]), index, first, seeds))
+            issued[index] += size
+            runs -= size
+
+    aggregators = [metric_aggregator() for _ in configs]
+    next_run = [0] * len(configs) # First run of each configuration not yet aggregated
+    pending = [dict(chunks) for chunks in restored] # First run -> records of chunks not aggregated yet
+    planned = [max_runs] * len(configs) # Runs each configuration will aggregate, at most
+    results = [None] * len(configs)
+    done = 0
+
+    def collect(index, first, chunk_records):
+        if results[index] is not None:
+            return # Configuration already met its targets; extra battles are dropped
+        pending[index][first] = chunk_records
+        if checkpoint is not None:
+            checkpoint.save(seed_indexes[index], first, chunk_records)
+        advance(index)
+
+    def advance(index):
+        nonlocal done
+        finished = False
+        # Aggregated in run order, so the result does not depend on completion order
+        while not finished and next_run[index] in pending[index]:
+            first = next_run[index]
+            for record in pending[index].pop(first):
+                add_record(aggregators[index], record)
+                if store is not None and first not in restored[index]:
+                    store.append(configs[index], engine, seed_label(config_seeds[index]), next_run[index], record)
+                next_run[index] += 1
+                done += 1
+                if next_run[index] == max_runs or (targets is not None and targets_met(aggregators[index], targets, min_runs)):
+                    finished = True
+                    break
+        if finished:
+            planned[index] = next_run[index]
+        if progress is not None:
+            progress(done, sum(planned))
+        if finished:
+            results[index] = aggregators[index].summary()
+            if keys[index] is not None:
+                cache.put(keys[index], results[index])
+            aggregators[index] = pending[index] = None
+            if on_config_done is not None:
+                on_config_done(index, results[index])
+        elif next_run[index] >= issued[index]:
+            # Targets not met yet: queue one more chunk per worker for this configuration
+            issue(index, chunk_runs * workers)
+
+    keys = [None] * len(configs)
+    if cache is not None and store is None and seed is not None:
+        keys = [result_key(cache, config, engine, config_seed, targets, min_runs, max_runs)
+                for config, config_seed in zip(configs, config_seeds)]
+
+    for index in range(len(configs)):
+        metrics = cache.get(keys[index]) if keys[index] is not None else None
+        if metrics is not None:
+            # Cached configurations are finished before any battle is queued
+            results[index] = metrics
+            planned[index] = 0
+            if on_config_done is not None:
+                on_config_done(index, metrics)
+        else:
+            issue(index, min_runs)
+
+    # Aggregates the restored chunks; configurations finished in the checkpoint are reported here
+    for index in range(len(configs)):
+        if restored[index] and results[index] is None:
+            advance(index)
+
+    def next_chunk():
+        # Skips chunks of configurations that have already finished
+        while queue:
+            _, index, first, seeds = heapq.heappop(queue)
+            if results[index] is None:
+                return index, first, seeds
+        return None
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            while True:
+                while len(in_flight) < 2 * workers:
+                    chunk = next_chunk()
+                    if chunk is None:
+                        break
+                    index, first, seeds = chunk
+                    in_flight[pool.submit(run_battles, seeds, configs[index], engine)] = (index, first)
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, first = in_flight.pop(future)
+                    collect(index, first, future.result())
+    else:
+        chunk = next_chunk()
+        while chunk is not None:
+            index, first, seeds = chunk
+            collect(index, first, run_battles(seeds, configs[index], engine))
+            chunk = next_chunk()
+    return results
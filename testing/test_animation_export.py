@@ -0,0 +1,39 @@
+import os
+import numpy as np
+from PIL import Image
+from model import Model, show
+from animation_export import record_battle, export_animation, export_battle
+
+PARAMS = {"num_players": 2, "num_enemies": 3, "grid_x": 20, "grid_y": 20}
+
+
+def test_record_battle_plays_the_same_battle():
+    """Test that recording a battle keeps one frame per round without changing the battle"""
+    model = Model(seed=31, **PARAMS)
+    frames = record_battle(model)
+    expected = Model(seed=31, **PARAMS)
+    show(expected, visualize=False)
+    assert model.compute_metrics() == expected.compute_metrics(), "Recording should not affect the battle"
+    assert [frame.round for frame in frames] == list(range(1, expected.battle_length // 2 + 1)), \
+        "There should be one frame per round"
+
+
+def test_export_gif(tmp_path):
+    """Test that a battle is written as an animated GIF with one frame per round"""
+    path = str(tmp_path / "battle.gif")
+    count = export_battle(Model(seed=32, **PARAMS), path, figsize=(2, 2), dpi=40)
+    with Image.open(path) as gif:
+        assert gif.n_frames == count, "The GIF should hold every round"
+        assert gif.size == (80, 80), "Frames should have the requested size"
+
+
+def test_export_png_sequence_in_parallel(tmp_path):
+    """Test that frames rendered by worker processes match frames rendered serially"""
+    frames = record_battle(Model(seed=33, **PARAMS))
+    serial = export_animation(frames, str(tmp_path / "serial"), figsize=(2, 2), dpi=40)
+    parallel = export_animation(frames, str(tmp_path / "parallel"), workers=2, figsize=(2, 2), dpi=40)
+    assert [os.path.basename(path) for path in parallel] == ["frame_%05d.png" % (i + 1) for i in range(len(frames))], \
+        "Frames should be numbered by round"
+    for one, other in zip(serial, parallel):
+        with Image.open(one) as a, Image.open(other) as b:
+            assert np.array_equal(np.asarray(a), np.asarray(b)), "Workers should render the same frames"
@@ -0,0 +1,47 @@
+import json
+from benchmark import run_benchmarks, compare, main, make_fixture, BENCHMARKS, DENSITIES, BASELINE_PATH
+
+
+def test_run_benchmarks_report():
+    """Test that the report holds a per-operation time for every benchmark and density run"""
+    report = run_benchmarks(names=["roll", "adjacent"], densities=["sparse"], repeat=2, min_time=0)
+    assert set(report["results"]) == {"roll[sparse]", "adjacent[sparse]"}, "Every benchmark/density pair should be reported"
+    for row in report["results"].values():
+        assert 0 < row["min"] <= row["median"], "Times should be positive with min <= median"
+    assert report["meta"]["repeat"] == 2, "Report should record how it was measured"
+
+
+def test_fixtures_are_fixed():
+    """Test that every sample starts from the same battle state"""
+    first, second = make_fixture("medium"), make_fixture("medium")
+    assert [a.loc for a in first.initiative_order] == [a.loc for a in second.initiative_order], \
+        "Fixtures should be seeded"
+    assert BENCHMARKS["move_towards.enemy"](first) == 80, "Every enemy of the fixture should move once"
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Test that a slowdown beyond the threshold is a regression and fails the command"""
+    baseline = {"results": {"roll[sparse]": {"min": 1e-9}, "gone[sparse]": {"min": 1.0}}}
+    report = {"results": {"roll[sparse]": {"min": 1.1e-9}}}
+    assert compare(report, baseline, threshold=0.2)[0][-1] is False, "10% slower is within a 20% threshold"
+    assert compare(report, baseline, threshold=0.05)[0][-1] is True, "10% slower exceeds a 5% threshold"
+
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(baseline))
+    output = tmp_path / "results.json"
+    status = main(["--only", "roll", "--density", "sparse", "--repeat", "1", "--min-time", "0",
+                   "--baseline", str(path), "--output", str(output)])
+    assert status == 1, "A regression against the baseline should fail the run"
+    assert "roll[sparse]" in json.loads(output.read_text())["results"], "Results should be written as JSON"
+
+
+def test_committed_baseline_is_the_default(capsys):
+    """Test that runs are compared against the committed baseline, which covers every benchmark"""
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    expected = {"%s[%s]" % (name, density) for name in BENCHMARKS for density in DENSITIES}
+    assert set(baseline["results"]) == expected, "Baseline should hold every benchmark/density pair"
+
+    status = main(["--only", "roll", "--density", "sparse", "--repeat", "1", "--min-time", "0", "--threshold", "1000"])
+    assert status == 0, "A run within the threshold should pass"
+    assert "->" in capsys.readouterr().out, "Results should be compared against the baseline by default"
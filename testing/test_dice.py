@@ -0,0 +1,60 @@
+import numpy as np
+from dice import DicePool, spawn_seeds
+from model import Model
+from player import Player
+
+
+def test_dice_pool_roll_range():
+    """Test that pooled rolls keep the 1..die-1 range of np.random.randint(1, die)"""
+    dice = DicePool(np.random.default_rng(0), block_size=64)
+    rolls = [dice.roll(20) for _ in range(500)]
+    assert min(rolls) >= 1 and max(rolls) <= 19, "d20 rolls should fall in 1..19"
+    assert len(set(rolls)) == 19, "Every face in range should come up over 500 rolls"
+
+
+def test_dice_pool_refills_per_die():
+    """Test that each die size has its own buffer that refills when empty"""
+    dice = DicePool(np.random.default_rng(0), block_size=4)
+    for _ in range(5):
+        dice.roll(8)
+    dice.roll(4)
+    assert len(dice.buffers[8]) == 3, "d8 buffer should have been refilled after four rolls"
+    assert len(dice.buffers[4]) == 3, "d4 buffer should be separate from the d8 buffer"
+
+
+def test_dice_pool_reproducible():
+    """Test that two pools with equally seeded Generators roll the same sequence"""
+    a = DicePool(np.random.default_rng(42))
+    b = DicePool(np.random.default_rng(42))
+    assert [a.roll(20) for _ in range(50)] == [b.roll(20) for _ in range(50)], "Same seed should give same rolls"
+
+
+def test_model_agents_share_dice():
+    """Test that every agent placed by the Model rolls from the Model's DicePool"""
+    model = Model(num_players=2, num_enemies=3, seed=1)
+    assert all(agent.dice is model.dice for agent in model.initiative_order), "Agents should use the Model's dice"
+
+
+def test_player_roll_uses_dice():
+    """Test that Player.roll adds the modifier to the pooled roll"""
+    player = Player(0, 0, 'melee')
+    player.dice = DicePool(np.random.default_rng(7))
+    expected = DicePool(np.random.default_rng(7)).roll(20)
+    assert player.roll(20, 3) == expected + 3, "roll should return the pooled roll plus the modifier"
+
+
+def test_spawn_seeds_independent_of_count():
+    """Test that child seed i does not depend on how many children are spawned"""
+    few = spawn_seeds(7, 3)
+    many = spawn_seeds(7, 10)
+    for a, b in zip(few, many):
+        assert np.array_equal(a.generate_state(4), b.generate_state(4)), "Child seeds should match by index"
+    assert not np.array_equal(many[0].generate_state(4), many[1].generate_state(4)), "Children should differ"
+
+
+def test_spawn_seeds_from_seed_sequence():
+    """Test that spawning from the same SeedSequence twice gives the same children"""
+    root = np.random.SeedSequence(11)
+    first = spawn_seeds(root, 2)
+    second = spawn_seeds(root, 2)
+    assert np.array_equal(first[1].generate_state(4), second[1].generate_state(4)), "Spawning should not consume the root"
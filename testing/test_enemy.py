@@ -155,7 +155,7 @@ def test_enemy_proficiency_initialization():
     assert enemy.proficiency_bonus == 0, "Enemy proficiency bonus should be initialized to 0"
 
 
-def test_enemy_attack_without_proficiency():
+def test_enemy_attack_without_proficiency(monkeypatch):
     """Test that attack rolls do not include proficiency bonus"""
     grid = np.zeros((10, 10), dtype=object)
     enemy = Enemy(5, 5, "attack_nearest")
@@ -164,28 +164,22 @@ def test_enemy_attack_without_proficiency():
     grid[5, 6] = player
     
     # Mock the roll method to return a known value
-    original_roll = enemy.roll
-    
     def mock_roll(die, plus):
         """Mock roll that returns 10 plus the modifier"""
         return 10 + plus
     
-    try:
-        # Override roll to return 10 (with only strength should be 14)
-        enemy.roll = mock_roll
-        
-        # Make attack and check if no proficiency was added
-        enemy.attack(player, grid)
-        expected_attack = 10 + enemy.strength  # No proficiency bonus
-        
-        # Verify the attack roll does not include proficiency
-        assert expected_attack == 14, "Attack roll should not include proficiency bonus"
-    finally:
-        # Restore original roll method
-        enemy.roll = original_roll
-
-
-def test_enemy_hit_chance_without_proficiency():
+    # Override roll to return 10 (with only strength should be 14)
+    monkeypatch.setattr(Enemy, "roll", staticmethod(mock_roll))
+    
+    # Make attack and check if no proficiency was added
+    enemy.attack(player, grid)
+    expected_attack = 10 + enemy.strength  # No proficiency bonus
+    
+    # Verify the attack roll does not include proficiency
+    assert expected_attack == 14, "Attack roll should not include proficiency bonus"
+
+
+def test_enemy_hit_chance_without_proficiency(monkeypatch):
     """Test that hit chance is correctly calculated without proficiency"""
     grid = np.zeros((10, 10), dtype=object)
     enemy = Enemy(5, 5, "attack_nearest")
@@ -201,18 +195,13 @@ def test_enemy_hit_chance_without_proficiency():
         return 9 + plus
     
     # Mock roll to return 9 (with just strength should hit AC 13)
-    original_roll = enemy.roll
-    try:
-        enemy.roll = mock_roll
-        
-        damage = enemy.attack(player, grid)
-        assert damage > 0, "Attack should hit with just strength modifier"
-    finally:
-        # Restore original roll method
-        enemy.roll = original_roll
-
-
-def test_enemy_critical_hit_on_natural_20():
+    monkeypatch.setattr(Enemy, "roll", staticmethod(mock_roll))
+    
+    damage = enemy.attack(player, grid)
+    assert damage > 0, "Attack should hit with just strength modifier"
+
+
+def test_enemy_critical_hit_on_natural_20(monkeypatch):
     """Test that enemy attack is recognized as critical hit on natural 20"""
     grid = np.zeros((10, 10), dtype=object)
     enemy = Enemy(5, 5, "attack_nearest")
@@ -220,7 +209,6 @@ def test_enemy_critical_hit_on_natural_20():
     grid[5, 5] = enemy
     grid[5, 6] = player
     
-    original_roll = enemy.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 20  # Natural 20
@@ -228,17 +216,14 @@ def test_enemy_critical_hit_on_natural_20():
             return 4  # Consistent damage roll
         return 0  # For any other rolls
     
-    try:
-        enemy.roll = mock_roll
-        damage = enemy.attack(player, grid)
-        # Calculate expected damage: (damage_dice * 2) + strength
-        expected_damage = (4 * 2) + enemy.strength
-        assert damage == expected_damage, "Critical hit should double dice damage before adding strength"
-    finally:
-        enemy.roll = original_roll
+    monkeypatch.setattr(Enemy, "roll", staticmethod(mock_roll))
+    damage = enemy.attack(player, grid)
+    # Calculate expected damage: (damage_dice * 2) + strength
+    expected_damage = (4 * 2) + enemy.strength
+    assert damage == expected_damage, "Critical hit should double dice damage before adding strength"
 
 
-def test_enemy_critical_hit_reduces_player_health_double():
+def test_enemy_critical_hit_reduces_player_health_double(monkeypatch):
     """Test that enemy critical hit reduces player health by double damage dice"""
     grid = np.zeros((10, 10), dtype=object)
     enemy = Enemy(5, 5, "attack_nearest")
@@ -247,7 +232,6 @@ def test_enemy_critical_hit_reduces_player_health_double():
     grid[5, 6] = player
     
     initial_health = player.health
-    original_roll = enemy.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 20  # Natural 20
@@ -255,16 +239,13 @@ def test_enemy_critical_hit_reduces_player_health_double():
             return 4  # Consistent damage roll
         return 0  # For any other rolls
     
-    try:
-        enemy.roll = mock_roll
-        enemy.attack(player, grid)
-        expected_health = initial_health - ((4 * 2) + enemy.strength)
-        assert player.health == expected_health, "Critical hit should double dice damage before adding strength"
-    finally:
-        enemy.roll = original_roll
+    monkeypatch.setattr(Enemy, "roll", staticmethod(mock_roll))
+    enemy.attack(player, grid)
+    expected_health = initial_health - ((4 * 2) + enemy.strength)
+    assert player.health == expected_health, "Critical hit should double dice damage before adding strength"
 
 
-def test_enemy_non_critical_hit_normal_damage():
+def test_enemy_non_critical_hit_normal_damage(monkeypatch):
     """Test that enemy non-critical hits deal normal damage"""
     grid = np.zeros((10, 10), dtype=object)
     enemy = Enemy(5, 5, "attack_nearest")
@@ -273,7 +254,6 @@ def test_enemy_non_critical_hit_normal_damage():
     grid[5, 6] = player
     
     initial_health = player.health
-    original_roll = enemy.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 15  # Non-critical hit
@@ -281,14 +261,11 @@ def test_enemy_non_critical_hit_normal_damage():
             return 4  # Consistent damage roll
         return 0  # For any other rolls
     
-    try:
-        enemy.roll = mock_roll
-        damage = enemy.attack(player, grid)
-        expected_damage = 4 + enemy.strength  # Normal damage
-        assert damage == expected_damage, "Non-critical hit should deal normal damage"
-        assert player.health == initial_health - expected_damage, "Player health should be reduced by normal damage"
-    finally:
-        enemy.roll = original_roll
+    monkeypatch.setattr(Enemy, "roll", staticmethod(mock_roll))
+    damage = enemy.attack(player, grid)
+    expected_damage = 4 + enemy.strength  # Normal damage
+    assert damage == expected_damage, "Non-critical hit should deal normal damage"
+    assert player.health == initial_health - expected_damage, "Player health should be reduced by normal damage"
 
 
 # Helper function for the tests
@@ -0,0 +1,102 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from entity_grid import EMPTY, PLAYER, ENEMY, new_grid, entity_at, set_cell, to_object_grid, adjacent_ids
+from registry import EntityRegistry
+from model import Model
+from player import Player
+from enemy import Enemy
+import visualize
+
+
+def test_new_grid_is_empty_int32():
+    """Test that a new id grid is int32 and empty everywhere"""
+    grid = new_grid(4, 6)
+    assert grid.dtype == np.int32, "Id grid should be int32"
+    assert grid.shape == (4, 6), "Id grid should have the requested shape"
+    assert (grid == EMPTY).all(), "Every cell should start empty"
+
+
+def test_set_cell_and_entity_at_id_grid():
+    """Test that entities written to an id grid are found through the entity table"""
+    registry = EntityRegistry()
+    grid = new_grid(5, 5)
+    player = Player(1, 2, "melee")
+    registry.add(player)
+    set_cell(grid, player.loc, player)
+    assert grid[1, 2] == player.entity_id, "Cell should hold the player's id"
+    assert entity_at(grid, 1, 2, registry.entities) is player, "Id should resolve to the player"
+    set_cell(grid, player.loc, None)
+    assert grid[1, 2] == EMPTY, "Emptied cell should hold EMPTY"
+    assert entity_at(grid, 1, 2, registry.entities) is None, "Empty cell should resolve to None"
+
+
+def test_entity_at_object_grid():
+    """Test that object grids treat both None and 0 as empty"""
+    grid = np.zeros((3, 3), dtype=object)
+    enemy = Enemy(0, 0, "attack_nearest")
+    grid[0, 0] = enemy
+    grid[1, 1] = None
+    assert entity_at(grid, 0, 0) is enemy, "Object grid should return the entity itself"
+    assert entity_at(grid, 1, 1) is None and entity_at(grid, 2, 2) is None, "None and 0 should both be empty"
+
+
+def test_registry_assigns_entity_ids_once():
+    """Test that entity ids index the entity table and survive moves"""
+    registry = EntityRegistry()
+    player, enemy = Player(0, 0, "melee"), Enemy(3, 3, "attack_nearest")
+    registry.add(player)
+    registry.add(enemy)
+    old_loc = player.loc
+    player.loc = (0, 1)
+    registry.move(player, old_loc)
+    assert (player.entity_id, enemy.entity_id) == (0, 1), "Ids should follow the order entities were added"
+    assert registry.entities == [player, enemy], "Moving should not add the entity to the table again"
+
+
+def test_registry_faction_table_and_adjacent_ids():
+    """Test that the faction table follows entity ids and drives adjacency on id grids"""
+    registry = EntityRegistry()
+    grid = new_grid(5, 5)
+    player, below, right = Player(2, 2, "melee"), Enemy(3, 2, "attack_nearest"), Enemy(2, 3, "attack_nearest")
+    far = Enemy(0, 0, "attack_nearest")
+    for entity in (player, below, right, far):
+        registry.add(entity)
+        set_cell(grid, entity.loc, entity)
+    assert registry.factions == [PLAYER, ENEMY, ENEMY, ENEMY], "Faction table should be indexed by entity id"
+    assert adjacent_ids(grid, player.loc, registry.factions, ENEMY) == [below.entity_id, right.entity_id], \
+        "Adjacent enemy ids should come in up, down, left, right order"
+    assert adjacent_ids(grid, player.loc, registry.factions, PLAYER) == [], "No players stand next to the player"
+    assert player.adjacent_enemies(grid, registry) == [below, right], "Player should see the same enemies"
+    assert below.adjacent_players(grid, registry) == [player], "Enemy should see the player above it"
+
+
+def test_model_grid_holds_ids():
+    """Test that the Model's grid stores entity ids with -1 for empty cells"""
+    model = Model(num_players=3, num_enemies=4, seed=0)
+    assert model.grid.dtype == np.int32, "Model grid should be an int32 id grid"
+    ids = model.grid[model.grid != EMPTY]
+    assert sorted(ids.tolist()) == list(range(7)), "Each entity id should appear once"
+    for entity in model.registry.entities:
+        assert model.grid[entity.loc] == entity.entity_id, "Entity id should sit at the entity's location"
+
+
+def test_entity_grid_view_matches_object_layout():
+    """Test that the EntityGrid view returns entities, and 0 for empty cells"""
+    model = Model(num_players=2, num_enemies=2, seed=1)
+    view = model.entity_grid
+    objects = to_object_grid(model.grid, model.registry.entities)
+    for entity in model.registry.entities:
+        assert view[entity.loc] is entity, "View should return the entity in its cell"
+        assert objects[entity.loc] is entity, "Object grid should hold the entity in its cell"
+    assert sum(1 for cell in view.flat if cell == 0) == model.GRID_Y * model.GRID_X - 4, "Other cells should be 0"
+
+
+def test_visualize_accepts_entity_grid():
+    """Test that visualize_grid draws a Model's id grid through the EntityGrid view"""
+    model = Model(num_players=1, num_enemies=1, seed=2)
+    player = model.registry.get_players()[0]
+    fig, ax = plt.subplots()
+    visualize.visualize_grid(model.entity_grid, ax=ax, pause=0.001)
+    img_data = ax.images[0].get_array()
+    assert img_data[player.loc][2] == 1, "Player cell should be drawn blue"
+    plt.close(fig)
@@ -0,0 +1,58 @@
+import time
+import numpy as np
+from model import Model, show
+from live_view import FrameQueue, FrameSnapshot, show_live
+
+PARAMS = {"num_players": 3, "num_enemies": 5, "grid_x": 30, "grid_y": 30}
+
+
+def test_frame_queue_keeps_newest():
+    """Test that a full queue drops the oldest frame and get skips to the newest one"""
+    frames = FrameQueue(maxsize=2)
+    for frame in (1, 2, 3):
+        frames.put(frame)
+    assert frames.dropped == 1, "Putting into a full queue should drop the oldest frame"
+    assert frames.get() == 3, "get should return the newest frame"
+    assert frames.dropped == 2, "Frames skipped by get should count as dropped"
+    frames.put(4)
+    frames.close()
+    assert frames.get() == 4, "Frames put before close should still be handed out"
+    assert frames.get() is None, "A closed, empty queue should return None"
+    assert frames.produced == 4, "Every put frame should be counted"
+
+
+def test_show_live_headless_matches_show():
+    """Test that a slow renderer drops frames without changing the battle"""
+    model = Model(seed=21, **PARAMS)
+    taken = []
+
+    def slow_renderer(frame):
+        taken.append(frame)
+        time.sleep(0.005)
+
+    stats = show_live(model, visualize=False, on_frame=slow_renderer)
+    expected = Model(seed=21, **PARAMS)
+    show(expected, visualize=False)
+    assert model.compute_metrics() == expected.compute_metrics(), "Rendering should not affect the battle"
+    assert stats["rendered"] == len(taken) and stats["rendered"] + stats["dropped"] == stats["rounds"], \
+        "Every round should be either rendered or dropped"
+    assert stats["rounds"] == model.battle_length // 2, "There should be one frame per round"
+    assert taken[-1].round == stats["rounds"], "The last round should always be rendered"
+    assert [frame.round for frame in taken] == sorted({frame.round for frame in taken}), "Frames should come in order"
+
+
+def test_snapshot_is_a_copy():
+    """Test that a snapshot keeps its frame while the battle goes on"""
+    model = Model(seed=22, **PARAMS)
+    snapshot = FrameSnapshot(model, 0)
+    frame = snapshot.render()
+    show(model, visualize=False)
+    assert np.array_equal(snapshot.render(), frame), "Later rounds should not change a snapshot"
+
+
+def test_show_live_draws_frames():
+    """Test that the visual renderer draws the battle to its end"""
+    model = Model(seed=23, **PARAMS)
+    stats = show_live(model, visualize=True)
+    assert stats["rendered"] >= 1 and stats["rounds"] == model.battle_length // 2, "Frames should be drawn"
+    assert model.count_players() == 0 or model.count_enemies() == 0, "The battle should be played to the end"
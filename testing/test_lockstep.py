@@ -0,0 +1,73 @@
+import numpy as np
+from lockstep import LockstepBattles
+from entity_grid import PLAYER, ENEMY
+from model import batch_simulation
+
+
+def test_lockstep_initial_state():
+    """Test that every battle starts with its own agents on distinct cells"""
+    battles = LockstepBattles(8, num_players=3, num_enemies=4, seed=1)
+    assert battles.grid.shape == (8, battles.GRID_Y, battles.GRID_X), "Grids should have a leading battle axis"
+    assert (np.count_nonzero(battles.grid >= 0, axis=(1, 2)) == 7).all(), "Each grid should hold one id per agent"
+    assert (battles.count_players() == 3).all(), "Every battle should start with all players"
+    assert (battles.count_enemies() == 4).all(), "Every battle should start with all enemies"
+    assert (np.sort(battles.initiative_order, axis=1) == np.arange(7)).all(), "Initiative should be a permutation"
+
+
+def test_lockstep_battles_finish():
+    """Test that run ends every battle with one side wiped out"""
+    battles = LockstepBattles(6, num_players=2, num_enemies=3, enemy_strategy='attack_uniform', seed=4)
+    battles.run()
+    players, enemies = battles.count_players(), battles.count_enemies()
+    assert not battles.active.any(), "No battle should still be active"
+    assert ((players == 0) | (enemies == 0)).all(), "Each battle should end with one side defeated"
+    assert (battles.battle_length > 0).all(), "Each battle should take at least one round"
+
+
+def test_lockstep_ended_battles_frozen():
+    """Test that a battle that has ended is no longer advanced"""
+    battles = LockstepBattles(2, num_players=2, num_enemies=2, seed=2)
+    battles.health[0, battles.faction == ENEMY] = 0
+    battles.update_grid_state()
+    battles.active &= battles.count_enemies() > 0
+    grid_before = battles.grid[0].copy()
+    battles.execute_turns()
+    assert battles.battle_length[0] == 0, "Ended battle should not count rounds"
+    assert (battles.grid[0] == grid_before).all(), "Ended battle's grid should not change"
+    assert battles.battle_length[1] == 1, "Active battle should advance"
+
+
+def test_lockstep_attack_is_per_battle():
+    """Test that an attack only changes health in its own battle"""
+    battles = LockstepBattles(3, num_players=1, num_enemies=1, seed=0)
+    battles.roll_attacks()
+    battles.attack_roll[:, 0] = 20
+    battles.attack_damage[:, 0] = 5
+    health_before = battles.health.copy()
+    damage = battles.attack(np.array([1]), np.array([0]), np.array([1]))
+    assert damage.tolist() == [5], "Hit should deal the pre-rolled damage"
+    assert battles.health[1, 1] == health_before[1, 1] - 5, "Target in the attacked battle should lose health"
+    assert (battles.health[[0, 2]] == health_before[[0, 2]]).all(), "Other battles should be untouched"
+    assert battles.faction[0] == PLAYER, "Agent 0 should be a player"
+
+
+def test_batch_simulation_lockstep_engine():
+    """Test that the lockstep engine reports the batch_simulation metrics and is reproducible"""
+    first = batch_simulation(num_runs=5, num_players=2, num_enemies=3, engine='lockstep', seed=6)
+    second = batch_simulation(num_runs=5, num_players=2, num_enemies=3, engine='lockstep', seed=6)
+    objects = batch_simulation(num_runs=1, num_players=2, num_enemies=3, seed=6)
+    assert set(first) == set(objects), "Lockstep should report the same metrics"
+    assert first == second, "Same seed should give identical results"
+
+
+def test_lockstep_matches_model_distributions():
+    """Test that the lockstep engine's metric distributions match the object engine's over many battles"""
+    lockstep = batch_simulation(num_runs=300, num_players=3, num_enemies=3, engine='lockstep', seed=7)
+    objects = batch_simulation(num_runs=300, num_players=3, num_enemies=3, seed=7)
+    for name in ("Rounds Taken", "Player Win %", "Avg Attacks per Turn"):
+        # Battles differ between engines for the same seed, so only their means are compared:
+        # their 95% confidence intervals should overlap
+        lockstep_low, lockstep_high = lockstep[name + " 95% CI"]
+        objects_low, objects_high = objects[name + " 95% CI"]
+        assert lockstep_low <= objects_high and objects_low <= lockstep_high, \
+            "%s should agree between engines (%.2f vs %.2f)" % (name, lockstep[name], objects[name])
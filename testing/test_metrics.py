@@ -0,0 +1,80 @@
+import math
+import numpy as np
+from metrics import QuantileSketch, RunningStat, MetricAggregator
+from model import batch_simulation, metric_aggregator
+
+
+def test_running_stat_matches_numpy():
+    """Test that streamed mean, variance, min and max match NumPy on the full data"""
+    values = np.random.default_rng(0).normal(40, 12, size=1000)
+    stat = RunningStat()
+    for value in values:
+        stat.add(value)
+    assert math.isclose(stat.mean, values.mean()), "Mean should match np.mean"
+    assert math.isclose(stat.variance(), values.var(ddof=1)), "Variance should match the sample variance"
+    assert (stat.min, stat.max) == (values.min(), values.max()), "Min and max should be exact"
+    low, high = stat.confidence_interval()
+    half_width = 1.96 * values.std(ddof=1) / math.sqrt(len(values))
+    assert math.isclose(high - low, 2 * half_width, rel_tol=1e-3), "CI should be mean +/- 1.96 standard errors"
+
+
+def test_proportion_interval_is_wilson():
+    """Test that proportion intervals are Wilson intervals, which stay open when every value agrees"""
+    stat = RunningStat()
+    for value in [100] * 5:
+        stat.add(value)
+    low, high = stat.proportion_interval(100)
+    assert stat.confidence_interval() == (100, 100), "Normal interval collapses when every value agrees"
+    assert math.isclose(low, 100 * 5 / (5 + 1.96 ** 2), rel_tol=1e-3) and math.isclose(high, 100), \
+        "Unanimous sample should get the Wilson interval (n / (n + z^2), 1)"
+    for value in [0] * 5:
+        stat.add(value)
+    low, high = stat.proportion_interval(100)
+    assert math.isclose(low + high, 100), "Interval of a 50% sample should be centered on 50"
+    assert MetricAggregator(["x"], proportions={"x": 100}).confidence_interval("x") == (-math.inf, math.inf), \
+        "Empty proportion should have an unbounded interval"
+
+
+def test_running_stat_merge():
+    """Test that merging two summaries equals summarizing all of their values"""
+    values = np.random.default_rng(1).integers(0, 100, size=500)
+    whole, left, right = RunningStat(), RunningStat(), RunningStat()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i < 200 else right).add(value)
+    left.merge(right)
+    assert left.count == whole.count and left.total == whole.total, "Counts and sums should add up"
+    assert math.isclose(left.variance(), whole.variance()), "Merged variance should match"
+    assert left.sketch.positive == whole.sketch.positive, "Merged sketch should equal the sketch of all values"
+
+
+def test_quantile_sketch_relative_error():
+    """Test that sketch quantiles are within the relative accuracy of the exact quantiles"""
+    values = np.random.default_rng(2).exponential(50, size=5000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for q in [0.05, 0.5, 0.95]:
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact, f"Quantile {q} should be within 1%"
+    assert len(sketch.positive) < 1000, "Sketch size should depend on the value range, not the count"
+
+
+def test_batch_simulation_reports_confidence_intervals():
+    """Test that every mean returned by batch_simulation has a confidence interval around it"""
+    metrics = batch_simulation(num_runs=4, num_players=2, num_enemies=2, seed=3)
+    for name in metric_aggregator().names:
+        low, high = metrics[name + " 95% CI"]
+        assert low <= metrics[name] <= high, f"{name} should lie inside its confidence interval"
+
+
+def test_batch_simulation_streams_into_aggregator():
+    """Test that batches can stream into aggregators that are merged afterwards"""
+    first, second = metric_aggregator(), metric_aggregator()
+    batch_simulation(num_runs=2, num_players=2, num_enemies=2, seed=4, aggregator=first)
+    batch_simulation(num_runs=3, num_players=2, num_enemies=2, seed=5, aggregator=second)
+    first.merge(second)
+    assert first.count == 5, "Merged aggregator should cover both batches"
+    rounds = first.stats["Rounds Taken"]
+    assert rounds.min <= rounds.quantile(0.5) <= rounds.max, "Median should lie between min and max"
+    assert isinstance(MetricAggregator(["x"]).summary()["x 95% CI"], tuple), "CI should be a (low, high) pair"
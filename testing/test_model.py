@@ -2,7 +2,7 @@ import pytest
 import sys
 import os
 import numpy as np
-from model import Model
+from model import Model, show, batch_simulation, aggregate_metrics, run_battle, METRIC_NAMES
 from player import Player
 from enemy import Enemy
 
@@ -19,6 +19,15 @@ def test_model_grid_y_initialization():
     assert model.GRID_Y == 100, "GRID_Y should be initialized to 100"
 
 
+def test_model_custom_grid_dimensions():
+    """Test that grid dimensions are constructor parameters and need not be square"""
+    model = Model(num_players=2, num_enemies=3, grid_x=30, grid_y=20, seed=1)
+    assert (model.GRID_X, model.GRID_Y) == (30, 20), "Grid dimensions should come from the constructor"
+    assert model.grid.shape == (20, 30), "Grid should have GRID_Y rows of GRID_X cells"
+    assert all(0 <= y < 20 and 0 <= x < 30 for y, x in (agent.loc for agent in model.initiative_order)), \
+        "Agents should be placed inside the grid"
+
+
 def test_model_num_players_initialization():
     model = Model()
     assert model.NUM_PLAYERS == 5, "NUM_PLAYERS should be initialized to 5"
@@ -36,14 +45,14 @@ def test_model_grid_shape():
 
 def test_model_player_count():
     model = Model()
-    player_count = sum(1 for x in model.grid.flat if isinstance(x, Player))
+    player_count = sum(1 for x in model.entity_grid.flat if isinstance(x, Player))
     assert player_count == model.NUM_PLAYERS, "Grid should contain correct number of players"
 
 
 def test_model_enemy_count():
     """Test that enemy count matches NUM_ENEMIES immediately after initialization"""
     model = Model()
-    enemy_count = sum(1 for x in model.grid.flat if isinstance(x, Enemy))
+    enemy_count = sum(1 for x in model.entity_grid.flat if isinstance(x, Enemy))
     assert enemy_count == model.NUM_ENEMIES, f"Grid should contain {model.NUM_ENEMIES} enemies, but found {enemy_count}"
 
 
@@ -53,17 +62,17 @@ def test_defeated_player_removed_from_grid():
     player_pos = next((
         (y, x) for y in range(model.GRID_Y)
         for x in range(model.GRID_X)
-        if isinstance(model.grid[y, x], Player)
+        if isinstance(model.entity_grid[y, x], Player)
     ), None)
 
     if player_pos is None:
         pytest.skip("No player found in grid")
 
-    player = model.grid[player_pos]
+    player = model.entity_grid[player_pos]
     player.health = 0
     model.update_grid_state()
     
-    assert model.grid[player_pos] == 0, "Defeated player should be removed from grid"
+    assert model.entity_grid[player_pos] == 0, "Defeated player should be removed from grid"
 
 def test_defeated_player_not_in_target_list():
     """Test that a defeated player is not targetable by enemies"""
@@ -71,13 +80,13 @@ def test_defeated_player_not_in_target_list():
     player_pos = next((
         (y, x) for y in range(model.GRID_Y)
         for x in range(model.GRID_X)
-        if isinstance(model.grid[y, x], Player)
+        if isinstance(model.entity_grid[y, x], Player)
     ), None)
 
     def test_model_enemy_count_after_initialization():
         """Test that enemy count matches NUM_ENEMIES immediately after initialization"""
         model = Model()
-    player = model.grid[player_pos]
+    player = model.entity_grid[player_pos]
     player.health = 0
     model.update_grid_state()  # Add this line to trigger grid cleanup
 
@@ -90,17 +99,17 @@ def test_defeated_enemy_removed_from_grid():
     enemy_pos = next((
         (y, x) for y in range(model.GRID_Y)
         for x in range(model.GRID_X)
-        if isinstance(model.grid[y, x], Enemy)
+        if isinstance(model.entity_grid[y, x], Enemy)
     ), None)
 
     if enemy_pos is None:
         pytest.skip("No enemy found in grid")
 
-    enemy = model.grid[enemy_pos]
+    enemy = model.entity_grid[enemy_pos]
     enemy.health = 0
     model.update_grid_state()
     
-    assert model.grid[enemy_pos] == 0, "Defeated enemy should be removed from grid"
+    assert model.entity_grid[enemy_pos] == 0, "Defeated enemy should be removed from grid"
 
 def test_defeated_enemy_not_in_target_list():
     """Test that a defeated enemy is not targetable by players"""
@@ -108,13 +117,13 @@ def test_defeated_enemy_not_in_target_list():
     enemy_pos = next((
         (y, x) for y in range(model.GRID_Y)
         for x in range(model.GRID_X)
-        if isinstance(model.grid[y, x], Enemy)
+        if isinstance(model.entity_grid[y, x], Enemy)
     ), None)
 
     if enemy_pos is None:
         pytest.skip("No enemy found in grid")
 
-    enemy = model.grid[enemy_pos]
+    enemy = model.entity_grid[enemy_pos]
     enemy.health = 0
     model.update_grid_state()  # Add this line to trigger grid cleanup
 
@@ -213,8 +222,8 @@ def model_with_defeated_enemies():
     model = Model()
     for y in range(model.GRID_Y):
         for x in range(model.GRID_X):
-            if isinstance(model.grid[y, x], Enemy):
-                model.grid[y, x].health = 0
+            if isinstance(model.entity_grid[y, x], Enemy):
+                model.entity_grid[y, x].health = 0
     model.update_grid_state()
     return model
 
@@ -225,8 +234,8 @@ def model_with_defeated_players():
     model = Model()
     for y in range(model.GRID_Y):
         for x in range(model.GRID_X):
-            if isinstance(model.grid[y, x], Player):
-                model.grid[y, x].health = 0
+            if isinstance(model.entity_grid[y, x], Player):
+                model.entity_grid[y, x].health = 0
     model.update_grid_state()
     return model
 
@@ -250,4 +259,133 @@ def test_defeat_condition(model_with_defeated_players):
 def test_no_defeat_in_normal_state():
     """Test defeat condition in normal game state"""
     model = Model()
-    assert len(model.get_all_players()) > 0, "Should have players remaining"
\ No newline at end of file
+    assert len(model.get_all_players()) > 0, "Should have players remaining"
+
+# Roster Tests
+def test_count_players_matches_grid():
+    """Test that the living player count matches a full grid scan"""
+    model = Model()
+    grid_count = sum(1 for x in model.entity_grid.flat if isinstance(x, Player))
+    assert model.count_players() == grid_count, "Player count should match players on the grid"
+
+
+def test_count_enemies_drops_on_death():
+    """Test that the living enemy count drops when an enemy dies"""
+    model = Model()
+    initial_count = model.count_enemies()
+    model.get_all_enemies()[0].health = 0
+    model.update_grid_state()
+    assert model.count_enemies() == initial_count - 1, "Enemy count should drop by one after a death"
+
+
+# Death Cleanup Tests
+def test_recorded_death_cleared_from_grid():
+    """Test that a recorded death is cleared from the grid on cleanup"""
+    model = Model()
+    enemy = model.get_all_enemies()[0]
+    enemy.health = 0
+    model.record_death(enemy)
+    model.update_grid_state()
+    assert model.entity_grid[enemy.loc] == 0, "Recorded dead enemy should be removed from grid"
+    assert model.dead_entities == [], "Recorded deaths should be cleared after cleanup"
+
+
+def test_recorded_death_counts_kill_once():
+    """Test that recording the same death twice only counts one kill"""
+    model = Model()
+    player = model.get_all_players()[0]
+    player.health = 0
+    model.record_death(player)
+    model.record_death(player)
+    model.update_grid_state()
+    assert model.players_killed == 1, "A player death should be counted exactly once"
+
+
+def test_death_recorded_when_health_drops():
+    """Test that an entity is recorded as dead as soon as its health drops to 0, without a roster scan"""
+    model = Model()
+    enemy = model.get_all_enemies()[0]
+    enemy.health -= enemy.health + 3
+    assert model.dead_entities == [enemy], "Death should be recorded when health drops to 0 or below"
+    assert model.enemies_killed == 1, "Kill should be counted when the death is recorded"
+    enemy.health -= 5
+    assert model.enemies_killed == 1, "Further damage to a dead entity should not count another kill"
+
+
+def test_distance_field_battle_finishes():
+    """Test a battle using shared distance fields runs to completion"""
+    model = Model(num_enemies=5, pathing='distance_field')
+    show(model, visualize=False)
+    assert model.count_players() == 0 or model.count_enemies() == 0, "Battle should end with one side defeated"
+
+
+def test_seeded_battles_reproducible():
+    """Test that two Models with the same seed play out the same battle"""
+    metrics = []
+    for _ in range(2):
+        model = Model(num_players=3, num_enemies=4, enemy_strategy='attack_uniform', seed=123)
+        show(model, visualize=False)
+        metrics.append(model.compute_metrics())
+    assert metrics[0] == metrics[1], "Same seed should give identical metrics"
+
+
+def test_batch_simulation_seed_ignores_global_state():
+    """Test that a seeded batch gives identical results whatever the global random state"""
+    np.random.seed(1)
+    first = batch_simulation(num_runs=3, num_players=2, num_enemies=3, seed=2024)
+    np.random.seed(2)
+    second = batch_simulation(num_runs=3, num_players=2, num_enemies=3, seed=2024)
+    assert first == second, "Seeded batches should be bit-identical"
+
+
+def test_batch_simulation_workers_match_serial():
+    """Test that a process pool gives bit-identical results to a serial batch"""
+    serial = batch_simulation(num_runs=4, num_players=2, num_enemies=3, seed=99)
+    parallel = batch_simulation(num_runs=4, num_players=2, num_enemies=3, seed=99, workers=2)
+    assert serial == parallel, "Worker count should not change the results"
+
+
+def test_aggregate_metrics_win_percentage():
+    """Test that Player Win % counts runs with at least one surviving player"""
+    survived = METRIC_NAMES.index("Players Survived")
+    records = []
+    for players_left in [0, 2, 1, 0]:
+        record = [0.0] * len(METRIC_NAMES)
+        record[survived] = players_left
+        records.append(tuple(record))
+    metrics = aggregate_metrics(records)
+    assert metrics["Player Win %"] == 50, "Two of four runs had survivors"
+    assert metrics["Players Survived"] == 0.75, "Players Survived should be averaged over runs"
+
+
+def test_batch_simulation_progress():
+    """Test that the progress callback is called once per battle"""
+    calls = []
+    batch_simulation(num_runs=3, num_players=2, num_enemies=2, seed=1, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(1, 3), (2, 3), (3, 3)], "Progress should report every finished battle"
+
+
+def test_batch_simulation_adaptive_stops_early():
+    """Test that a one-sided config stops once its win rate interval is narrow, not at min_runs"""
+    metrics = batch_simulation(num_runs=200, num_players=5, num_enemies=1, enemy_max_health=30, seed=7,
+                               target_ci={"Player Win %": 5}, min_runs=5)
+    assert metrics["Player Win %"] == 100, "Players should win every battle"
+    # Wilson interval of 100% wins over n runs: 100 * (n / (n + z^2), 1), under 5 points wide from 73 runs
+    assert metrics["Runs"] == 73, "Battles should stop at the first run whose interval meets the target"
+    low, high = metrics["Player Win % 95% CI"]
+    assert 95 <= low < 100 and high == pytest.approx(100), "Unanimous wins should still leave a nonzero interval"
+
+
+def test_batch_simulation_adaptive_respects_max_runs():
+    """Test that an unreachable target stops at max_runs and unknown metrics are rejected"""
+    metrics = batch_simulation(num_players=2, num_enemies=2, seed=8, target_ci={"Rounds Taken": 0.0},
+                               min_runs=2, max_runs=4)
+    assert metrics["Runs"] == 4, "Battles should stop at max_runs when the target is never met"
+    with pytest.raises(ValueError):
+        batch_simulation(num_runs=2, target_ci={"Not a metric": 1})
+
+
+def test_run_battle_rejects_unknown_engine():
+    """Test that run_battle refuses engines other than 'model' instead of silently running Model"""
+    with pytest.raises(ValueError):
+        run_battle(0, dict(num_players=1, num_enemies=1), engine='arrays')
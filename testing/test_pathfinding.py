@@ -0,0 +1,223 @@
+import sys
+import os
+import numpy as np
+from enemy import Enemy
+from pathfinding import bfs_path, astar_distance, find_path, manhattan, distance_field, descend, DistanceFields, \
+    PathCache, monotone_path
+from profiling import profile_battle
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def random_grid(size, density, seed):
+    """Builds a grid with randomly placed blocking enemies"""
+    rng = np.random.RandomState(seed)
+    grid = np.zeros((size, size), dtype=object)
+    for y in range(size):
+        for x in range(size):
+            if rng.rand() < density:
+                grid[y, x] = Enemy(y, x, "attack_nearest")
+    return grid
+
+
+def test_bfs_path_direct_route():
+    """Test BFS finds a shortest path on an empty grid"""
+    grid = np.zeros((10, 10), dtype=object)
+    path = bfs_path(grid, (0, 0), (3, 3))
+    assert len(path) == 6, "Path length should equal Manhattan distance on an empty grid"
+    assert path[-1] == (3, 3), "Path should end on the target"
+
+
+def test_bfs_path_stops_within_reach():
+    """Test BFS stops as soon as it is within reach of the target"""
+    grid = np.zeros((10, 10), dtype=object)
+    path = bfs_path(grid, (0, 0), (0, 9), reach=3)
+    assert manhattan(path[-1], (0, 9)) == 3, "Path should stop at the edge of reach"
+
+
+def test_astar_distance_around_wall():
+    """Test A* distance accounts for obstacles"""
+    grid = np.zeros((5, 5), dtype=object)
+    for y in range(4):
+        grid[y, 2] = Enemy(y, 2, "attack_nearest")
+    assert astar_distance(grid, (0, 0), (0, 4)) == 12, "Path should detour around the wall"
+    assert astar_distance(grid, (0, 0), (0, 4), bound=11) is None, "Path longer than bound should not be found"
+
+
+def test_find_path_unreachable():
+    """Test no path is returned when the target is walled off"""
+    grid = np.zeros((5, 5), dtype=object)
+    for x in range(5):
+        grid[2, x] = Enemy(2, x, "attack_nearest")
+    assert find_path(grid, (0, 0), (4, 4), max_steps=6) == [], "Unreachable target should give an empty path"
+
+
+def test_find_path_matches_bfs_prefix():
+    """Test the speed-bounded path is exactly the start of the full BFS path"""
+    for seed in range(20):
+        grid = random_grid(15, 0.3, seed)
+        grid[0, 0] = 0
+        grid[14, 14] = 0
+        for reach in (0, 1, 5):
+            full = bfs_path(grid, (0, 0), (14, 14), reach)
+            assert find_path(grid, (0, 0), (14, 14), reach, max_steps=6) == full[:6], \
+                "Bounded path should match the first steps of the BFS path"
+
+
+def test_monotone_path_matches_bfs():
+    """Test the closer-every-step search returns the BFS path whenever one that short exists"""
+    for seed in range(30):
+        grid = random_grid(15, 0.25, seed)
+        grid[0, 0] = 0
+        for target, reach in (((14, 14), 0), ((12, 3), 1), ((2, 13), 1)):
+            path = monotone_path(grid, (0, 0), target, reach)
+            distance = astar_distance(grid, (0, 0), target, reach)
+            if path is None:
+                assert distance is None or distance > manhattan((0, 0), target) - reach, \
+                    "No closer-every-step path should mean the shortest path is longer"
+            else:
+                assert path == bfs_path(grid, (0, 0), target, reach), "Path should match BFS"
+
+
+def test_monotone_path_backtracks():
+    """Test the search backs out of a dead end and takes the next route"""
+    grid = np.zeros((5, 5), dtype=object)
+    grid[3, 0] = Enemy(3, 0, "attack_nearest")
+    path = monotone_path(grid, (0, 0), (4, 4))
+    assert path[:3] == [(1, 0), (2, 0), (2, 1)], "Path should go down until blocked, then right"
+    assert len(path) == 8, "Path should still be as short as the Manhattan distance"
+
+
+def test_distance_field_counts_steps():
+    """Test the distance field holds path lengths to the nearest source"""
+    grid = np.zeros((5, 5), dtype=object)
+    grid[0, 0] = Enemy(0, 0, "attack_nearest")
+    field = distance_field(grid, [(0, 0)])
+    assert field[0, 0] == 0, "Source cell should be at distance 0"
+    assert field[4, 4] == 8, "Far corner should be 8 steps away"
+
+
+def test_distance_field_uses_nearest_source():
+    """Test a multi-source field measures distance to the closest source"""
+    grid = np.zeros((1, 10), dtype=object)
+    field = distance_field(grid, [(0, 0), (0, 9)])
+    assert field[0, 3] == 3, "Cell should be measured from the closer source"
+    assert field[0, 7] == 2, "Cell should be measured from the closer source"
+
+
+def test_distance_field_marks_unreachable():
+    """Test cells cut off from every source are marked -1"""
+    grid = np.zeros((5, 5), dtype=object)
+    for x in range(5):
+        grid[2, x] = Enemy(2, x, "attack_nearest")
+    field = distance_field(grid, [(0, 0)])
+    assert field[4, 4] == -1, "Walled off cell should be unreachable"
+
+
+def test_descend_stops_next_to_occupied_target():
+    """Test walking down a field stops beside an occupied target"""
+    grid = np.zeros((1, 10), dtype=object)
+    grid[0, 9] = Enemy(0, 9, "attack_nearest")
+    field = distance_field(grid, [(0, 9)])
+    path = descend(field, grid, (0, 0), 20)
+    assert path[-1] == (0, 8), "Walker should stop adjacent to the target"
+
+
+def test_distance_fields_are_shared():
+    """Test the same field object is returned for the same targets until cleared"""
+    grid = np.zeros((10, 10), dtype=object)
+    fields = DistanceFields(grid)
+    field = fields.get([(1, 1), (5, 5)], 1)
+    assert fields.get([(5, 5), (1, 1)], 1) is field, "Same targets should share one field"
+    fields.clear()
+    assert fields.get([(1, 1), (5, 5)], 1) is not field, "Clearing should force a recompute"
+
+
+def test_distance_field_stops_at_farthest_mover():
+    """Test a field computed for given movers is exact out to the farthest of them"""
+    grid = random_grid(20, 0.2, 3)
+    full = distance_field(grid, [(0, 0)], 1)
+    movers = [(5, 5), (8, 2)]
+    partial = distance_field(grid, [(0, 0)], 1, stops=movers)
+    farthest = max(full[mover] for mover in movers)
+    near = (full >= 0) & (full <= farthest)
+    assert (partial[near] == full[near]).all(), "Cells up to the farthest mover should get their distance"
+    assert (partial[full > farthest + 1] == -1).all(), "Cells well beyond the farthest mover should be left out"
+
+
+def test_distance_fields_shared_by_key_for_the_round():
+    """Test a keyed field is computed once per round, even after its targets move"""
+    grid = np.zeros((10, 10), dtype=object)
+    fields = DistanceFields(grid)
+    field = fields.get([(1, 1)], 1, key="players")
+    assert fields.get([(2, 1)], 1, key="players") is field, "Faction field should be reused within the round"
+    assert fields.get([(2, 1)], 0, key="players") is not field, "Another reach should get its own field"
+    fields.clear()
+    assert fields.get([(2, 1)], 1, key="players")[0, 1] == 1, "Next round should use the targets' new locations"
+
+
+def test_path_cache_reuses_route():
+    """Test the cache serves the rest of a route on the next turn"""
+    grid = np.zeros((1, 20), dtype=object)
+    cache = PathCache(tolerance=0)
+    agent = Enemy(0, 0, "attack_nearest")
+    first = cache.find_path(agent, grid, (0, 0), (0, 19), max_steps=6)
+    second = cache.find_path(agent, grid, first[-1], (0, 19), max_steps=6)
+    assert second[0] == (0, 7), "Second move should continue along the route"
+    assert (cache.hits, cache.misses) == (1, 1), "Second lookup should be a cache hit"
+
+
+def test_path_cache_invalidated_by_blocked_route():
+    """Test the cache replans when a cell on the remaining route becomes occupied"""
+    grid = np.zeros((3, 20), dtype=object)
+    cache = PathCache(tolerance=0)
+    agent = Enemy(1, 0, "attack_nearest")
+    first = cache.find_path(agent, grid, (1, 0), (1, 19), max_steps=6)
+    grid[1, 10] = Enemy(1, 10, "attack_nearest")
+    cache.find_path(agent, grid, first[-1], (1, 19), max_steps=6)
+    assert cache.misses == 2, "Blocked route should be replanned"
+
+
+def test_path_cache_invalidated_by_target_move():
+    """Test the cache replans when the target moves beyond the tolerance"""
+    grid = np.zeros((10, 20), dtype=object)
+    cache = PathCache(tolerance=2)
+    agent = Enemy(0, 0, "attack_nearest")
+    first = cache.find_path(agent, grid, (0, 0), (0, 19), max_steps=6)
+    cache.find_path(agent, grid, first[-1], (5, 19), max_steps=6)
+    assert cache.misses == 2, "Target moving beyond tolerance should force a replan"
+
+
+def test_path_cache_miss_plans_like_find_path():
+    """Test that a cache miss plans the same route as find_path"""
+    for seed in range(10):
+        grid = random_grid(15, 0.3, seed)
+        grid[0, 0] = 0
+        cache = PathCache()
+        agent = Enemy(0, 0, "attack_nearest")
+        assert cache.find_path(agent, grid, (0, 0), (14, 14), reach=1) == find_path(grid, (0, 0), (14, 14), 1), \
+            "Missed lookup should plan the route find_path returns"
+
+
+def test_path_cache_searches_no_more_than_default():
+    """Test that battles with the path cache visit no more cells than battles without it"""
+    params = {"num_players": 5, "num_enemies": 10, "enemy_strategy": 'attack_nearest', "enemy_max_health": 60}
+    cells = {}
+    for path_cache in (False, True):
+        cells[path_cache] = 0
+        for seed in range(40, 45):
+            _, profiler = profile_battle(seed, dict(params, path_cache=path_cache))
+            cells[path_cache] += sum(profiler.cells.values())
+    assert cells[True] <= cells[False], "Cached routes should save searching, not add to it"
+
+
+def test_path_cache_invalidated_by_target_on_route():
+    """Test the cache replans when the target steps onto the rest of the route, within tolerance"""
+    grid = np.zeros((1, 20), dtype=object)
+    cache = PathCache(tolerance=2)
+    agent = Enemy(0, 0, "attack_nearest")
+    first = cache.find_path(agent, grid, (0, 0), (0, 19), max_steps=6)
+    grid[0, 17] = Enemy(0, 17, "attack_nearest")
+    second = cache.find_path(agent, grid, first[-1], (0, 17), max_steps=20)
+    assert cache.misses == 2, "Target on the remaining route should force a replan"
+    assert second[-1] == (0, 17), "Replanned route should end on the target, not past it"
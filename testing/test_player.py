@@ -62,7 +62,7 @@ def test_player_proficiency_initialization():
     player = Player(5, 5, "melee")
     assert player.proficiency_bonus == 2, "Player proficiency bonus should be initialized to 2"
 
-def test_player_proficiency_added_to_attack():
+def test_player_proficiency_added_to_attack(monkeypatch):
     """Test that proficiency bonus is added to attack rolls"""
     grid = np.zeros((10, 10), dtype=object)
     player = Player(5, 5, "melee")
@@ -71,27 +71,21 @@ def test_player_proficiency_added_to_attack():
     grid[5, 6] = enemy
     
     # Mock the roll method to return a known value
-    original_roll = player.roll
-    
     def mock_roll(die, plus):
         """Mock roll that returns 10 plus the modifier"""
         return 10 + plus
     
-    try:
-        # Override roll to return 10 (so with proficiency+strength should be 16)
-        player.roll = mock_roll
-        
-        # Make attack and check if proficiency was added
-        player.attack(enemy, grid)
-        expected_attack = 10 + player.proficiency_bonus + player.strength
-        
-        # Verify the attack roll includes proficiency
-        assert expected_attack == 16, "Attack roll should include proficiency bonus"
-    finally:
-        # Restore original roll method
-        player.roll = original_roll
+    # Override roll to return 10 (so with proficiency+strength should be 16)
+    monkeypatch.setattr(Player, "roll", staticmethod(mock_roll))
+    
+    # Make attack and check if proficiency was added
+    player.attack(enemy, grid)
+    expected_attack = 10 + player.proficiency_bonus + player.strength
+    
+    # Verify the attack roll includes proficiency
+    assert expected_attack == 16, "Attack roll should include proficiency bonus"
 
-def test_player_proficiency_affects_hit_chance():
+def test_player_proficiency_affects_hit_chance(monkeypatch):
     """Test that proficiency bonus affects ability to hit enemy AC"""
     grid = np.zeros((10, 10), dtype=object)
     player = Player(5, 5, "melee")
@@ -107,15 +101,10 @@ def test_player_proficiency_affects_hit_chance():
         return 11 + plus
     
     # Mock roll to return 11 (with proficiency+strength should hit AC 15)
-    original_roll = player.roll
-    try:
-        player.roll = mock_roll
-        
-        damage = player.attack(enemy, grid)
-        assert damage > 0, "Attack should hit with proficiency bonus added"
-    finally:
-        # Restore original roll method
-        player.roll = original_roll
+    monkeypatch.setattr(Player, "roll", staticmethod(mock_roll))
+    
+    damage = player.attack(enemy, grid)
+    assert damage > 0, "Attack should hit with proficiency bonus added"
 
 def test_player_attack_returns_integer():
     player = Player(5, 5, "melee")
@@ -241,7 +230,7 @@ def test_player_no_double_move_when_adjacent():
     distance_moved = manhattan_distance(initial_pos, player.loc)
     assert distance_moved <= normal_speed, "Player should not move more than normal speed when adjacent to enemy"
 
-def test_critical_hit_on_natural_20():
+def test_critical_hit_on_natural_20(monkeypatch):
     """Test that attack is recognized as critical hit on natural 20"""
     grid = np.zeros((10, 10), dtype=object)
     player = Player(5, 5, "melee")
@@ -249,7 +238,6 @@ def test_critical_hit_on_natural_20():
     grid[5, 5] = player
     grid[5, 6] = enemy
     
-    original_roll = player.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 20  # Natural 20
@@ -257,16 +245,13 @@ def test_critical_hit_on_natural_20():
             return 4  # Consistent damage roll
         return 0  # For any other rolls
     
-    try:
-        player.roll = mock_roll
-        damage = player.attack(enemy, grid)
-        # Calculate expected damage: (damage_dice * 2) + strength
-        expected_damage = (4 * 2) + player.strength
-        assert damage == expected_damage, "Critical hit should double dice damage before adding strength"
-    finally:
-        player.roll = original_roll
+    monkeypatch.setattr(Player, "roll", staticmethod(mock_roll))
+    damage = player.attack(enemy, grid)
+    # Calculate expected damage: (damage_dice * 2) + strength
+    expected_damage = (4 * 2) + player.strength
+    assert damage == expected_damage, "Critical hit should double dice damage before adding strength"
 
-def test_critical_hit_reduces_enemy_health_double():
+def test_critical_hit_reduces_enemy_health_double(monkeypatch):
     """Test that critical hit reduces enemy health by double damage dice"""
     grid = np.zeros((10, 10), dtype=object)
     player = Player(5, 5, "melee")
@@ -275,7 +260,6 @@ def test_critical_hit_reduces_enemy_health_double():
     grid[5, 6] = enemy
     
     initial_health = enemy.health
-    original_roll = player.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 20  # Natural 20
@@ -283,15 +267,12 @@ def test_critical_hit_reduces_enemy_health_double():
             return 4  # Consistent damage roll
         return 0  # For any other rolls
     
-    try:
-        player.roll = mock_roll
-        player.attack(enemy, grid)
-        expected_health = initial_health - ((4 * 2) + player.strength)
-        assert enemy.health == expected_health, "Critical hit should double dice damage before adding strength"
-    finally:
-        player.roll = original_roll
+    monkeypatch.setattr(Player, "roll", staticmethod(mock_roll))
+    player.attack(enemy, grid)
+    expected_health = initial_health - ((4 * 2) + player.strength)
+    assert enemy.health == expected_health, "Critical hit should double dice damage before adding strength"
 
-def test_non_critical_hit_normal_damage():
+def test_non_critical_hit_normal_damage(monkeypatch):
     """Test that non-critical hits deal normal damage"""
     grid = np.zeros((10, 10), dtype=object)
     player = Player(5, 5, "melee")
@@ -299,19 +280,15 @@ def test_non_critical_hit_normal_damage():
     grid[5, 5] = player
     grid[5, 6] = enemy
     
-    original_roll = player.roll
     def mock_roll(die, plus):
         if die == 20:  # Attack roll
             return 15 + plus  # Non-critical hit
         return 1  # Minimum damage for consistent testing
     
-    try:
-        player.roll = mock_roll
-        damage = player.attack(enemy, grid)
-        expected_damage = 1 + player.strength  # Normal damage
-        assert damage == expected_damage, "Non-critical hit should deal normal damage"
-    finally:
-        player.roll = original_roll
+    monkeypatch.setattr(Player, "roll", staticmethod(mock_roll))
+    damage = player.attack(enemy, grid)
+    expected_damage = 1 + player.strength  # Normal damage
+    assert damage == expected_damage, "Non-critical hit should deal normal damage"
 
 def manhattan_distance(loc1, loc2):
     """Calculate Manhattan distance between two points"""
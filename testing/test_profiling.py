@@ -0,0 +1,38 @@
+import pathfinding
+from model import Model, run_battle
+from player import Player
+from profiling import PhaseProfiler, profile_battle, profile_sweep, PHASES
+
+PARAMS = {"num_players": 3, "num_enemies": 4, "enemy_strategy": 'attack_weakest', "enemy_max_health": 30}
+
+
+def test_profile_battle_matches_plain_battle():
+    """Test that profiling times every phase without changing the battle"""
+    record, profiler = profile_battle(31, PARAMS)
+    assert record == run_battle(31, PARAMS), "Profiling should not change the battle's outcome"
+    summary = profiler.summary()
+    assert summary["battles"] == 1, "One battle should be profiled"
+    for phase in PHASES:
+        assert summary["phases"][phase]["calls"] > 0, f"{phase} should have been timed"
+    assert summary["searches"]["monotone_path"]["cells"] > 0, "Pathfinding cells should be counted"
+    assert "movement" in profiler.report(), "Report should list the phases"
+
+
+def test_profiler_uninstalls_cleanly():
+    """Test that the plain methods and search hook are restored after profiling"""
+    original = Player.__dict__["attack"]
+    with PhaseProfiler():
+        assert Player.__dict__["attack"] is not original, "Phases should be wrapped while installed"
+    assert Player.__dict__["attack"] is original, "Plain methods should be restored"
+    assert Model.__dict__["execute_turns"].__name__ == "execute_turns", "Model should be restored"
+    assert pathfinding.search_hook is None, "Search hook should be cleared"
+
+
+def test_profile_sweep_merges_battles():
+    """Test that a sweep profile adds up the profiles of its configurations"""
+    configs = [PARAMS, dict(PARAMS, num_enemies=2)]
+    total, per_config = profile_sweep(configs, num_runs=2, seed=32)
+    assert [profiler.battles for profiler in per_config] == [2, 2], "Each config should profile its battles"
+    assert total.battles == 4, "Sweep profile should cover every battle"
+    attacks = sum(profiler.calls["attack"] for profiler in per_config)
+    assert total.calls["attack"] == attacks, "Sweep counts should be the sum of the configs' counts"
@@ -0,0 +1,52 @@
+import sys
+import os
+import numpy as np
+from model import Model
+from player import Player
+from enemy import Enemy
+from registry import EntityRegistry
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_registry_matches_grid_after_initialization():
+    """Test that the model's registry holds exactly the entities on the grid"""
+    model = Model()
+    grid_players = [cell for cell in model.entity_grid.flat if isinstance(cell, Player)]
+    grid_enemies = [cell for cell in model.entity_grid.flat if isinstance(cell, Enemy)]
+    assert model.registry.get_players() == grid_players, "Registry players should match grid scan order"
+    assert model.registry.get_enemies() == grid_enemies, "Registry enemies should match grid scan order"
+
+
+def test_registry_location_lookup():
+    """Test that registered entities can be looked up by location"""
+    registry = EntityRegistry()
+    player = Player(2, 3, "melee")
+    registry.add(player)
+    assert registry.at((2, 3)) is player, "Registry should return the entity at its location"
+    assert registry.at((0, 0)) is None, "Registry should return None for empty cells"
+
+
+def test_registry_tracks_moves():
+    """Test that move_towards keeps the registry location map in sync"""
+    grid = np.zeros((10, 10), dtype=object)
+    registry = EntityRegistry()
+    player = Player(0, 0, "melee")
+    enemy = Enemy(9, 9, "attack_nearest")
+    for entity in (player, enemy):
+        grid[entity.loc] = entity
+        registry.add(entity)
+
+    player.move_towards(enemy.loc, grid, registry)
+    assert registry.at((0, 0)) is None, "Old location should be cleared"
+    assert registry.at(player.loc) is player, "New location should point at the player"
+
+
+def test_registry_removes_dead_entities():
+    """Test that update_grid_state removes dead entities from the registry"""
+    model = Model()
+    enemy = model.registry.get_enemies()[0]
+    enemy.health = 0
+    model.update_grid_state()
+    assert enemy not in model.registry.get_enemies(), "Dead enemy should be removed from registry"
+    assert model.registry.at(enemy.loc) is None, "Dead enemy's cell should be cleared in registry"
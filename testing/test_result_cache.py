@@ -0,0 +1,58 @@
+import os
+import time
+import model
+from model import batch_simulation
+from result_cache import ResultCache
+from sweep import run_sweep
+from dice import spawn_seeds
+
+CONFIG = {"num_players": 2, "num_enemies": 2, "enemy_strategy": 'attack_nearest', "enemy_max_health": 30}
+
+
+def test_cache_hit_skips_simulation(tmp_path, monkeypatch):
+    """Test that a repeated seeded batch is read from the cache instead of simulated"""
+    cache = ResultCache(str(tmp_path))
+    first = batch_simulation(num_runs=3, seed=21, cache=cache, **CONFIG)
+
+    def no_battles(*args):
+        raise AssertionError("Cached batch should not run battles")
+    monkeypatch.setattr(model, "run_battles", no_battles)
+    start = time.perf_counter()
+    second = batch_simulation(num_runs=3, seed=21, cache=cache, **CONFIG)
+    assert time.perf_counter() - start < 0.1, "A cache hit should take milliseconds"
+    assert second == first, "Cached metrics should equal the simulated ones, CIs included"
+
+
+def test_cache_key_covers_config_seed_and_version(tmp_path, monkeypatch):
+    """Test that a different seed, run count or engine version misses the cache"""
+    cache = ResultCache(str(tmp_path))
+    batch_simulation(num_runs=2, seed=22, cache=cache, **CONFIG)
+    batch_simulation(num_runs=2, seed=23, cache=cache, **CONFIG)
+    batch_simulation(num_runs=3, seed=22, cache=cache, **CONFIG)
+    monkeypatch.setattr(model, "ENGINE_VERSION", model.ENGINE_VERSION + 1)
+    batch_simulation(num_runs=2, seed=22, cache=cache, **CONFIG)
+    assert len(list(tmp_path.glob("*.json"))) == 4, "Each distinct batch should get its own entry"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that eviction removes the entries used longest ago"""
+    cache = ResultCache(str(tmp_path), max_bytes=250)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"Rounds Taken": float(i), "pad": "x" * 50})
+        os.utime(cache.entry_path(key), ns=(i * 10**9, i * 10**9))
+    assert cache.get("a") is not None, "Entry a should still be cached"
+    cache.put("d", {"Rounds Taken": 3.0, "pad": "x" * 50})
+    assert cache.get("b") is None, "Least recently used entry should be evicted"
+    assert cache.get("a") is not None and cache.get("d") is not None, "Recently used entries should stay"
+
+
+def test_sweep_shares_cache_with_batch_simulation(tmp_path):
+    """Test that a sweep reuses results cached by batch_simulation with the config's seed"""
+    cache = ResultCache(str(tmp_path))
+    config_seed = spawn_seeds(24, 1)[0]
+    expected = batch_simulation(num_runs=2, seed=config_seed, cache=cache, **CONFIG)
+    finished = []
+    results = run_sweep([CONFIG], num_runs=2, seed=24, cache=cache,
+                        progress=lambda done, total: finished.append(done))
+    assert results == [expected], "Sweep should return the cached metrics"
+    assert finished == [], "No battle should be run for a cached config"
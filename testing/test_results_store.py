@@ -0,0 +1,62 @@
+import math
+import numpy as np
+from results_store import ResultsStore
+from model import batch_simulation
+from sweep import run_sweep
+from dice import parse_seed, iter_seeds
+
+CONFIG = {"num_players": 2, "num_enemies": 2, "enemy_strategy": 'attack_weakest', "enemy_max_health": 30}
+
+
+def test_store_matches_batch_simulation(tmp_path):
+    """Test that a batch's stored battles summarize to the batch's own metrics"""
+    with ResultsStore(str(tmp_path), shard_size=2) as store:
+        metrics = batch_simulation(num_runs=5, seed=11, store=store, **CONFIG)
+    assert len(store.shard_paths()) == 3, "Five battles in shards of two should make three shards"
+    summary = ResultsStore(str(tmp_path)).group_by("enemy_strategy")['attack_weakest']
+    assert summary["Runs"] == 5, "Every battle should be stored"
+    for name in ["Rounds Taken", "Players Survived", "Player Win %"]:
+        assert math.isclose(summary[name], metrics[name]), f"Stored {name} should average to the batch mean"
+
+
+def test_store_records_seed_and_run(tmp_path):
+    """Test that the stored seed and run index identify the battle's own seed"""
+    with ResultsStore(str(tmp_path)) as store:
+        batch_simulation(num_runs=3, seed=12, store=store, **CONFIG)
+    shard = next(store.shards(["seed", "run"]))
+    assert shard["run"].tolist() == [0, 1, 2], "Runs should be stored in run order"
+    root = parse_seed(shard["seed"][0])
+    assert root.entropy == 12, "Stored seed should be the batch seed"
+    assert list(iter_seeds(root, 3))[2].spawn_key == (2,), "Run 2 should map back to the third child seed"
+
+
+def test_store_group_by_and_where(tmp_path):
+    """Test grouping a sweep by several columns and filtering rows"""
+    configs = [dict(CONFIG, num_enemies=n, enemy_max_health=h) for n in (1, 2) for h in (30, 60)]
+    with ResultsStore(str(tmp_path), shard_size=3) as store:
+        run_sweep(configs, num_runs=2, seed=13, store=store)
+    groups = store.group_by(["num_enemies", "enemy_max_health"])
+    assert sorted(groups) == [(1, 30), (1, 60), (2, 30), (2, 60)], "Every config should be its own group"
+    assert all(metrics["Runs"] == 2 for metrics in groups.values()), "Each config ran twice"
+    filtered = store.group_by("num_enemies", where={"enemy_max_health": 60})
+    assert {key: metrics["Runs"] for key, metrics in filtered.items()} == {1: 2, 2: 2}, \
+        "where should keep only the battles of matching configs"
+    rounds = store.aggregate("enemy_strategy")['attack_weakest'].stats["Rounds Taken"]
+    assert rounds.count == 8 and rounds.min <= rounds.quantile(0.5) <= rounds.max, \
+        "aggregate should expose full summaries"
+    with np.load(store.shard_paths()[0]) as shard:
+        assert shard["num_enemies"].dtype.kind == 'i', "Shards should hold plain NumPy columns"
+
+
+def test_store_separates_pathing_settings(tmp_path):
+    """Test that battles run with different pathing or path_cache settings are grouped apart"""
+    with ResultsStore(str(tmp_path)) as store:
+        batch_simulation(num_runs=2, seed=14, store=store, **CONFIG)
+        batch_simulation(num_runs=2, seed=14, store=store, pathing='distance_field', **CONFIG)
+        batch_simulation(num_runs=2, seed=14, store=store, path_cache=True, **CONFIG)
+        batch_simulation(num_runs=2, seed=14, store=store, engine='lockstep', **CONFIG)
+    groups = store.group_by(["engine", "pathing", "path_cache"])
+    assert sorted(groups) == [("lockstep", "per_agent", False), ("model", "distance_field", False),
+                              ("model", "per_agent", False), ("model", "per_agent", True)], \
+        "Each pathing setting should be its own group; lockstep plans per agent without a cache"
+    assert all(metrics["Runs"] == 2 for metrics in groups.values()), "Each batch ran twice"
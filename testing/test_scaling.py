@@ -0,0 +1,41 @@
+import json
+import math
+from scaling import run_case, run_matrix, fit_exponents, main
+
+
+def test_run_case_reports_throughput():
+    """Test that a case reports consistent throughput, rounds and peak memory"""
+    case = run_case((30, 30), 2, 3, battles=2, seed=5)
+    assert case["battles"] == 2 and case["rounds"] > 0, "Both battles should run to the end"
+    assert math.isclose(case["battles_per_second"] * case["seconds_per_battle"], 1.0), \
+        "Battles per second should be the inverse of seconds per battle"
+    assert math.isclose(case["rounds_per_second"], case["rounds"] / case["seconds"]), "Rounds per second should use all rounds"
+    assert case["peak_bytes"] > 0, "Peak memory should be measured"
+    again = run_case((30, 30), 2, 3, battles=2, seed=5, memory=False)
+    assert again["rounds"] == case["rounds"], "Cases should be seeded"
+    assert again["peak_bytes"] is None, "Memory should be skipped on request"
+
+
+def test_fit_exponents_recovers_power_law():
+    """Test that the log-log fit recovers known exponents and skips constant factors"""
+    cases = [{"grid_x": side, "grid_y": side, "num_players": players, "num_enemies": 10,
+              "seconds": 3e-6 * (side * side) ** 0.5 * players ** 2}
+             for side in (10, 20, 40) for players in (1, 2, 4)]
+    exponents = fit_exponents(cases, "seconds")
+    assert set(exponents) == {"area", "players"}, "A factor with one value cannot be fitted"
+    assert math.isclose(exponents["area"], 0.5) and math.isclose(exponents["players"], 2.0), \
+        "Exponents of an exact power law should be recovered"
+
+
+def test_run_matrix_and_command(tmp_path):
+    """Test that the matrix covers every combination and the command writes it as JSON"""
+    report = run_matrix([(20, 20), (30, 20)], [2], [2, 3], battles=1, memory=False)
+    assert [(case["grid_x"], case["num_enemies"]) for case in report["cases"]] == [(20, 2), (20, 3), (30, 2), (30, 3)], \
+        "Cases should follow the matrix order"
+    assert set(report["exponents"]["seconds_per_round"]) == {"area", "enemies"}, "Varied factors should be fitted"
+
+    output = tmp_path / "scaling.json"
+    assert main(["--grid", "20x20", "25", "--players", "2", "--enemies", "2", "--battles", "1",
+                 "--no-memory", "--output", str(output)]) == 0, "The command should succeed"
+    cases = json.loads(output.read_text())["cases"]
+    assert [(case["grid_x"], case["grid_y"]) for case in cases] == [(20, 20), (25, 25)], "Grid sizes should be parsed"
@@ -0,0 +1,43 @@
+import pytest
+from player import Player
+from enemy import Enemy
+from stat_blocks import StatBlock, STAT_BLOCKS, MELEE_PC, RANGED_PC, BASIC_ENEMY
+
+
+def test_agents_share_stat_blocks():
+    """Test that agents of the same kind read their stats from one shared block"""
+    melee = [Player(0, i, "melee") for i in range(3)]
+    assert all(player.stats is MELEE_PC for player in melee), "Melee players should share the melee PC block"
+    assert Player(0, 0, "ranged").stats is RANGED_PC, "Ranged players should use the ranged PC block"
+    assert Enemy(0, 0, "attack_nearest").stats is BASIC_ENEMY, "Enemies should use the basic enemy block"
+    assert STAT_BLOCKS["melee PC"] is MELEE_PC, "Blocks should be registered by name"
+
+
+def test_agents_have_no_instance_dict():
+    """Test that agents keep their state in slots rather than a per-instance __dict__"""
+    player = Player(0, 0, "melee")
+    enemy = Enemy(0, 0, "attack_nearest")
+    assert not hasattr(player, "__dict__") and not hasattr(enemy, "__dict__"), "Slotted agents should have no instance dict"
+    with pytest.raises(AttributeError):
+        player.mana = 10
+
+
+def test_setting_stat_does_not_change_shared_block():
+    """Test that changing one agent's stat gives it its own block and leaves the others alone"""
+    slow = Enemy(0, 0, "attack_nearest")
+    other = Enemy(1, 1, "attack_nearest")
+    slow.speed = 3
+    assert slow.speed == 3, "Changed stat should apply to the agent"
+    assert slow.armor_class == BASIC_ENEMY.armor_class, "Other stats should be copied from the shared block"
+    assert other.speed == 6 and BASIC_ENEMY.speed == 6, "Shared block and other enemies should keep their speed"
+
+
+def test_custom_stat_block():
+    """Test that an agent can be created from a new stat block"""
+    brute = BASIC_ENEMY.replace(name="brute", armor_class=16, damage_die=12)
+    enemy = Enemy(0, 0, "attack_nearest", stats=brute)
+    assert isinstance(brute, StatBlock), "replace should return a StatBlock"
+    assert (enemy.armor_class, enemy.damage_die, enemy.strength) == (16, 12, 4), \
+        "Agent should use the custom block's stats"
+    with pytest.raises(ValueError):
+        Player(0, 0, "sneaky")
@@ -0,0 +1,111 @@
+import json
+import pytest
+from model import batch_simulation, ENGINE_VERSION
+from sweep import run_sweep, expected_cost
+from dice import spawn_seeds
+
+CONFIGS = [
+    {"num_players": 2, "num_enemies": 1, "enemy_strategy": 'attack_nearest', "enemy_max_health": 30},
+    {"num_players": 2, "num_enemies": 3, "enemy_strategy": 'attack_weakest', "enemy_max_health": 60},
+]
+
+
+def test_expected_cost_orders_configs():
+    """Test that more and healthier enemies are expected to cost more"""
+    assert expected_cost(CONFIGS[1]) > expected_cost(CONFIGS[0]), "Bigger config should be scheduled first"
+
+
+def test_run_sweep_matches_batch_simulation():
+    """Test that each config's sweep result equals a batch run with its spawned seed"""
+    results = run_sweep(CONFIGS, num_runs=3, seed=5, chunk_runs=2)
+    config_seeds = spawn_seeds(5, len(CONFIGS))
+    for config, config_seed, metrics in zip(CONFIGS, config_seeds, results):
+        expected = batch_simulation(num_runs=3, seed=config_seed, **config)
+        assert metrics == expected, "Sweep aggregation should match batch_simulation"
+
+
+def test_run_sweep_workers_match_serial():
+    """Test that the global work queue gives the same results with a process pool"""
+    serial = run_sweep(CONFIGS, num_runs=2, seed=8, chunk_runs=1)
+    parallel = run_sweep(CONFIGS, num_runs=2, seed=8, chunk_runs=1, workers=2)
+    assert serial == parallel, "Worker count should not change sweep results"
+
+
+def test_run_sweep_callbacks():
+    """Test that progress covers every battle and every config is reported once"""
+    done = []
+    finished = []
+    run_sweep(CONFIGS, num_runs=2, seed=1, chunk_runs=1,
+              progress=lambda d, total: done.append((d, total)),
+              on_config_done=lambda index, metrics: finished.append(index))
+    assert done[-1] == (4, 4), "Progress should reach the total number of battles"
+    assert sorted(finished) == [0, 1], "Every config should be reported once"
+    assert finished[0] == 1, "The most expensive config should be scheduled first"
+
+
+def test_run_sweep_adaptive_matches_batch_simulation():
+    """Test that adaptive sweeps stop each config where an adaptive batch with its seed stops"""
+    kwargs = {"num_runs": 12, "target_ci": 40, "min_runs": 4}
+    results = run_sweep(CONFIGS, seed=6, chunk_runs=3, **kwargs)
+    parallel = run_sweep(CONFIGS, seed=6, chunk_runs=3, workers=2, **kwargs)
+    assert results == parallel, "Worker count should not change where configs stop"
+    for config, config_seed, metrics in zip(CONFIGS, spawn_seeds(6, len(CONFIGS)), results):
+        expected = batch_simulation(seed=config_seed, **config, **kwargs)
+        assert metrics == expected, "Sweep should stop each config at the same run as batch_simulation"
+        assert 4 <= metrics["Runs"] <= 12, "Run count should stay within min_runs and num_runs"
+
+
+def test_run_sweep_resumes_from_checkpoint(tmp_path):
+    """Test that an interrupted sweep resumes from its checkpoint without rerunning or double counting"""
+    expected = run_sweep(CONFIGS, num_runs=4, seed=9, chunk_runs=1)
+
+    def interrupt(done, total):
+        if done == 3:
+            raise KeyboardInterrupt
+    try:
+        run_sweep(CONFIGS, num_runs=4, seed=9, chunk_runs=1, checkpoint=str(tmp_path), progress=interrupt)
+    except KeyboardInterrupt:
+        pass
+    assert len(list(tmp_path.glob("unit_*.npy"))) == 3, "Finished chunks should be saved before the interruption"
+
+    calls = []
+    resumed = run_sweep(CONFIGS, num_runs=4, seed=9, chunk_runs=1, checkpoint=str(tmp_path),
+                        progress=lambda done, total: calls.append(done))
+    assert resumed == expected, "Resumed sweep should equal an uninterrupted one"
+    assert all(metrics["Runs"] == 4 for metrics in resumed), "No run should be counted twice"
+    assert len(list(tmp_path.glob("unit_*.npy"))) == 8, "Only the missing chunks should be run"
+
+
+def test_run_sweep_extends_checkpoint(tmp_path):
+    """Test that a checkpointed sweep can be extended with more runs and new configs"""
+    run_sweep(CONFIGS[:1], num_runs=2, seed=10, checkpoint=str(tmp_path))
+    extended = run_sweep(CONFIGS, num_runs=3, seed=10, checkpoint=str(tmp_path))
+    assert extended == run_sweep(CONFIGS, num_runs=3, seed=10), "Extended sweep should equal a fresh sweep"
+    # Two saved runs of the first config, plus its third run and three runs of the new config
+    assert len(list(tmp_path.glob("unit_*.npy"))) == 6, "Only the new runs and config should be run"
+
+
+def test_run_sweep_adaptive_resumes_and_extends_checkpoint(tmp_path):
+    """Test that adaptive sweeps finish when resumed or extended past the runs in their checkpoint"""
+    kwargs = {"seed": 11, "target_ci": {"Rounds Taken": 0.001}, "min_runs": 4, "chunk_runs": 2}
+    run_sweep(CONFIGS[:1], num_runs=8, checkpoint=str(tmp_path), **kwargs)
+    extended = run_sweep(CONFIGS[:1], num_runs=12, checkpoint=str(tmp_path), **kwargs)
+    expected = run_sweep(CONFIGS[:1], num_runs=12, **kwargs)
+    assert extended == expected, "Extended adaptive sweep should equal a fresh one"
+
+    max(tmp_path.glob("unit_*.npy")).unlink()
+    resumed = run_sweep(CONFIGS[:1], num_runs=12, checkpoint=str(tmp_path), **kwargs)
+    assert resumed == expected, "Resumed adaptive sweep should equal an uninterrupted one"
+    assert resumed[0]["Runs"] == 12, "Unmet targets should run every battle"
+
+
+def test_checkpoint_rejects_other_engine_version(tmp_path):
+    """Test that a checkpoint made under other battle rules is not reused"""
+    run_sweep(CONFIGS[:1], num_runs=2, seed=12, checkpoint=str(tmp_path))
+    manifest_path = tmp_path / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest["engine_version"] == ENGINE_VERSION, "Manifest should record the engine version"
+    manifest["engine_version"] = ENGINE_VERSION - 1
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        run_sweep(CONFIGS[:1], num_runs=2, seed=12, checkpoint=str(tmp_path))
@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 import visualize
 from player import Player
 from enemy import Enemy
+from model import Model
 
 # Add parent directory to path to allow importing from parent directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -55,5 +56,43 @@ def test_visualize_grid_message_display():
     assert ax.get_title() == test_message, "Grid should display the provided message as title"
 
 
+def test_render_frame_matches_cell_colors():
+    """Test that the vectorized frame gives every cell the colour of its agent and health"""
+    grid = np.zeros((4, 5), dtype=object)
+    player, enemy, dead = Player(1, 2, "melee"), Enemy(3, 0, "attack_nearest", max_health=40), Enemy(0, 4, "attack_nearest")
+    player.health, enemy.health, dead.health = 45, 10, -3
+    grid[1, 2], grid[3, 0], grid[0, 4] = player, enemy, dead
+    frame = visualize.render_frame(*visualize.grid_arrays(grid), enemy_health=40)
+    assert np.allclose(frame[1, 2], [0.25, 0.25, 1]), "Player should fade from blue by lost health"
+    assert np.allclose(frame[3, 0], [1, 0.75, 0.75]), "Enemy should fade from red by lost health"
+    assert np.allclose(frame[0, 4], [1, 1, 1]), "Agents at or below 0 health should be white"
+    assert np.allclose(frame[0, 0], visualize.EMPTY_COLOR), "Empty cells should be light gray"
+
+
+def test_render_frame_from_model_grid():
+    """Test that a Model's id grid renders like the same grid as objects"""
+    model = Model(num_players=3, num_enemies=4, grid_x=12, grid_y=8, seed=3)
+    from_ids = visualize.render_frame(*visualize.grid_arrays(model.entity_grid))
+    from_objects = visualize.render_frame(*visualize.grid_arrays(model.entity_grid.to_array()))
+    assert from_ids.shape == (8, 12, 3), "Frame should have one RGB pixel per cell"
+    assert np.array_equal(from_ids, from_objects), "Id grids and object grids should render the same"
+
+
+def test_visualize_grid_updates_image_in_place():
+    """Test that later frames reuse the first frame's image instead of drawing a new one"""
+    grid = np.zeros((10, 10), dtype=object)
+    fig, ax = plt.subplots()
+    visualize.visualize_grid(grid, message="First", ax=ax, pause=0)
+    image = ax.images[0]
+    grid[2, 3] = Player(2, 3, "melee")
+    visualize.visualize_grid(grid, message="Second", ax=ax, pause=0)
+    assert list(ax.images) == [image], "The image should be updated, not replaced"
+    assert image.get_array()[2, 3, 2] == 1 and image.get_array()[2, 3, 0] < 0.5, "New data should be shown"
+    assert ax.get_title() == "Second", "The title should follow the latest message"
+    visualize.visualize_grid(np.zeros((6, 6), dtype=object), ax=ax, pause=0)
+    assert len(ax.images) == 1 and ax.images[0].get_array().shape == (6, 6, 3), \
+        "A grid of another shape should get a new image"
+
+
 def teardown_module(module):
     plt.close('all')
\ No newline at end of file
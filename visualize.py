@@ -2,42 +2,124 @@ import matplotlib.pyplot as plt
 import numpy as np
 from enemy import Enemy
 from player import Player
+from entity_grid import EntityGrid
+
+# Colour of empty cells: light gray
+EMPTY_COLOR = (0.92, 0.92, 0.92)
+
+# Group id of the image visualize_grid draws, so later frames can find and update it in place
+GRID_IMAGE = "visualize_grid"
+
+def faction(cell):
+    """Returns Player or Enemy for an agent in an object grid cell, or None for anything else"""
+    # Checking both isinstance and class name for extra safety
+    if isinstance(cell, Player) or (hasattr(cell, '__class__') and cell.__class__.__name__ == 'Player'):
+        return Player
+    if isinstance(cell, Enemy) or (hasattr(cell, '__class__') and cell.__class__.__name__ == 'Enemy'):
+        return Enemy
+    return None
+
+def grid_arrays(grid):
+    """
+    Splits a grid into an id grid and per-entity faction and health arrays.
+    Inputs:
+    grid: EntityGrid view of a Model's id grid, or a 2D object array whose cells are Player,
+          Enemy, or anything else for empty cells
+    Outputs:
+    - ids: int array of the grid's shape, with the index of the entity in each cell or -1
+    - is_player: bool array, True for players, indexed by entity
+    - health: float array of current health, indexed by entity
+    """
+    if isinstance(grid, EntityGrid):
+        ids = grid.grid
+        entities = grid.entities
+    else:
+        cells = grid.ravel()
+        positions = [i for i, cell in enumerate(cells) if faction(cell) is not None]
+        entities = [cells[i] for i in positions]
+        ids = np.full(cells.shape, -1, dtype=np.int64)
+        ids[positions] = np.arange(len(positions))
+        ids = ids.reshape(grid.shape)
+    is_player = np.array([faction(entity) is Player for entity in entities], dtype=bool)
+    health = np.array([entity.health for entity in entities], dtype=float)
+    return ids, is_player, health
+
+def render_frame(ids, is_player, health, player_health=60, enemy_health=60):
+    """
+    Builds the RGB frame of a grid in one vectorized step: players are blue and enemies red,
+    both fading to white as their health drops, on light gray empty cells.
+    Inputs:
+    ids: int array of entity indexes per cell, -1 for empty cells (see grid_arrays)
+    is_player: bool array, True for players, indexed by entity
+    health: array of current health, indexed by entity
+    player_health, enemy_health: health at which agents get their full colour
+    Outputs:
+    - frame: float array of shape ids.shape + (3,)
+    """
+    frame = np.empty(ids.shape + (3,))
+    frame[:] = EMPTY_COLOR
+    occupied = ids >= 0
+    who = ids[occupied]
+    players = is_player[who]
+    fade = 1 - np.maximum(health[who], 0) / np.where(players, player_health, enemy_health)
+    # White to blue for players, white to red for enemies
+    frame[occupied] = np.stack([np.where(players, fade, 1.0), fade, np.where(players, 1.0, fade)], axis=-1)
+    return frame
+
+def grid_image(ax):
+    """Returns the image visualize_grid drew on ax, or None if there is none"""
+    for image in ax.images:
+        if image.get_gid() == GRID_IMAGE:
+            return image
+    return None
 
 def visualize_grid(grid, message = "", ax = None, pause = 0.5, enemy_health=60):
     """
     Visualizes the game grid with players and enemies, updating the display with a message.
+    The first frame drawn on ax sets up an image; later frames of the same shape only replace
+    its data (set_data), so redrawing costs little even on large grids.
     Inputs:
-    grid: a 2D numpy array representing the game grid, where each cell can be None, Player, or Enemy
+    grid: a 2D numpy array representing the game grid, where each cell can be None, Player, or Enemy,
+          or an EntityGrid view of a Model's id grid
     message: a string message to display on the grid
     ax: a matplotlib Axes object to draw the grid on; if None, uses the current Axes
+    pause: seconds to wait after drawing (plt.pause); with 0 the frame is drawn without waiting
     Outputs:
     None, but visualizes the grid and updates it in real-time.
     """
+    frame = render_frame(*grid_arrays(grid), player_health=60, enemy_health=enemy_health)
+    draw_frame(frame, message, ax, pause)
+
+def draw_frame(frame, message = "", ax = None, pause = 0.5):
+    """
+    Shows an RGB frame from render_frame on ax, reusing the image of earlier frames of the same
+    shape (see visualize_grid).
+    """
     if ax is None:
         ax = plt.gca()
-    ax.clear()
-    ax.set_xticks([])
-    ax.set_yticks([])
-
-    color_grid = np.zeros(grid.shape + (3,))  # RGB
-    pmax_health = 60  # Adjust as needed
-    emax_health = enemy_health  # Adjust as needed
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            cell = grid[y, x]
-            # Checking both isinstance and class name for extra safety
-            if isinstance(cell, Player) or (hasattr(cell, '__class__') and cell.__class__.__name__ == 'Player'):
-                # Blue fades to white as health drops
-                health_ratio = max(cell.health, 0) / pmax_health
-                color_grid[y, x] = [1-health_ratio, 1-health_ratio, 1]  # White to blue
-            elif isinstance(cell, Enemy) or (hasattr(cell, '__class__') and cell.__class__.__name__ == 'Enemy'):
-                # Red fades to white as health drops
-                health_ratio = max(cell.health, 0) / emax_health
-                color_grid[y, x] = [1, 1-health_ratio, 1-health_ratio]  # White to red
-            else:
-                color_grid[y, x] = [0.92, 0.92, 0.92]  # Light gray for empty cells
-
-    ax.imshow(color_grid, origin="lower")
-    ax.set_title(message, fontsize=12, color="black", pad=20)
-    plt.tight_layout()
-    plt.pause(pause)
\ No newline at end of file
+    update_image(frame, message, ax)
+
+    if pause > 0:
+        plt.pause(pause)
+    else:
+        ax.figure.canvas.draw_idle()
+        ax.figure.canvas.flush_events()
+
+def update_image(frame, message, ax):
+    """
+    Puts an RGB frame and its message on ax without drawing: replaces the data of the grid
+    image if there is one of the same shape, or sets up a new one. Does not use pyplot, so it
+    also works on figures made without it (e.g., for headless export).
+    """
+    image = grid_image(ax)
+    if image is None or image.get_array().shape != frame.shape:
+        ax.clear()
+        ax.set_xticks([])
+        ax.set_yticks([])
+        image = ax.imshow(frame, origin="lower")
+        image.set_gid(GRID_IMAGE)
+        ax.set_title(message, fontsize=12, color="black", pad=20)
+        ax.figure.tight_layout()
+    else:
+        image.set_data(frame)
+        ax.title.set_text(message)